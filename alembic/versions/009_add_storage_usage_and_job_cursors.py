@@ -0,0 +1,53 @@
+"""Add client_storage_usage and job_cursors tables
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-19
+"""
+
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+from alembic import op
+
+revision = "009"
+down_revision = "008"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Per-client upload accounting, maintained on upload and by the upload GC
+    op.create_table(
+        "client_storage_usage",
+        sa.Column(
+            "client_id",
+            UUID(as_uuid=True),
+            sa.ForeignKey("clients.id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+        sa.Column("bytes_used", sa.BigInteger, nullable=False, server_default="0"),
+        sa.Column("object_count", sa.Integer, nullable=False, server_default="0"),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.func.now(),
+        ),
+    )
+
+    # Resume positions for incremental background jobs
+    op.create_table(
+        "job_cursors",
+        sa.Column("name", sa.String(64), primary_key=True),
+        sa.Column("cursor", sa.Text, nullable=True),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.func.now(),
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("job_cursors")
+    op.drop_table("client_storage_usage")
@@ -0,0 +1,47 @@
+"""Add upload_sessions table (resumable uploads)
+
+Revision ID: 010
+Revises: 009
+Create Date: 2026-10-19
+"""
+
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+from alembic import op
+
+revision = "010"
+down_revision = "009"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "upload_sessions",
+        sa.Column("id", UUID(as_uuid=True), primary_key=True),
+        sa.Column(
+            "client_id",
+            UUID(as_uuid=True),
+            sa.ForeignKey("clients.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("date", sa.Date, nullable=False),
+        sa.Column("content_type", sa.String(64), nullable=False),
+        sa.Column("length", sa.Integer, nullable=False),
+        sa.Column("offset", sa.Integer, nullable=False, server_default="0"),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.func.now(),
+        ),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_index(
+        "idx_upload_sessions_expires_at", "upload_sessions", ["expires_at"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("idx_upload_sessions_expires_at", table_name="upload_sessions")
+    op.drop_table("upload_sessions")
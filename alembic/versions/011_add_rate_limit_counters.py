@@ -0,0 +1,32 @@
+"""Add rate_limit_counters (UNLOGGED) for the shared API rate limiter
+
+Revision ID: 011
+Revises: 010
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+
+revision = "011"
+down_revision = "010"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # UNLOGGED: no WAL for a hot, disposable counter table. Contents are lost
+    # on crash, which only resets the current rate-limit window.
+    op.execute(
+        """
+        CREATE UNLOGGED TABLE rate_limit_counters (
+            key TEXT NOT NULL,
+            window_start BIGINT NOT NULL,
+            count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (key, window_start)
+        )
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("rate_limit_counters")
@@ -0,0 +1,45 @@
+"""Add generation_quota_usage counters for the daily generation limit
+
+Revision ID: 012
+Revises: 011
+Create Date: 2026-10-19
+"""
+
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+from alembic import op
+
+revision = "012"
+down_revision = "011"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "generation_quota_usage",
+        sa.Column(
+            "client_id",
+            UUID(as_uuid=True),
+            sa.ForeignKey("clients.id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+        sa.Column("day", sa.Date, primary_key=True),
+        sa.Column("used", sa.Integer, nullable=False, server_default="0"),
+    )
+
+    # Seed today's counters so the deploy doesn't hand out a fresh quota
+    op.execute(
+        """
+        INSERT INTO generation_quota_usage (client_id, day, used)
+        SELECT client_id, CAST(created_at AS DATE), count(*)
+        FROM generations
+        WHERE created_at >= CURRENT_DATE
+        GROUP BY client_id, CAST(created_at AS DATE)
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("generation_quota_usage")
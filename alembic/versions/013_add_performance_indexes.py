@@ -0,0 +1,61 @@
+"""Add indexes for publish-status lookups, result loading and live input items
+
+Revision ID: 013
+Revises: 012
+Create Date: 2026-10-19
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision = "013"
+down_revision = "012"
+branch_labels = None
+depends_on = None
+
+# CONCURRENTLY keeps the tables writable while the indexes build; it can't
+# run inside a transaction, hence the autocommit block. IF NOT EXISTS lets a
+# re-run finish after an interrupted build (drop any INVALID index first).
+INDEXES = [
+    ("idx_published_posts_client_id", "published_posts", ["client_id"], None),
+    (
+        "idx_published_posts_input_item_id",
+        "published_posts",
+        ["input_item_id"],
+        "input_item_id IS NOT NULL",
+    ),
+    (
+        "idx_generation_results_generation_id",
+        "generation_results",
+        ["generation_id"],
+        None,
+    ),
+    (
+        "idx_input_items_client_date_live",
+        "input_items",
+        ["client_id", "date", "created_at"],
+        "NOT cleared",
+    ),
+]
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, columns, where in INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                postgresql_concurrently=True,
+                postgresql_where=sa.text(where) if where else None,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(
+                name, table_name=table, postgresql_concurrently=True, if_exists=True
+            )
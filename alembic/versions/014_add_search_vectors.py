@@ -0,0 +1,137 @@
+"""Add full-text search vectors (trigger-maintained columns + GIN indexes)
+
+Revision ID: 014
+Revises: 013
+Create Date: 2026-10-19
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision = "014"
+down_revision = "013"
+branch_labels = None
+depends_on = None
+
+# Notes carry no language tag, so they are indexed under every config we
+# publish in (ru/en/de) plus 'simple' for exact forms and Armenian, which has
+# no stemmer. Generated results know their language and use its config.
+ITEM_CONFIGS = ("simple", "russian", "english", "german")
+
+BATCH_SIZE = 5000
+
+
+def _multi_config(expr: str) -> str:
+    return " || ".join(f"to_tsvector('{cfg}', {expr})" for cfg in ITEM_CONFIGS)
+
+
+def _item_vector(row: str = "") -> str:
+    content = f"CASE WHEN {row}type = 'image' THEN '' ELSE {row}content END"
+    extracted = f"coalesce({row}extracted_text, '')"
+    return (
+        f"setweight({_multi_config(content)}, 'A') "
+        f"|| setweight({_multi_config(extracted)}, 'B')"
+    )
+
+
+def _result_vector(row: str = "") -> str:
+    return f"""
+        to_tsvector(
+            CASE {row}language
+                WHEN 'ru' THEN 'russian'::regconfig
+                WHEN 'en' THEN 'english'::regconfig
+                WHEN 'de' THEN 'german'::regconfig
+                ELSE 'simple'::regconfig
+            END,
+            coalesce({row}text, '')
+        ) || to_tsvector('simple', coalesce({row}text, ''))
+    """
+
+
+# table -> (vector expression, columns it reads)
+TABLES = {
+    "input_items": (_item_vector, "type, content, extracted_text"),
+    "generation_results": (_result_vector, "language, text"),
+}
+
+
+def vector_ddl(table: str) -> list[str]:
+    """The column and the trigger that keeps it current."""
+    vector, columns = TABLES[table]
+    return [
+        f"ALTER TABLE {table} ADD COLUMN search_vector tsvector",
+        f"""
+        CREATE OR REPLACE FUNCTION {table}_search_vector() RETURNS trigger AS $$
+        BEGIN
+            NEW.search_vector := {vector("NEW.")};
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+        """,
+        f"CREATE TRIGGER {table}_search_vector "
+        f"BEFORE INSERT OR UPDATE OF {columns} ON {table} "
+        f"FOR EACH ROW EXECUTE FUNCTION {table}_search_vector()",
+    ]
+
+
+def _backfill(table: str, vector) -> None:
+    """Fill existing rows in keyset batches, each its own short transaction."""
+    conn = op.get_bind()
+    after = None
+    while True:
+        ids = (
+            conn.execute(
+                sa.text(
+                    f"""
+                    WITH batch AS (
+                        SELECT id FROM {table}
+                        WHERE CAST(:after AS uuid) IS NULL OR id > :after
+                        ORDER BY id
+                        LIMIT {BATCH_SIZE}
+                    )
+                    UPDATE {table} AS t SET search_vector = {vector("t.")}
+                    FROM batch WHERE t.id = batch.id
+                    RETURNING t.id
+                    """
+                ),
+                {"after": after},
+            )
+            .scalars()
+            .all()
+        )
+        if not ids:
+            return
+        after = max(ids)
+
+
+def upgrade() -> None:
+    # A plain nullable column is a catalog-only change: no table rewrite under
+    # ACCESS EXCLUSIVE (a STORED generated column would rewrite the whole
+    # table while blocking every read and write). A trigger keeps new and
+    # edited rows current while the existing ones are filled in batches.
+    for table in TABLES:
+        for statement in vector_ddl(table):
+            op.execute(statement)
+    # CONCURRENTLY can't run inside a transaction, and the backfill commits
+    # per batch, hence the autocommit block
+    with op.get_context().autocommit_block():
+        for table, (vector, _) in TABLES.items():
+            _backfill(table, vector)
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_input_items_search "
+            "ON input_items USING gin (search_vector)"
+        )
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_generation_results_search "
+            "ON generation_results USING gin (search_vector)"
+        )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS idx_generation_results_search")
+    op.execute("DROP INDEX IF EXISTS idx_input_items_search")
+    for table in reversed(TABLES):
+        op.execute(f"DROP TRIGGER {table}_search_vector ON {table}")
+        op.execute(f"DROP FUNCTION {table}_search_vector()")
+        op.execute(f"ALTER TABLE {table} DROP COLUMN search_vector")
@@ -0,0 +1,65 @@
+"""Add day_stats: per-day counters behind /days and the activity heatmap
+
+Revision ID: 015
+Revises: 014
+Create Date: 2026-10-19
+"""
+
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+from alembic import op
+
+revision = "015"
+down_revision = "014"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "day_stats",
+        sa.Column(
+            "client_id",
+            UUID(as_uuid=True),
+            sa.ForeignKey("clients.id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+        sa.Column("date", sa.Date, primary_key=True),
+        sa.Column("input_count", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("generation_count", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("published_count", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("last_activity_at", sa.DateTime(timezone=True), nullable=False),
+    )
+
+    # Backfill; same aggregation as app.services.day_stats.rebuild
+    op.execute(
+        """
+        INSERT INTO day_stats (
+            client_id, date, input_count, generation_count, published_count,
+            last_activity_at
+        )
+        SELECT client_id, date, sum(i), sum(g), sum(p), max(at)
+        FROM (
+            SELECT client_id, date, 1 AS i, 0 AS g, 0 AS p, updated_at AS at
+            FROM input_items
+            UNION ALL
+            SELECT client_id, date, 0, 1, 0, created_at
+            FROM generations
+            UNION ALL
+            SELECT pp.client_id, g.date, 0, 0, 1, pp.published_at
+            FROM published_posts pp
+            JOIN generation_results r ON r.id = pp.generation_result_id
+            JOIN generations g ON g.id = r.generation_id
+            UNION ALL
+            SELECT pp.client_id, i.date, 0, 0, 1, pp.published_at
+            FROM published_posts pp
+            JOIN input_items i ON i.id = pp.input_item_id
+        ) AS activity
+        GROUP BY client_id, date
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("day_stats")
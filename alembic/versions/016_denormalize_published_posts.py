@@ -0,0 +1,122 @@
+"""Denormalize feed fields onto published_posts, add keyset feed indexes
+
+Revision ID: 016
+Revises: 015
+Create Date: 2026-10-19
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision = "016"
+down_revision = "015"
+branch_labels = None
+depends_on = None
+
+FEED_INDEXES = [
+    ("idx_published_posts_feed", ["published_at", "id"]),
+    ("idx_published_posts_channel_feed", ["channel_id", "published_at", "id"]),
+    ("idx_published_posts_language_feed", ["language", "published_at", "id"]),
+    (
+        "idx_published_posts_channel_language_feed",
+        ["channel_id", "language", "published_at", "id"],
+    ),
+    ("idx_published_posts_date_feed", ["date", "published_at", "id"]),
+]
+
+
+def upgrade() -> None:
+    op.add_column(
+        "published_posts",
+        sa.Column(
+            "source", sa.String(16), nullable=False, server_default="generation"
+        ),
+    )
+    op.add_column("published_posts", sa.Column("date", sa.Date, nullable=True))
+    op.add_column("published_posts", sa.Column("channel_id", sa.String(32)))
+    op.add_column("published_posts", sa.Column("style", sa.String(32)))
+    op.add_column("published_posts", sa.Column("language", sa.String(8)))
+    op.add_column(
+        "published_posts",
+        sa.Column("preview", sa.JSON, nullable=False, server_default="[]"),
+    )
+
+    # Snapshot existing posts the way the publish endpoints now do
+    op.execute(
+        """
+        UPDATE published_posts pp
+        SET source = 'generation', date = g.date, channel_id = r.channel_id,
+            style = r.style, language = r.language, text = r.text
+        FROM generation_results r
+        JOIN generations g ON g.id = r.generation_id
+        WHERE r.id = pp.generation_result_id
+        """
+    )
+    op.execute(
+        """
+        UPDATE published_posts pp
+        SET source = 'input', date = i.date
+        FROM input_items i
+        WHERE i.id = pp.input_item_id
+        """
+    )
+    op.execute(
+        """
+        UPDATE published_posts pp
+        SET preview = (
+            SELECT coalesce(json_agg(left(i.content, 80) ORDER BY i.created_at), '[]')
+            FROM (
+                SELECT content, created_at
+                FROM input_items
+                WHERE client_id = pp.client_id AND date = pp.date AND NOT cleared
+                ORDER BY created_at
+                LIMIT 5
+            ) i
+        )
+        WHERE source = 'generation'
+        """
+    )
+    op.execute(
+        "UPDATE published_posts SET date = CAST(published_at AS DATE) "
+        "WHERE date IS NULL"
+    )
+    op.alter_column("published_posts", "date", nullable=False)
+
+    # CONCURRENTLY: see 013
+    with op.get_context().autocommit_block():
+        for name, columns in FEED_INDEXES:
+            op.create_index(
+                name,
+                "published_posts",
+                columns,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+        # Superseded by idx_published_posts_feed
+        op.drop_index(
+            "idx_published_posts_published_at",
+            table_name="published_posts",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "idx_published_posts_published_at",
+            "published_posts",
+            ["published_at"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        for name, _ in reversed(FEED_INDEXES):
+            op.drop_index(
+                name,
+                table_name="published_posts",
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
+    for column in ("preview", "language", "style", "channel_id", "date", "source"):
+        op.drop_column("published_posts", column)
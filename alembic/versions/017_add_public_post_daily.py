@@ -0,0 +1,42 @@
+"""Add public_post_daily: posts per day and channel for public aggregates
+
+Revision ID: 017
+Revises: 016
+Create Date: 2026-10-19
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision = "017"
+down_revision = "016"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "public_post_daily",
+        sa.Column("date", sa.Date, primary_key=True),
+        sa.Column("channel_id", sa.String(32), primary_key=True),
+        sa.Column("month", sa.Date, nullable=False),
+        sa.Column("post_count", sa.Integer, nullable=False, server_default="0"),
+    )
+    op.create_index("idx_public_post_daily_month", "public_post_daily", ["month"])
+
+    # Backfill; same aggregation as app.services.public_stats.rebuild
+    op.execute(
+        """
+        INSERT INTO public_post_daily (date, channel_id, month, post_count)
+        SELECT date, coalesce(channel_id, ''),
+               CAST(date_trunc('month', date) AS DATE), count(*)
+        FROM published_posts
+        GROUP BY date, coalesce(channel_id, '')
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("idx_public_post_daily_month", table_name="public_post_daily")
+    op.drop_table("public_post_daily")
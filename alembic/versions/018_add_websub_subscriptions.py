@@ -0,0 +1,58 @@
+"""Add websub_subscriptions table (WebSub hub for the public feeds)
+
+Revision ID: 018
+Revises: 017
+Create Date: 2026-10-19
+"""
+
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+from alembic import op
+
+revision = "018"
+down_revision = "017"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "websub_subscriptions",
+        sa.Column("id", UUID(as_uuid=True), primary_key=True),
+        sa.Column("topic", sa.String(512), nullable=False),
+        sa.Column("callback", sa.String(2048), nullable=False),
+        sa.Column("secret", sa.String(200), nullable=True),
+        sa.Column("lease_expires_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("next_delivery_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("attempts", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("last_error", sa.Text, nullable=True),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.func.now(),
+        ),
+        sa.UniqueConstraint(
+            "topic", "callback", name="uq_websub_subscriptions_topic_callback"
+        ),
+    )
+    op.create_index(
+        "idx_websub_subscriptions_next_delivery_at",
+        "websub_subscriptions",
+        ["next_delivery_at"],
+    )
+    op.create_index(
+        "idx_websub_subscriptions_lease_expires_at",
+        "websub_subscriptions",
+        ["lease_expires_at"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "idx_websub_subscriptions_lease_expires_at", table_name="websub_subscriptions"
+    )
+    op.drop_index(
+        "idx_websub_subscriptions_next_delivery_at", table_name="websub_subscriptions"
+    )
+    op.drop_table("websub_subscriptions")
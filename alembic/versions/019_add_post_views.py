@@ -0,0 +1,40 @@
+"""Add post_views: write-behind view counts for public posts
+
+Revision ID: 019
+Revises: 018
+Create Date: 2026-10-19
+"""
+
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+from alembic import op
+
+revision = "019"
+down_revision = "018"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "post_views",
+        sa.Column(
+            "post_id",
+            UUID(as_uuid=True),
+            sa.ForeignKey("published_posts.id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+        sa.Column("view_count", sa.BigInteger, nullable=False, server_default="0"),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.func.now(),
+        ),
+    )
+    op.create_index("idx_post_views_view_count", "post_views", ["view_count"])
+
+
+def downgrade() -> None:
+    op.drop_index("idx_post_views_view_count", table_name="post_views")
+    op.drop_table("post_views")
@@ -0,0 +1,48 @@
+"""Add counted_uploads: which stored uploads client_storage_usage includes
+
+Revision ID: 020
+Revises: 019
+Create Date: 2026-10-19
+"""
+
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+from alembic import op
+
+revision = "020"
+down_revision = "019"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "counted_uploads",
+        sa.Column("key", sa.Text, primary_key=True),
+        sa.Column(
+            "client_id",
+            UUID(as_uuid=True),
+            sa.ForeignKey("clients.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("size", sa.BigInteger, nullable=True),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.func.now(),
+        ),
+    )
+    # Every image item's upload was counted when it was created; the GC uses
+    # the stored object's size for these
+    op.execute(
+        """
+        INSERT INTO counted_uploads (key, client_id)
+        SELECT DISTINCT content, client_id FROM input_items WHERE type = 'image'
+        ON CONFLICT DO NOTHING
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("counted_uploads")
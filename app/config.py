@@ -7,6 +7,120 @@ class Settings(BaseSettings):
     OPENAI_API_KEY: str = ""
     JWT_SECRET: str = "change-me-in-production"
 
+    # Connection pools (see app/database.py). Per worker: size + overflow is the
+    # most connections one uvicorn process will open for that bulkhead. A
+    # checkout that waits longer than the pool timeout, or a statement cut off
+    # by statement_timeout (ms, 0 = none), is answered with a 503.
+    DB_POOL_SIZE: int = 5  # authenticated API
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT_SECONDS: float = 5.0
+    DB_STATEMENT_TIMEOUT_MS: int = 10000
+    DB_PUBLIC_POOL_SIZE: int = 3  # anonymous /public reads
+    DB_PUBLIC_MAX_OVERFLOW: int = 2
+    DB_PUBLIC_POOL_TIMEOUT_SECONDS: float = 1.0
+    DB_PUBLIC_STATEMENT_TIMEOUT_MS: int = 3000
+    DB_JOBS_POOL_SIZE: int = 1  # python -m app.jobs.*, background loops in the API
+    DB_JOBS_MAX_OVERFLOW: int = 1
+    DB_JOBS_POOL_TIMEOUT_SECONDS: float = 30.0
+    DB_JOBS_STATEMENT_TIMEOUT_MS: int = 0
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_CACHE_SIZE: int = 100  # asyncpg prepared statements per connection
+    # Behind transaction-mode PgBouncer: no pooling or statement cache here
+    DB_PGBOUNCER: bool = False
+
+    # Optional read replica for public read-only endpoints (empty: use the primary)
+    DATABASE_READ_URL: str = ""
+    READ_REPLICA_MAX_LAG_SECONDS: float = 5.0
+    READ_REPLICA_LAG_CHECK_SECONDS: float = 2.0
+    # After a write, the same browser reads from the primary for this long
+    READ_YOUR_WRITES_SECONDS: int = 10
+
+    # Cached /public responses (see app/public_cache.py): "memory" (per worker;
+    # other workers may serve a page for up to the TTL after a publish) or
+    # "postgres" (publish invalidates every worker via LISTEN/NOTIFY; needs a
+    # direct connection, not transaction-mode PgBouncer). Empty: "postgres"
+    # when DATABASE_URL is Postgres and DB_PGBOUNCER is off, else "memory"
+    PUBLIC_CACHE_BACKEND: str = ""
+    PUBLIC_CACHE_SIZE: int = 1000
+    PUBLIC_CACHE_TTL_SECONDS: int = 60
+    PUBLIC_CACHE_MAX_AGE_SECONDS: int = 0  # browsers revalidate with If-None-Match
+
+    # Public blog: base URL for links in feeds, posts per feed document, and
+    # the origin that serves /api (feed, archive and hub links; never taken
+    # from the request's Host header)
+    PUBLIC_SITE_URL: str = "http://192.168.31.131:3000"
+    FEED_PAGE_SIZE: int = 50
+    PUBLIC_API_URL: str = "http://192.168.31.131"
+
+    # Static snapshots of public posts and feeds for Caddy to serve (see
+    # app/services/snapshots.py; empty: disabled)
+    STATIC_SNAPSHOT_DIR: str = ""
+
+    # WebSub hub pushing the public feeds (see app/services/websub.py). Failed
+    # pushes are retried after RETRY_BASE, 2x, 4x ... seconds, at most MAX_ATTEMPTS
+    WEBSUB_LEASE_SECONDS: int = 864000  # default and longest lease: 10 days
+    WEBSUB_TIMEOUT_SECONDS: float = 10.0
+    WEBSUB_RETRY_BASE_SECONDS: int = 60
+    WEBSUB_MAX_ATTEMPTS: int = 8
+    WEBSUB_BATCH_SIZE: int = 50
+    WEBSUB_POLL_SECONDS: float = 30.0
+    WEBSUB_REQUESTS_PER_MINUTE: int = 10  # subscribe/unsubscribe per client address
+
+    # Public post view counts (see app/services/view_counts.py): buffered per
+    # worker and flushed every VIEW_COUNT_FLUSH_SECONDS, the most a crash loses
+    VIEW_COUNT_FLUSH_SECONDS: float = 10.0
+    VIEW_COUNT_MAX_PENDING: int = 10000  # distinct posts buffered per worker
+
+    # Related-posts index (see app/services/related.py); changing the dimension
+    # needs python -m app.jobs.related_index
+    RELATED_INDEX_DIR: str = ""  # default: <project>/data/related
+    RELATED_INDEX_DIM: int = 2048
+
+    # Open Graph preview cards (see app/services/og_images.py): rendered once
+    # per card content in a bounded pool, then served from disk as immutable
+    OG_IMAGE_DIR: str = ""  # default: <project>/data/og
+    OG_IMAGE_WORKERS: int = 2
+    OG_IMAGE_MAX_PENDING: int = 16
+    OG_IMAGE_MAX_AGE_SECONDS: int = 31536000
+    OG_FONT_PATH: str = ""  # TrueType fonts; default: Pillow's built-in font
+    OG_FONT_BOLD_PATH: str = ""
+
+    # Per-worker caches on the auth path (see app/dependencies.py)
+    CLIENT_CACHE_SIZE: int = 10000
+    CLIENT_CACHE_TTL_SECONDS: int = 300
+    JWT_CACHE_SIZE: int = 10000
+    JWT_CACHE_TTL_SECONDS: int = 300
+
+    # Password hashing: bcrypt cost and the bounded pool that runs it
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_PENDING: int = 16
+
+    # Upload storage: "local" (UPLOAD_DIR on disk) or "s3" (any S3-compatible store)
+    STORAGE_BACKEND: str = "local"
+    UPLOAD_DIR: str = ""  # default: <project>/data/uploads
+    S3_BUCKET: str = ""
+    S3_ENDPOINT_URL: str = ""  # e.g. http://localhost:9000 for MinIO
+    S3_REGION: str = ""
+    S3_ACCESS_KEY_ID: str = ""
+    S3_SECRET_ACCESS_KEY: str = ""
+    S3_PRESIGN_EXPIRES_SECONDS: int = 900
+
+    # API rate limiting: "memory" (per worker) or "postgres" (shared by all workers)
+    RATE_LIMIT_BACKEND: str = "memory"
+    RATE_LIMIT_BACKEND_TIMEOUT_SECONDS: float = 0.25
+    RATE_LIMIT_RETRY_SECONDS: int = 30
+
+    # Resumable uploads: partial bytes on local disk until finalized
+    PARTIAL_UPLOAD_DIR: str = ""  # default: <project>/data/partial_uploads
+    UPLOAD_SESSION_TTL_HOURS: int = 24
+
+    # Orphaned upload GC (python -m app.jobs.upload_gc)
+    UPLOAD_GC_GRACE_HOURS: int = 72
+    UPLOAD_GC_BATCH_SIZE: int = 500
+    UPLOAD_GC_MAX_BATCHES: int = 20
+
     model_config = {"env_file": ".env", "extra": "ignore"}
 
 
@@ -1,11 +1,279 @@
-from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+import asyncio
+import time
+import uuid
+from dataclasses import dataclass
+
+import structlog
+from fastapi import Depends, Request
+from sqlalchemy import exc, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool
 
 from app.config import settings
 
-engine = create_async_engine(settings.DATABASE_URL, echo=False)
+logger = structlog.get_logger()
+
+
+class MeteredQueuePool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that records how long checkouts wait for a connection."""
+
+    def __init__(self, *args, **kw):
+        super().__init__(*args, **kw)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.peak_checked_out = 0
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            record = super()._do_get()
+        except exc.TimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            self.wait_seconds_total += waited
+            self.wait_seconds_max = max(self.wait_seconds_max, waited)
+        self.checkouts += 1
+        self.peak_checked_out = max(self.peak_checked_out, self.checkedout())
+        return record
+
+
+@dataclass(frozen=True)
+class Bulkhead:
+    """A separate pool, with its own statement_timeout, for one class of routes."""
+
+    pool_size: int
+    max_overflow: int
+    pool_timeout: float
+    statement_timeout_ms: int
+
+
+# api: authenticated CRUD; public: anonymous reads; jobs: python -m app.jobs.*
+# and the API process's background loops (WebSub pushes, view-count flushes,
+# snapshot archive rewrites), so a backlog there can't starve the CRUD pool.
+# A slow public aggregation can only exhaust its own pool, never the writes'.
+BULKHEADS = {
+    "api": Bulkhead(
+        settings.DB_POOL_SIZE,
+        settings.DB_MAX_OVERFLOW,
+        settings.DB_POOL_TIMEOUT_SECONDS,
+        settings.DB_STATEMENT_TIMEOUT_MS,
+    ),
+    "public": Bulkhead(
+        settings.DB_PUBLIC_POOL_SIZE,
+        settings.DB_PUBLIC_MAX_OVERFLOW,
+        settings.DB_PUBLIC_POOL_TIMEOUT_SECONDS,
+        settings.DB_PUBLIC_STATEMENT_TIMEOUT_MS,
+    ),
+    "jobs": Bulkhead(
+        settings.DB_JOBS_POOL_SIZE,
+        settings.DB_JOBS_MAX_OVERFLOW,
+        settings.DB_JOBS_POOL_TIMEOUT_SECONDS,
+        settings.DB_JOBS_STATEMENT_TIMEOUT_MS,
+    ),
+}
+
+
+def engine_options(url: str, bulkhead: str = "api") -> dict:
+    """Pool and driver options for ``url``; SQLite (tests) keeps the defaults."""
+    if url.startswith("sqlite"):
+        return {}
+    if settings.DB_PGBOUNCER:
+        # PgBouncer in transaction mode hands each transaction to any server
+        # connection, so named prepared statements can't be reused: disable
+        # both statement caches, give every statement a unique name, and let
+        # PgBouncer do the pooling. It also rejects startup parameters, so
+        # statement_timeout has to be set on the database role instead.
+        return {
+            "poolclass": NullPool,
+            "connect_args": {
+                "statement_cache_size": 0,
+                "prepared_statement_cache_size": 0,
+                "prepared_statement_name_func": lambda: f"__asyncpg_{uuid.uuid4()}__",
+            },
+        }
+    limits = BULKHEADS[bulkhead]
+    connect_args: dict = {
+        "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+    }
+    if limits.statement_timeout_ms:
+        connect_args["server_settings"] = {
+            "statement_timeout": str(limits.statement_timeout_ms)
+        }
+    return {
+        "poolclass": MeteredQueuePool,
+        "pool_size": limits.pool_size,
+        "max_overflow": limits.max_overflow,
+        "pool_timeout": limits.pool_timeout,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "connect_args": connect_args,
+    }
+
+
+def pool_metrics(db_engine: AsyncEngine) -> dict:
+    """Live pool state plus checkout counters (counters only for MeteredQueuePool)."""
+    pool = db_engine.pool
+    metrics: dict = {"pool": type(pool).__name__}
+    if isinstance(pool, AsyncAdaptedQueuePool):
+        metrics.update(
+            size=pool.size(),
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            overflow=max(pool.overflow(), 0),
+            timeout_seconds=pool.timeout(),
+        )
+    if isinstance(pool, MeteredQueuePool):
+        waits = max(pool.checkouts + pool.timeouts, 1)
+        metrics.update(
+            checkouts=pool.checkouts,
+            timeouts=pool.timeouts,
+            peak_checked_out=pool.peak_checked_out,
+            wait_ms_avg=round(pool.wait_seconds_total * 1000 / waits, 3),
+            wait_ms_max=round(pool.wait_seconds_max * 1000, 3),
+        )
+    return metrics
+
+
+engine = create_async_engine(
+    settings.DATABASE_URL, echo=False, **engine_options(settings.DATABASE_URL)
+)
 async_session = async_sessionmaker(engine, expire_on_commit=False)
 
+public_engine = create_async_engine(
+    settings.DATABASE_URL,
+    echo=False,
+    **engine_options(settings.DATABASE_URL, "public"),
+)
+async_public_session = async_sessionmaker(public_engine, expire_on_commit=False)
+
+jobs_engine = create_async_engine(
+    settings.DATABASE_URL,
+    echo=False,
+    **engine_options(settings.DATABASE_URL, "jobs"),
+)
+async_jobs_session = async_sessionmaker(jobs_engine, expire_on_commit=False)
+
 
 async def get_session():
     async with async_session() as session:
         yield session
+
+
+async def get_public_session():
+    async with async_public_session() as session:
+        yield session
+
+
+read_engine = (
+    create_async_engine(
+        settings.DATABASE_READ_URL,
+        echo=False,
+        **engine_options(settings.DATABASE_READ_URL, "public"),
+    )
+    if settings.DATABASE_READ_URL
+    else None
+)
+async_read_session = (
+    async_sessionmaker(read_engine, expire_on_commit=False) if read_engine else None
+)
+
+# Set on responses to writes; while fresh, that browser reads from the primary
+LAST_WRITE_COOKIE = "daycast_last_write"
+
+_REPLICA_LAG = text(
+    """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+    END
+    """
+)
+
+
+class ReplicaLagMonitor:
+    """Replication lag of the read replica, measured at most every ``interval`` seconds.
+
+    An unreachable replica, or one that hasn't replayed anything yet, counts
+    as infinitely behind until the next measurement.
+    """
+
+    def __init__(self, db_engine: AsyncEngine, interval: float):
+        self.engine = db_engine
+        self.interval = interval
+        self.lag = float("inf")
+        self._checked_at = float("-inf")
+        self._lock = asyncio.Lock()
+
+    async def measure(self) -> float:
+        async with self.engine.connect() as conn:
+            lag = (await conn.execute(_REPLICA_LAG)).scalar()
+        return float("inf") if lag is None else float(lag)
+
+    async def current_lag(self) -> float:
+        if time.monotonic() - self._checked_at < self.interval:
+            return self.lag
+        async with self._lock:
+            if time.monotonic() - self._checked_at >= self.interval:
+                try:
+                    self.lag = await self.measure()
+                except Exception as e:
+                    self.lag = float("inf")
+                    logger.warning("read_replica_unavailable", error=str(e))
+                self._checked_at = time.monotonic()
+        return self.lag
+
+
+replica_lag = (
+    ReplicaLagMonitor(read_engine, settings.READ_REPLICA_LAG_CHECK_SECONDS)
+    if read_engine
+    else None
+)
+
+
+def wrote_recently(request: Request) -> bool:
+    try:
+        wrote_at = float(request.cookies.get(LAST_WRITE_COOKIE, ""))
+    except ValueError:
+        return False
+    return time.time() - wrote_at < settings.READ_YOUR_WRITES_SECONDS
+
+
+async def get_read_session(
+    request: Request,
+    primary: AsyncSession = Depends(get_public_session),
+):
+    """Session for public read-only handlers: the replica when it's safe, else
+    the primary's public pool.
+
+    Stays on the primary for signed-in requests and browsers that wrote in the
+    last READ_YOUR_WRITES_SECONDS (so authors see their own changes), and
+    whenever the replica lags more than READ_REPLICA_MAX_LAG_SECONDS.
+    """
+    if (
+        async_read_session is None
+        or "authorization" in request.headers
+        or wrote_recently(request)
+        or await replica_lag.current_lag() > settings.READ_REPLICA_MAX_LAG_SECONDS
+    ):
+        yield primary
+        return
+    async with async_read_session() as session:
+        yield session
+
+
+def dialect_insert(session: AsyncSession, table):
+    """INSERT supporting ON CONFLICT for Postgres, or SQLite in tests."""
+    if session.bind.dialect.name == "sqlite":
+        return sqlite.insert(table)
+    return postgresql.insert(table)
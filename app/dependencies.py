@@ -2,13 +2,19 @@ import uuid
 
 import jwt
 from fastapi import Depends, HTTPException, Request
-from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_session
+from app.cache import TTLCache
+from app.config import settings
+from app.database import dialect_insert, get_session
 from app.models.client import Client
 from app.services.auth import decode_jwt
 
+# Client IDs already known to exist, so most requests skip the clients table
+_known_clients = TTLCache(
+    maxsize=settings.CLIENT_CACHE_SIZE, ttl=settings.CLIENT_CACHE_TTL_SECONDS
+)
+
 
 async def get_client_id(
     request: Request,
@@ -24,11 +30,14 @@ async def get_client_id(
     except (jwt.PyJWTError, ValueError):
         raise HTTPException(status_code=401, detail="Invalid or expired token")
 
-    # Ensure client record exists
-    result = await session.execute(select(Client).where(Client.id == user_id))
-    if result.scalar_one_or_none() is None:
-        client = Client(id=user_id)
-        session.add(client)
+    # Ensure client record exists; ON CONFLICT makes racing first requests safe
+    if _known_clients.get(user_id) is None:
+        await session.execute(
+            dialect_insert(session, Client.__table__)
+            .values(id=user_id)
+            .on_conflict_do_nothing(index_elements=["id"])
+        )
         await session.commit()
+        _known_clients.set(user_id, True)
 
     return user_id
@@ -1,5 +1,9 @@
 from fastapi import HTTPException, Request
 from fastapi.responses import JSONResponse
+from sqlalchemy import exc as sa_exc
+
+# Postgres SQLSTATE for a statement cancelled by statement_timeout
+QUERY_CANCELED = "57014"
 
 
 class AppError(HTTPException):
@@ -22,10 +26,13 @@ async def http_exception_handler(request: Request, exc: HTTPException) -> JSONRe
         401: "unauthorized",
         404: "not_found",
         409: "conflict",
+        410: "gone",
         413: "payload_too_large",
+        415: "unsupported_media_type",
         422: "validation_error",
         429: "rate_limited",
         502: "ai_provider_error",
+        503: "service_unavailable",
     }
     code = code_map.get(exc.status_code, "internal_error")
     return JSONResponse(
@@ -35,4 +42,24 @@ async def http_exception_handler(request: Request, exc: HTTPException) -> JSONRe
             "code": code,
             "detail": None,
         },
+        headers=exc.headers,
+    )
+
+
+async def database_overload_handler(
+    request: Request, exc: sa_exc.SQLAlchemyError
+) -> JSONResponse:
+    """Pool exhausted or statement_timeout hit: answer 503 now instead of queueing."""
+    if isinstance(exc, sa_exc.DBAPIError) and (
+        getattr(exc.orig, "sqlstate", None) != QUERY_CANCELED
+    ):
+        raise exc
+    return JSONResponse(
+        status_code=503,
+        content={
+            "error": "Database busy, retry shortly",
+            "code": "service_unavailable",
+            "detail": None,
+        },
+        headers={"Retry-After": "1"},
     )
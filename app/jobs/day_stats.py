@@ -0,0 +1,37 @@
+"""Rebuild the per-day counters behind /days from the source tables.
+
+``day_stats`` is maintained transactionally by every write path; this is the
+repair tool for after a backfill, a manual data fix or a bug.
+
+    python -m app.jobs.day_stats                   # all clients
+    python -m app.jobs.day_stats --client <uuid>   # one client
+"""
+
+import argparse
+import asyncio
+import uuid
+
+import structlog
+
+from app.database import async_jobs_session
+from app.services.day_stats import rebuild
+
+logger = structlog.get_logger()
+
+
+async def run(client_id: uuid.UUID | None) -> None:
+    async with async_jobs_session() as session:
+        days = await rebuild(session, client_id)
+        await session.commit()
+    logger.info("day_stats_rebuilt", client_id=str(client_id or "all"), days=days)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--client", type=uuid.UUID, default=None)
+    args = parser.parse_args()
+    asyncio.run(run(args.client))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+"""Rebuild the public calendar/archive/stats counters from published_posts.
+
+``public_post_daily`` is maintained by publish/unpublish; this is the repair
+tool after a backfill or a manual data fix.
+
+    python -m app.jobs.public_stats
+"""
+
+import argparse
+import asyncio
+
+import structlog
+
+from app import public_cache
+from app.database import async_jobs_session
+from app.services.public_stats import rebuild
+
+logger = structlog.get_logger()
+
+
+async def run() -> None:
+    async with async_jobs_session() as session:
+        rows = await rebuild(session)
+        await session.commit()
+    await public_cache.invalidate()
+    logger.info("public_stats_rebuilt", rows=rows)
+
+
+def main() -> None:
+    argparse.ArgumentParser(description=__doc__.splitlines()[0]).parse_args()
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+"""Rebuild the related-posts index from published_posts.
+
+Publish/unpublish keep RELATED_INDEX_DIR up to date incrementally; run this
+after changing RELATED_INDEX_DIM, on a new host, or if the index files were
+lost. Safe to run while the API serves: queries wait for the rebuild.
+
+    python -m app.jobs.related_index
+"""
+
+import argparse
+import asyncio
+
+import structlog
+
+from app.database import async_jobs_session
+from app.services.related import rebuild
+
+logger = structlog.get_logger()
+
+
+async def run() -> None:
+    async with async_jobs_session() as session:
+        count = await rebuild(session)
+    logger.info("related_index_rebuilt", posts=count)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.parse_args()
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
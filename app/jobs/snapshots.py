@@ -0,0 +1,32 @@
+"""Rewrite every static snapshot of the public posts and feeds.
+
+Publish/unpublish keep STATIC_SNAPSHOT_DIR up to date incrementally; run this
+after enabling snapshots, changing FEED_PAGE_SIZE or PUBLIC_API_URL, or a
+manual data fix. Files for posts that no longer exist are deleted.
+
+    python -m app.jobs.snapshots
+"""
+
+import argparse
+import asyncio
+
+from app.config import settings
+from app.database import async_jobs_session
+from app.services.snapshots import rebuild
+
+
+async def run() -> None:
+    async with async_jobs_session() as session:
+        await rebuild(session)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.parse_args()
+    if not settings.STATIC_SNAPSHOT_DIR:
+        parser.error("STATIC_SNAPSHOT_DIR is not set")
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Incremental garbage collector for orphaned uploads.
+
+Each run resumes from the cursor stored in ``job_cursors`` and reconciles at
+most UPLOAD_GC_MAX_BATCHES pages of UPLOAD_GC_BATCH_SIZE objects, so a run
+never walks the whole upload tree. Expired resumable-upload sessions are
+purged on the same schedule. Scheduled by launchd (com.daycast.upload-gc).
+
+    python -m app.jobs.upload_gc            # one incremental pass
+    python -m app.jobs.upload_gc --recount  # rebuild per-client usage counters
+"""
+
+import argparse
+import asyncio
+from datetime import timedelta
+
+import structlog
+
+from app.config import settings
+from app.database import async_jobs_session
+from app.models.job_cursor import JobCursor
+from app.services.file_storage import get_storage
+from app.services.upload_gc import collect_batch, recount_usage
+from app.services.upload_sessions import purge_expired
+
+logger = structlog.get_logger()
+
+JOB_NAME = "upload_gc"
+
+
+async def run_incremental() -> None:
+    storage = get_storage()
+    grace = timedelta(hours=settings.UPLOAD_GC_GRACE_HOURS)
+    async with async_jobs_session() as session:
+        await purge_expired(session)
+        await session.commit()
+
+        state = await session.get(JobCursor, JOB_NAME)
+        if state is None:
+            state = JobCursor(name=JOB_NAME)
+            session.add(state)
+        for _ in range(settings.UPLOAD_GC_MAX_BATCHES):
+            batch = await collect_batch(
+                session, storage, state.cursor, settings.UPLOAD_GC_BATCH_SIZE, grace
+            )
+            state.cursor = batch.cursor
+            await session.commit()
+            if batch.cursor is None:
+                break
+
+
+async def recount() -> None:
+    """Rebuild usage from a full listing. For backfills, not for cron."""
+    async with async_jobs_session() as session:
+        clients = await recount_usage(session, get_storage())
+        await session.commit()
+    logger.info("upload_usage_recounted", clients=clients)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--recount", action="store_true")
+    args = parser.parse_args()
+    asyncio.run(recount() if args.recount else run_incremental())
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,65 @@
+import asyncio
 import os
+import time
+from contextlib import asynccontextmanager
 from pathlib import Path
 
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import FileResponse
 from fastapi.staticfiles import StaticFiles
+from sqlalchemy import exc as sa_exc
+from starlette.middleware.base import BaseHTTPMiddleware
 
-from app.errors import AppError, app_error_handler, http_exception_handler
-from app.routers import auth, catalog, days, generate, health, inputs, public, publish, settings, uploads
+from app import database, public_cache
+from app.config import settings as app_settings
+from app.errors import (
+    AppError,
+    app_error_handler,
+    database_overload_handler,
+    http_exception_handler,
+)
+from app.routers import (
+    auth,
+    catalog,
+    days,
+    generate,
+    health,
+    inputs,
+    public,
+    publish,
+    search,
+    settings,
+    upload_sessions,
+    uploads,
+    websub,
+)
+from app.services import snapshots, view_counts
+from app.services import websub as websub_service
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    listener = None
+    if public_cache.backend() == "postgres":
+        listener = asyncio.create_task(public_cache.listen())
+    pusher = asyncio.create_task(websub_service.run_worker())
+    flusher = asyncio.create_task(view_counts.run_flusher())
+    archiver = asyncio.create_task(snapshots.run_writer())
+    yield
+    pusher.cancel()
+    flusher.cancel()
+    archiver.cancel()
+    await view_counts.flush()  # don't lose the last interval on a clean stop
+    await snapshots.flush()
+    if listener is not None:
+        listener.cancel()
 
-app = FastAPI(title="DayCast API", version="0.1.0")
 
+app = FastAPI(title="DayCast API", version="0.1.0", lifespan=lifespan)
+
+# Added before CORS so it runs inside it: cached responses still get CORS headers
+app.add_middleware(BaseHTTPMiddleware, dispatch=public_cache.serve)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -19,19 +68,47 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+@app.middleware("http")
+async def remember_writes(request: Request, call_next):
+    """Mark browsers that just wrote so their reads skip the replica (see
+    get_read_session) and the per-worker public cache. Anonymous /public POSTs
+    (the view beacon) change nothing a reader would read back."""
+    response = await call_next(request)
+    if (
+        (database.read_engine is not None or app_settings.PUBLIC_CACHE_TTL_SECONDS > 0)
+        and request.method not in ("GET", "HEAD", "OPTIONS")
+        and not request.url.path.startswith(public_cache.PREFIX)
+        and response.status_code < 400
+    ):
+        response.set_cookie(
+            database.LAST_WRITE_COOKIE,
+            str(time.time()),
+            max_age=app_settings.READ_YOUR_WRITES_SECONDS,
+            httponly=True,
+            samesite="lax",
+        )
+    return response
+
+
 app.add_exception_handler(AppError, app_error_handler)
 app.add_exception_handler(HTTPException, http_exception_handler)
+app.add_exception_handler(sa_exc.TimeoutError, database_overload_handler)
+app.add_exception_handler(sa_exc.DBAPIError, database_overload_handler)
 
 app.include_router(health.router, prefix="/api/v1")
 app.include_router(auth.router, prefix="/api/v1")
+app.include_router(upload_sessions.router, prefix="/api/v1")
 app.include_router(inputs.router, prefix="/api/v1")
 app.include_router(uploads.router, prefix="/api/v1")
 app.include_router(generate.router, prefix="/api/v1")
 app.include_router(days.router, prefix="/api/v1")
+app.include_router(search.router, prefix="/api/v1")
 app.include_router(catalog.router, prefix="/api/v1")
 app.include_router(settings.router, prefix="/api/v1")
 app.include_router(publish.router, prefix="/api/v1")
 app.include_router(public.router, prefix="/api/v1")
+app.include_router(websub.router, prefix="/api/v1")
 
 # Serve static web files (replaces Caddy on Big Sur)
 WEB_DIST = Path(os.environ.get("WEB_DIST_DIR", Path.home() / "daycast" / "web-dist"))
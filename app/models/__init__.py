@@ -14,3 +14,12 @@ from app.models.channel_setting import ChannelSetting  # noqa: E402, F401
 from app.models.user import User  # noqa: E402, F401
 from app.models.published_post import PublishedPost  # noqa: E402, F401
 from app.models.generation_settings import GenerationSettings  # noqa: E402, F401
+from app.models.client_storage_usage import ClientStorageUsage  # noqa: E402, F401
+from app.models.job_cursor import JobCursor  # noqa: E402, F401
+from app.models.upload_session import UploadSession  # noqa: E402, F401
+from app.models.generation_quota_usage import GenerationQuotaUsage  # noqa: E402, F401
+from app.models.day_stats import DayStats  # noqa: E402, F401
+from app.models.public_post_daily import PublicPostDaily  # noqa: E402, F401
+from app.models.websub_subscription import WebSubSubscription  # noqa: E402, F401
+from app.models.post_view import PostView  # noqa: E402, F401
+from app.models.counted_upload import CountedUpload  # noqa: E402, F401
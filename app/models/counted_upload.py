@@ -0,0 +1,29 @@
+import uuid
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import BigInteger, DateTime, ForeignKey, Text, func
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models import Base
+
+
+class CountedUpload(Base):
+    """A stored upload included in its client's ``client_storage_usage``.
+
+    The upload GC gives back exactly what was counted, so objects that never
+    were (abandoned direct uploads) don't drive the counters negative.
+    """
+
+    __tablename__ = "counted_uploads"
+
+    key: Mapped[str] = mapped_column(Text, primary_key=True)
+    client_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("clients.id", ondelete="CASCADE")
+    )
+    # NULL for rows backfilled by migration 020: the stored object's size
+    size: Mapped[Optional[int]] = mapped_column(BigInteger, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now()
+    )
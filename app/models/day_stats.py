@@ -0,0 +1,29 @@
+import uuid
+from datetime import date, datetime
+
+from sqlalchemy import Date, DateTime, ForeignKey, Integer
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models import Base
+
+
+class DayStats(Base):
+    """Per-day counters behind /days, maintained by app.services.day_stats."""
+
+    __tablename__ = "day_stats"
+
+    client_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("clients.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    date: Mapped[date] = mapped_column(Date, primary_key=True)
+    input_count: Mapped[int] = mapped_column(Integer, server_default="0", default=0)
+    generation_count: Mapped[int] = mapped_column(
+        Integer, server_default="0", default=0
+    )
+    published_count: Mapped[int] = mapped_column(
+        Integer, server_default="0", default=0
+    )
+    last_activity_at: Mapped[datetime] = mapped_column(DateTime(timezone=True))
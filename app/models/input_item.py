@@ -3,7 +3,18 @@ from datetime import date, datetime
 
 from typing import Optional
 
-from sqlalchemy import Boolean, Date, DateTime, ForeignKey, Index, Integer, String, Text, func
+from sqlalchemy import (
+    Boolean,
+    Date,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+    func,
+    text,
+)
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -14,6 +25,15 @@ class InputItem(Base):
     __tablename__ = "input_items"
     __table_args__ = (
         Index("idx_input_items_client_date", "client_id", "date"),
+        # Live items of a day in display order (/inputs, /generate, previews)
+        Index(
+            "idx_input_items_client_date_live",
+            "client_id",
+            "date",
+            "created_at",
+            postgresql_where=text("NOT cleared"),
+            sqlite_where=text("cleared = 0"),
+        ),
     )
 
     id: Mapped[uuid.UUID] = mapped_column(
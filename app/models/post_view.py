@@ -0,0 +1,25 @@
+import uuid
+from datetime import datetime
+
+from sqlalchemy import BigInteger, DateTime, ForeignKey, Index, func
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models import Base
+
+
+class PostView(Base):
+    """View count of a public post, flushed in batches by app.services.view_counts."""
+
+    __tablename__ = "post_views"
+    __table_args__ = (Index("idx_post_views_view_count", "view_count"),)
+
+    post_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("published_posts.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    view_count: Mapped[int] = mapped_column(BigInteger, server_default="0", default=0)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now()
+    )
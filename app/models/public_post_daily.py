@@ -0,0 +1,24 @@
+from datetime import date
+
+from sqlalchemy import Date, Index, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models import Base
+
+
+class PublicPostDaily(Base):
+    """Published posts per day and channel, behind /public calendar/archive/stats.
+
+    Site-wide (the public blog has no per-client view). Input-sourced posts
+    are counted under channel "". Maintained by app.services.public_stats.
+    """
+
+    __tablename__ = "public_post_daily"
+    __table_args__ = (Index("idx_public_post_daily_month", "month"),)
+
+    date: Mapped[date] = mapped_column(Date, primary_key=True)
+    channel_id: Mapped[str] = mapped_column(String(32), primary_key=True)
+    # First day of the month, stored so the archive can group without date
+    # functions that differ between Postgres and SQLite
+    month: Mapped[date] = mapped_column(Date)
+    post_count: Mapped[int] = mapped_column(Integer, server_default="0", default=0)
@@ -1,8 +1,18 @@
 import uuid
-from datetime import datetime
+from datetime import date, datetime
 from typing import Optional
 
-from sqlalchemy import DateTime, ForeignKey, Index, Text, func
+from sqlalchemy import (
+    JSON,
+    Date,
+    DateTime,
+    ForeignKey,
+    Index,
+    String,
+    Text,
+    func,
+    text,
+)
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -12,7 +22,25 @@ from app.models import Base
 class PublishedPost(Base):
     __tablename__ = "published_posts"
     __table_args__ = (
-        Index("idx_published_posts_published_at", "published_at"),
+        # Public feed: one index per filter, each ending in the keyset cursor
+        Index("idx_published_posts_feed", "published_at", "id"),
+        Index("idx_published_posts_channel_feed", "channel_id", "published_at", "id"),
+        Index("idx_published_posts_language_feed", "language", "published_at", "id"),
+        Index(
+            "idx_published_posts_channel_language_feed",
+            "channel_id",
+            "language",
+            "published_at",
+            "id",
+        ),
+        Index("idx_published_posts_date_feed", "date", "published_at", "id"),
+        Index("idx_published_posts_client_id", "client_id"),
+        Index(
+            "idx_published_posts_input_item_id",
+            "input_item_id",
+            postgresql_where=text("input_item_id IS NOT NULL"),
+            sqlite_where=text("input_item_id IS NOT NULL"),
+        ),
     )
 
     id: Mapped[uuid.UUID] = mapped_column(
@@ -34,6 +62,16 @@ class PublishedPost(Base):
     )
     slug: Mapped[str] = mapped_column(Text, unique=True, nullable=False)
     text: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    # Snapshot of the feed-facing fields taken at publish time, so public
+    # reads never join generation_results / generations / input_items
+    source: Mapped[str] = mapped_column(
+        String(16), server_default="generation", default="generation"
+    )
+    date: Mapped[date] = mapped_column(Date)
+    channel_id: Mapped[Optional[str]] = mapped_column(String(32), nullable=True)
+    style: Mapped[Optional[str]] = mapped_column(String(32), nullable=True)
+    language: Mapped[Optional[str]] = mapped_column(String(8), nullable=True)
+    preview: Mapped[list[str]] = mapped_column(JSON, server_default="[]", default=list)
     published_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now()
     )
@@ -0,0 +1,50 @@
+import uuid
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import (
+    DateTime,
+    Index,
+    Integer,
+    String,
+    Text,
+    UniqueConstraint,
+    func,
+)
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models import Base
+
+
+class WebSubSubscription(Base):
+    """A verified WebSub subscriber of a public feed, with its pending push.
+
+    ``next_delivery_at`` is set when the feed changes and cleared once the
+    callback accepts the new content (or retries are exhausted).
+    """
+
+    __tablename__ = "websub_subscriptions"
+    __table_args__ = (
+        UniqueConstraint(
+            "topic", "callback", name="uq_websub_subscriptions_topic_callback"
+        ),
+        Index("idx_websub_subscriptions_next_delivery_at", "next_delivery_at"),
+        Index("idx_websub_subscriptions_lease_expires_at", "lease_expires_at"),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+    )
+    topic: Mapped[str] = mapped_column(String(512))
+    callback: Mapped[str] = mapped_column(String(2048))
+    secret: Mapped[Optional[str]] = mapped_column(String(200), nullable=True)
+    lease_expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+    next_delivery_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+    attempts: Mapped[int] = mapped_column(Integer, server_default="0", default=0)
+    last_error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now()
+    )
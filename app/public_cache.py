@@ -0,0 +1,238 @@
+"""Response cache for the anonymous /public endpoints.
+
+Public pages change only when a post is published or unpublished, so the
+serialized response for each path + query string is kept until the publish
+endpoints call ``invalidate()`` (or PUBLIC_CACHE_TTL_SECONDS passes).
+Concurrent misses for one key share a single computation, and every cached
+response carries a content ETag, so a revalidating browser or feed reader
+(If-None-Match, or If-Modified-Since against the endpoint's Last-Modified)
+gets a 304 without the request reaching a router, a session or the database.
+
+With the "postgres" backend invalidation is shared: ``invalidate()`` sends
+NOTIFY on the ``public_cache`` channel and every worker LISTENs on a dedicated
+connection. With "memory" other workers keep serving their copy for up to the
+TTL, so it only suits a single worker. Unless PUBLIC_CACHE_BACKEND says
+otherwise, a Postgres database gets "postgres" (see ``backend()``).
+
+Signed-in requests and browsers that just wrote bypass the cache, as they
+bypass the read replica (see app.database.get_read_session).
+"""
+
+import asyncio
+import hashlib
+from collections.abc import Awaitable, Callable, Hashable
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+
+import asyncpg
+import structlog
+from fastapi import Request, Response
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+
+from app import database
+from app.cache import TTLCache
+from app.config import settings
+
+logger = structlog.get_logger()
+
+PREFIX = "/api/v1/public/"
+CHANNEL = "public_cache"
+
+# Served from disk with their own long-lived headers (app/services/og_images.py)
+_UNCACHED_SUFFIXES = ("/og.png",)
+
+# Per-request headers that must not be replayed from the cache
+_UNCACHED_HEADERS = {"content-length", "set-cookie", "etag", "cache-control", "x-cache"}
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    status_code: int
+    body: bytes
+    headers: dict[str, str]
+    etag: str
+
+
+class PublicResponseCache:
+    """TTL/LRU store of rendered responses with single-flight misses."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._entries = TTLCache(maxsize, ttl)
+        self._inflight: dict[Hashable, asyncio.Future] = {}
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+
+    def invalidate(self) -> None:
+        """Drop every entry. Misses already in flight won't store their result."""
+        self.version += 1
+        self._entries.clear()
+
+    async def get_or_compute(
+        self, key: Hashable, compute: Callable[[], Awaitable[CachedResponse]]
+    ) -> tuple[CachedResponse, bool]:
+        """Return (response, hit). Only one ``compute`` per key runs at a time."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            return entry, True
+        pending = self._inflight.get(key)
+        if pending is not None:
+            entry = await asyncio.shield(pending)
+            if entry is not None:
+                self.hits += 1
+                return entry, True
+            # The computing request was cancelled: compute for ourselves
+            return await compute(), False
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        version = self.version
+        try:
+            entry = await compute()
+        except asyncio.CancelledError:
+            future.set_result(None)
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # retrieved: waiters re-raise it, no warning if none
+            raise
+        finally:
+            self._inflight.pop(key, None)
+        future.set_result(entry)
+        if entry.status_code == 200 and version == self.version:
+            self._entries.set(key, entry)
+        return entry, False
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+cache = PublicResponseCache(
+    settings.PUBLIC_CACHE_SIZE, settings.PUBLIC_CACHE_TTL_SECONDS
+)
+
+
+def _etag(body: bytes) -> str:
+    return f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates
+
+
+def _not_modified(request: Request, entry: CachedResponse) -> bool:
+    # If-None-Match wins over If-Modified-Since when both are sent (RFC 9110)
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        return _etag_matches(if_none_match, entry.etag)
+    last_modified = entry.headers.get("last-modified")
+    if_modified_since = request.headers.get("if-modified-since")
+    if not (last_modified and if_modified_since):
+        return False
+    try:
+        return parsedate_to_datetime(last_modified) <= parsedate_to_datetime(
+            if_modified_since
+        )
+    except (TypeError, ValueError):
+        return False
+
+
+def _bypass(request: Request) -> bool:
+    return (
+        request.method != "GET"
+        or not request.url.path.startswith(PREFIX)
+        or request.url.path.endswith(_UNCACHED_SUFFIXES)
+        or "authorization" in request.headers
+        or database.wrote_recently(request)
+    )
+
+
+async def serve(request: Request, call_next) -> Response:
+    """HTTP middleware: answer public GETs from the cache when possible."""
+    if _bypass(request):
+        return await call_next(request)
+
+    async def compute() -> CachedResponse:
+        response = await call_next(request)
+        body = b"".join([chunk async for chunk in response.body_iterator])
+        headers = {
+            name: value
+            for name, value in response.headers.items()
+            if name not in _UNCACHED_HEADERS
+        }
+        return CachedResponse(response.status_code, body, headers, _etag(body))
+
+    key = (request.url.path, str(request.query_params))
+    entry, hit = await cache.get_or_compute(key, compute)
+    if entry.status_code != 200:
+        return Response(
+            entry.body, status_code=entry.status_code, headers=entry.headers
+        )
+
+    headers = {
+        "ETag": entry.etag,
+        "Cache-Control": f"public, max-age={settings.PUBLIC_CACHE_MAX_AGE_SECONDS}",
+        "X-Cache": "HIT" if hit else "MISS",
+    }
+    if _not_modified(request, entry):
+        if "last-modified" in entry.headers:
+            headers["Last-Modified"] = entry.headers["last-modified"]
+        return Response(status_code=304, headers=headers)
+    return Response(entry.body, status_code=200, headers={**entry.headers, **headers})
+
+
+def backend() -> str:
+    """PUBLIC_CACHE_BACKEND, or the shared backend whenever LISTEN can work."""
+    if settings.PUBLIC_CACHE_BACKEND:
+        return settings.PUBLIC_CACHE_BACKEND
+    url = make_url(settings.DATABASE_URL)
+    if url.get_backend_name() == "postgresql" and not settings.DB_PGBOUNCER:
+        return "postgres"
+    return "memory"
+
+
+async def invalidate() -> None:
+    """Call after committing a publish/unpublish."""
+    cache.invalidate()
+    if backend() != "postgres":
+        return
+    try:
+        async with database.engine.begin() as conn:
+            await conn.execute(text(f"NOTIFY {CHANNEL}"))
+    except Exception as e:
+        # Other workers catch up when their entries expire
+        logger.warning("public_cache_notify_failed", error=str(e))
+
+
+def _listen_dsn() -> str:
+    url = make_url(settings.DATABASE_URL).set(drivername="postgresql")
+    return url.render_as_string(hide_password=False)
+
+
+async def listen(retry_seconds: float = 5.0) -> None:
+    """Drop this worker's cache whenever any worker publishes. Runs until cancelled."""
+    while True:
+        try:
+            conn = await asyncpg.connect(_listen_dsn())
+        except Exception as e:
+            logger.warning("public_cache_listener_unavailable", error=str(e))
+            await asyncio.sleep(retry_seconds)
+            continue
+        closed = asyncio.Event()
+        try:
+            conn.add_termination_listener(lambda _conn: closed.set())
+            await conn.add_listener(CHANNEL, lambda *_: cache.invalidate())
+            # Notifications sent while we were disconnected are lost
+            cache.invalidate()
+            await closed.wait()
+            logger.warning("public_cache_listener_disconnected")
+        finally:
+            if not conn.is_closed():
+                await conn.close()
+        await asyncio.sleep(retry_seconds)
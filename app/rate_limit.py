@@ -1,19 +1,179 @@
+import asyncio
 import time
 import uuid
-from collections import defaultdict
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Hashable
 from datetime import date
 
+import structlog
 from fastapi import Depends, HTTPException
-from sqlalchemy import func, select
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
 
-from app.database import get_session
+from app.config import settings
+from app.database import engine, get_session
 from app.dependencies import get_client_id
-from app.models.generation import Generation
+from app.services.generation_quota import release_generation, reserve_generation
 from app.services.product_config import get_product_config
 
-# In-memory store for API rate limiting: {client_id: [timestamp, ...]}
-_request_log: dict[str, list[float]] = defaultdict(list)
+
+class SlidingWindowLimiter:
+    """Sliding-window-counter rate limiter with O(1) work per check.
+
+    Each key keeps three numbers — [window_start, previous_count, current_count] —
+    and the rate is estimated as ``previous * (1 - elapsed / window) + current``.
+    Keys are kept in LRU order: idle keys (no hit for two windows) are evicted
+    from the cold end, and at most ``max_keys`` are ever held.
+    """
+
+    def __init__(self, window: float = 60.0, max_keys: int = 100_000):
+        self.window = window
+        self.max_keys = max_keys
+        self._state: OrderedDict[Hashable, list] = OrderedDict()
+
+    def hit(self, key: Hashable, limit: int, now: float | None = None) -> bool:
+        """Count one request for ``key``; False if it would exceed ``limit``."""
+        if now is None:
+            now = time.monotonic()
+        window_start = now - (now % self.window)
+
+        state = self._state.get(key)
+        if state is None:
+            state = [window_start, 0, 0]
+        elif state[0] != window_start:
+            # Roll forward: last window becomes "previous", older ones drop out
+            previous = state[2] if window_start - state[0] == self.window else 0
+            state = [window_start, previous, 0]
+        self._state[key] = state
+        self._state.move_to_end(key)
+        self._evict(window_start)
+
+        weight = 1.0 - (now - window_start) / self.window
+        if state[1] * weight + state[2] >= limit:
+            return False
+        state[2] += 1
+        return True
+
+    def _evict(self, window_start: float) -> None:
+        idle_before = window_start - self.window
+        while self._state:
+            oldest = next(iter(self._state.values()))
+            if len(self._state) <= self.max_keys and oldest[0] >= idle_before:
+                break
+            self._state.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._state)
+
+
+logger = structlog.get_logger()
+
+
+class RateLimitBackend:
+    """Where limiter state lives. ``hit`` counts one request and says if it fits."""
+
+    async def hit(self, key: str, limit: int, window: float) -> bool:
+        raise NotImplementedError
+
+
+class MemoryRateLimitBackend(RateLimitBackend):
+    """Per-process state — each uvicorn worker enforces the limit on its own."""
+
+    def __init__(self):
+        self._limiters: dict[float, SlidingWindowLimiter] = {}
+
+    async def hit(self, key: str, limit: int, window: float) -> bool:
+        limiter = self._limiters.get(window)
+        if limiter is None:
+            limiter = self._limiters[window] = SlidingWindowLimiter(window=window)
+        return limiter.hit(key, limit)
+
+
+# Counts the request only if it fits, like SlidingWindowLimiter: rejected
+# requests don't hold the key over the limit. The conflict branch re-checks
+# against the locked row, so concurrent hits can't overshoot.
+_PG_HIT = text(
+    """
+    WITH prev AS (
+        SELECT COALESCE(
+            (SELECT count FROM rate_limit_counters
+             WHERE key = :key AND window_start = :previous_start),
+            0
+        ) * :weight AS estimate
+    ),
+    cur AS (
+        INSERT INTO rate_limit_counters AS c (key, window_start, count)
+        SELECT :key, :window_start, 1 FROM prev WHERE prev.estimate < :limit
+        ON CONFLICT (key, window_start)
+        DO UPDATE SET count = c.count + 1
+        WHERE c.count + (SELECT estimate FROM prev) < :limit
+        RETURNING count
+    )
+    SELECT EXISTS (SELECT 1 FROM cur)
+    """
+)
+_PG_PRUNE = text("DELETE FROM rate_limit_counters WHERE window_start < :before")
+
+
+class PostgresRateLimitBackend(RateLimitBackend):
+    """Shared sliding-window counters in the UNLOGGED ``rate_limit_counters`` table.
+
+    One atomic conditional upsert per check gives the same limit across every
+    worker and node; as in memory, rejected requests aren't counted. If
+    Postgres is slow or down, checks fall back to a local
+    MemoryRateLimitBackend for RATE_LIMIT_RETRY_SECONDS before trying again.
+    """
+
+    def __init__(self, db_engine: AsyncEngine):
+        self.engine = db_engine
+        self.fallback = MemoryRateLimitBackend()
+        self._retry_at = 0.0
+        self._next_prune = 0.0
+
+    async def _shared_hit(self, key: str, limit: int, window: float) -> bool:
+        now = time.time()
+        window_start = int(now // window * window)
+        async with self.engine.begin() as conn:
+            result = await conn.execute(
+                _PG_HIT,
+                {
+                    "key": key,
+                    "window_start": window_start,
+                    "previous_start": window_start - int(window),
+                    "weight": 1.0 - (now - window_start) / window,
+                    "limit": limit,
+                },
+            )
+            allowed = result.scalar_one()
+            if now >= self._next_prune:
+                self._next_prune = now + window
+                await conn.execute(_PG_PRUNE, {"before": window_start - int(window)})
+        return allowed
+
+    async def hit(self, key: str, limit: int, window: float) -> bool:
+        if time.monotonic() >= self._retry_at:
+            try:
+                return await asyncio.wait_for(
+                    self._shared_hit(key, limit, window),
+                    timeout=settings.RATE_LIMIT_BACKEND_TIMEOUT_SECONDS,
+                )
+            except Exception as e:
+                self._retry_at = time.monotonic() + settings.RATE_LIMIT_RETRY_SECONDS
+                logger.warning("rate_limit_backend_unavailable", error=str(e))
+        return await self.fallback.hit(key, limit, window)
+
+
+_backend: RateLimitBackend | None = None
+
+
+def get_rate_limit_backend() -> RateLimitBackend:
+    global _backend
+    if _backend is None:
+        if settings.RATE_LIMIT_BACKEND == "postgres":
+            _backend = PostgresRateLimitBackend(engine)
+        else:
+            _backend = MemoryRateLimitBackend()
+    return _backend
 
 
 async def check_api_rate_limit(
@@ -23,37 +183,44 @@ async def check_api_rate_limit(
     config = get_product_config()
     limit = config["rate_limits"]["api_requests_per_minute"]
 
-    key = str(client_id)
-    now = time.monotonic()
-    cutoff = now - 60
-
-    # Clean old entries
-    _request_log[key] = [t for t in _request_log[key] if t > cutoff]
-
-    if len(_request_log[key]) >= limit:
+    if not await get_rate_limit_backend().hit(f"api:{client_id}", limit, 60.0):
         raise HTTPException(status_code=429, detail="Rate limit exceeded")
 
-    _request_log[key].append(now)
-
 
-async def check_generation_rate_limit(
+async def reserve_generation_quota(
     client_id: uuid.UUID = Depends(get_client_id),
     session: AsyncSession = Depends(get_session),
-) -> None:
-    """Check AI generations per day rate limit."""
+) -> AsyncIterator[None]:
+    """Reserve one AI generation from today's quota for the request.
+
+    The reservation is returned if the endpoint fails (bad input, AI error)
+    or is cancelled (client disconnect), so only generations that were
+    actually saved count against the limit.
+    """
     config = get_product_config()
     limit = config["rate_limits"]["ai_generations_per_day"]
+    today = date.today()
 
-    result = await session.execute(
-        select(func.count(Generation.id)).where(
-            Generation.client_id == client_id,
-            Generation.date == date.today(),
-        )
-    )
-    count = result.scalar_one()
-
-    if count >= limit:
+    if not await reserve_generation(session, client_id, today, limit):
         raise HTTPException(
             status_code=429,
             detail=f"Generation limit exceeded ({limit}/day)",
         )
+    try:
+        yield
+    except Exception:
+        await session.rollback()
+        await release_generation(session, client_id, today)
+        raise
+    except BaseException:
+        # Cancelled: the request's session may be mid-statement, so release on
+        # a fresh one, shielded so the cancellation can't interrupt it too
+        await asyncio.shield(_release_detached(session, client_id, today))
+        raise
+
+
+async def _release_detached(
+    session: AsyncSession, client_id: uuid.UUID, day: date
+) -> None:
+    async with AsyncSession(session.bind) as fresh:
+        await release_generation(fresh, client_id, day)
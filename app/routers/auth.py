@@ -6,11 +6,25 @@ from app.database import get_session
 from app.models.client import Client
 from app.models.user import User
 from app.schemas.auth import AuthResponse, LoginRequest, RegisterRequest
-from app.services.auth import create_jwt, hash_password, verify_password
+from app.services.auth import (
+    PasswordHasherBusyError,
+    create_jwt,
+    hash_password_async,
+    password_needs_rehash,
+    verify_password_async,
+)
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
 
+def _busy() -> HTTPException:
+    return HTTPException(
+        status_code=429,
+        detail="Too many login attempts, try again shortly",
+        headers={"Retry-After": "1"},
+    )
+
+
 @router.post("/register", response_model=AuthResponse, status_code=201)
 async def register(
     body: RegisterRequest,
@@ -22,9 +36,14 @@ async def register(
     if result.scalar_one_or_none() is not None:
         raise HTTPException(status_code=409, detail="Username already taken")
 
+    try:
+        password_hash = await hash_password_async(body.password)
+    except PasswordHasherBusyError:
+        raise _busy()
+
     user = User(
         username=body.username,
-        password_hash=hash_password(body.password),
+        password_hash=password_hash,
     )
     session.add(user)
     await session.flush()
@@ -47,8 +66,22 @@ async def login(
         select(User).where(User.username == body.username)
     )
     user = result.scalar_one_or_none()
-    if user is None or not verify_password(body.password, user.password_hash):
+    if user is None:
+        raise HTTPException(status_code=401, detail="Invalid username or password")
+    try:
+        valid = await verify_password_async(body.password, user.password_hash)
+    except PasswordHasherBusyError:
+        raise _busy()
+    if not valid:
         raise HTTPException(status_code=401, detail="Invalid username or password")
 
+    # Transparently upgrade hashes made with an older BCRYPT_ROUNDS
+    if password_needs_rehash(user.password_hash):
+        try:
+            user.password_hash = await hash_password_async(body.password)
+            await session.commit()
+        except PasswordHasherBusyError:
+            pass  # not worth failing a valid login; retry on the next one
+
     token = create_jwt(user.id)
     return AuthResponse(token=token, username=user.username)
@@ -6,11 +6,23 @@ from sqlalchemy import delete, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
+from app import public_cache
 from app.database import get_session
 from app.dependencies import get_client_id
+from app.models.day_stats import DayStats
 from app.models.generation import Generation
 from app.models.input_item import InputItem
-from app.schemas.day import DayListResponse, DayResponse, DaySummary
+from app.models.published_post import PublishedPost
+from app.schemas.day import (
+    ActivityResponse,
+    DayActivity,
+    DayListResponse,
+    DayResponse,
+    DaySummary,
+)
+from app.services import related, snapshots, websub
+from app.services.day_stats import forget_day
+from app.services.public_stats import forget_client_day
 
 router = APIRouter(prefix="/days", tags=["days"])
 
@@ -23,44 +35,51 @@ async def list_days(
     cursor: str | None = Query(default=None),
     search: str | None = Query(default=None),
 ):
-    # Subquery: distinct dates from input_items
-    items_q = (
+    # Counters come from day_stats: a range scan on its primary key
+    query = (
         select(
-            InputItem.date,
-            func.count(InputItem.id).label("input_count"),
+            DayStats.date,
+            DayStats.input_count,
+            DayStats.generation_count,
+            DayStats.published_count,
+            DayStats.last_activity_at,
         )
-        .where(InputItem.client_id == client_id)
-        .group_by(InputItem.date)
+        .where(DayStats.client_id == client_id, DayStats.input_count > 0)
+        .order_by(DayStats.date.desc())
     )
-    if search:
-        items_q = items_q.where(InputItem.content.ilike(f"%{search}%"))
 
-    items_sub = items_q.subquery()
-
-    # Subquery: generation counts per date
-    gen_sub = (
-        select(
-            Generation.date,
-            func.count(Generation.id).label("generation_count"),
+    if search:
+        # Only days with matching items, counting the matches
+        items_sub = (
+            select(
+                InputItem.date,
+                func.count(InputItem.id).label("input_count"),
+            )
+            .where(
+                InputItem.client_id == client_id,
+                InputItem.content.ilike(f"%{search}%"),
+            )
+            .group_by(InputItem.date)
+            .subquery()
         )
-        .where(Generation.client_id == client_id)
-        .group_by(Generation.date)
-        .subquery()
-    )
-
-    # Join
-    query = (
-        select(
-            items_sub.c.date,
-            items_sub.c.input_count,
-            func.coalesce(gen_sub.c.generation_count, 0).label("generation_count"),
+        query = (
+            select(
+                items_sub.c.date,
+                items_sub.c.input_count,
+                DayStats.generation_count,
+                DayStats.published_count,
+                DayStats.last_activity_at,
+            )
+            .join(
+                DayStats,
+                (DayStats.client_id == client_id)
+                & (DayStats.date == items_sub.c.date),
+            )
+            .order_by(items_sub.c.date.desc())
         )
-        .outerjoin(gen_sub, items_sub.c.date == gen_sub.c.date)
-        .order_by(items_sub.c.date.desc())
-    )
 
     if cursor:
-        query = query.where(items_sub.c.date < cursor)
+        query = query.where(DayStats.date < cursor)
 
     query = query.limit(limit + 1)  # fetch one extra for cursor
 
@@ -75,6 +94,8 @@ async def list_days(
             date=row.date,
             input_count=row.input_count,
             generation_count=row.generation_count,
+            published_count=row.published_count,
+            last_activity_at=row.last_activity_at,
         )
         for row in rows
     ]
@@ -83,6 +104,39 @@ async def list_days(
     return DayListResponse(items=summaries, cursor=next_cursor)
 
 
+@router.get("/activity", response_model=ActivityResponse)
+async def get_activity(
+    client_id: uuid.UUID = Depends(get_client_id),
+    session: AsyncSession = Depends(get_session),
+    year: int = Query(default_factory=lambda: date.today().year, ge=1970, le=9999),
+):
+    """Per-day counts for a calendar heatmap; days without activity are omitted."""
+    result = await session.execute(
+        select(
+            DayStats.date,
+            DayStats.input_count,
+            DayStats.generation_count,
+            DayStats.published_count,
+        )
+        .where(
+            DayStats.client_id == client_id,
+            DayStats.date >= date(year, 1, 1),
+            DayStats.date <= date(year, 12, 31),
+        )
+        .order_by(DayStats.date)
+    )
+    days = [
+        DayActivity(
+            date=row.date,
+            input_count=row.input_count,
+            generation_count=row.generation_count,
+            published_count=row.published_count,
+        )
+        for row in result.all()
+    ]
+    return ActivityResponse(year=year, days=days)
+
+
 @router.get("/{day}", response_model=DayResponse)
 async def get_day(
     day: date,
@@ -119,6 +173,20 @@ async def delete_day(
     client_id: uuid.UUID = Depends(get_client_id),
     session: AsyncSession = Depends(get_session),
 ):
+    # Published posts would cascade away with their sources; uncount them
+    # from the public aggregates first
+    removal = await snapshots.before_removal(
+        session, PublishedPost.client_id == client_id, PublishedPost.date == day
+    )
+    removed = await related.before_removal(
+        session, PublishedPost.client_id == client_id, PublishedPost.date == day
+    )
+    published = await forget_client_day(session, client_id, day)
+    await session.execute(
+        delete(PublishedPost).where(
+            PublishedPost.client_id == client_id, PublishedPost.date == day
+        )
+    )
     # Delete generations (results cascade via FK)
     await session.execute(
         delete(Generation).where(
@@ -131,4 +199,12 @@ async def delete_day(
             InputItem.client_id == client_id, InputItem.date == day
         )
     )
+    await forget_day(session, client_id, day)
+    if published:
+        await websub.schedule_delivery(session)
     await session.commit()
+    if published:
+        await public_cache.invalidate()
+        websub.notify()
+        await snapshots.after_removal(session, removal)
+        await related.after_removal(removed)
@@ -15,7 +15,8 @@ from app.models.generation_settings import GenerationSettings
 from app.models.input_item import InputItem
 from app.schemas.generation import GenerateRequest, GenerationResponse, RegenerateRequest
 from app.services.ai import generate, regenerate as ai_regenerate
-from app.rate_limit import check_generation_rate_limit
+from app.rate_limit import reserve_generation_quota
+from app.services.day_stats import bump_day
 from app.services.product_config import get_channels
 
 router = APIRouter(tags=["generate"])
@@ -24,7 +25,7 @@ router = APIRouter(tags=["generate"])
 @router.post("/generate", response_model=GenerationResponse, status_code=201)
 async def create_generation(
     body: GenerateRequest,
-    _rate: None = Depends(check_generation_rate_limit),
+    _quota: None = Depends(reserve_generation_quota),
     client_id: uuid.UUID = Depends(get_client_id),
     session: AsyncSession = Depends(get_session),
 ):
@@ -97,6 +98,10 @@ async def create_generation(
         for item in items
     ]
 
+    # Release the pooled connection for the AI call (up to a minute);
+    # everything it needs is loaded, and saving below checks out a new one.
+    await session.close()
+
     # 6. Call AI
     try:
         ai_results, model_used, latency_ms = await generate(
@@ -124,9 +129,9 @@ async def create_generation(
 
     for ai_r in ai_results:
         ch_id = ai_r["channel_id"]
-        cs = cs_map.get(ch_id, None)
-        style = body.style_override or (cs.default_style if cs else "casual")
-        language = body.language_override or (cs.default_language if cs else "ru")
+        cs = channel_settings.get(ch_id, {})
+        style = body.style_override or cs.get("default_style", "casual")
+        language = body.language_override or cs.get("default_language", "ru")
         gr = GenerationResult(
             generation_id=generation.id,
             channel_id=ch_id,
@@ -138,6 +143,7 @@ async def create_generation(
         )
         session.add(gr)
 
+    await bump_day(session, client_id, generation.date, generations=1)
     await session.commit()
 
     # 7. Reload with results for response
@@ -158,7 +164,7 @@ async def create_generation(
 async def regenerate_generation(
     generation_id: uuid.UUID,
     body: RegenerateRequest,
-    _rate: None = Depends(check_generation_rate_limit),
+    _quota: None = Depends(reserve_generation_quota),
     client_id: uuid.UUID = Depends(get_client_id),
     session: AsyncSession = Depends(get_session),
 ):
@@ -233,6 +239,9 @@ async def regenerate_generation(
         if r.channel_id in channel_ids
     ]
 
+    day = original.date
+    await session.close()  # no connection held during the AI call
+
     # 7. Call AI
     try:
         ai_results, model_used, latency_ms = await ai_regenerate(
@@ -253,7 +262,7 @@ async def regenerate_generation(
     # 7. Save new generation
     new_gen = Generation(
         client_id=client_id,
-        date=original.date,
+        date=day,
         prompt_version="regenerate_v1",
     )
     session.add(new_gen)
@@ -261,9 +270,9 @@ async def regenerate_generation(
 
     for ai_r in ai_results:
         ch_id = ai_r["channel_id"]
-        cs = cs_map.get(ch_id, None)
-        style = cs.default_style if cs else "casual"
-        language = cs.default_language if cs else "ru"
+        cs = channel_settings.get(ch_id, {})
+        style = cs.get("default_style", "casual")
+        language = cs.get("default_language", "ru")
         gr = GenerationResult(
             generation_id=new_gen.id,
             channel_id=ch_id,
@@ -275,6 +284,7 @@ async def regenerate_generation(
         )
         session.add(gr)
 
+    await bump_day(session, client_id, day, generations=1)
     await session.commit()
 
     result = await session.execute(
@@ -1,8 +1,24 @@
+import math
+
 from fastapi import APIRouter
 
+from app import database
+
 router = APIRouter()
 
 
 @router.get("/health")
 async def health_check():
     return {"status": "ok"}
+
+
+@router.get("/health/pool")
+async def pool_health():
+    """Connection pool usage for this worker, for sizing DB_POOL_SIZE."""
+    metrics = database.pool_metrics(database.engine)
+    metrics["public"] = database.pool_metrics(database.public_engine)
+    if database.read_engine is not None:
+        lag = database.replica_lag.lag
+        metrics["replica"] = database.pool_metrics(database.read_engine)
+        metrics["replica"]["lag_seconds"] = None if math.isinf(lag) else lag
+    return metrics
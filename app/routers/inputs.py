@@ -6,28 +6,45 @@ from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
+from app import public_cache
 from app.database import get_session
 from app.dependencies import get_client_id
 from app.models.input_item import InputItem
 from app.models.input_item_edit import InputItemEdit
+from app.models.published_post import PublishedPost
 from app.schemas.input_item import (
+    DirectUploadCompleteRequest,
+    DirectUploadRequest,
+    DirectUploadResponse,
     InputItemCreateRequest,
     InputItemResponse,
     InputItemUpdateRequest,
     InputItemWithEditsResponse,
 )
+from app.services import snapshots
+from app.services.day_stats import bump_day
 from app.services.file_storage import (
     ALLOWED_CONTENT_TYPES,
     MAX_IMAGE_SIZE,
-    UPLOAD_DIR,
-    get_upload_path,
+    get_storage,
+    get_upload_key,
+    is_upload_key,
     save_upload,
 )
+from app.services.post_previews import refresh_previews
+from app.services.storage_usage import record_upload
 from app.services.url_extractor import extract_text_from_url
 
 router = APIRouter(prefix="/inputs", tags=["inputs"])
 
 
+async def _republish(posts: list[PublishedPost]) -> None:
+    """Publish refreshed previews (see post_previews). Call after commit."""
+    if posts:
+        await public_cache.invalidate()
+        await snapshots.after_update(posts)
+
+
 @router.post("", response_model=InputItemResponse, status_code=201)
 async def create_input_item(
     body: InputItemCreateRequest,
@@ -49,6 +66,7 @@ async def create_input_item(
         include_in_generation=body.include_in_generation,
     )
     session.add(item)
+    await bump_day(session, client_id, item.date, inputs=1)
     await session.commit()
     await session.refresh(item)
     return item
@@ -70,16 +88,74 @@ async def upload_image(
     if len(data) > MAX_IMAGE_SIZE:
         raise HTTPException(status_code=413, detail="Image exceeds 5 MB limit")
     ext = ALLOWED_CONTENT_TYPES[file.content_type]
-    path = get_upload_path(client_id, date, ext)
-    await save_upload(data, path)
-    relative_path = str(path.relative_to(UPLOAD_DIR))
+    key = get_upload_key(client_id, date, ext)
+    await save_upload(data, key, file.content_type)
     item = InputItem(
         client_id=client_id,
         date=date,
         type="image",
-        content=relative_path,
+        content=key,
+    )
+    session.add(item)
+    await record_upload(session, client_id, key, len(data))
+    await bump_day(session, client_id, item.date, inputs=1)
+    await session.commit()
+    await session.refresh(item)
+    return item
+
+
+@router.post("/upload-url", response_model=DirectUploadResponse)
+async def create_direct_upload(
+    body: DirectUploadRequest,
+    client_id: uuid.UUID = Depends(get_client_id),
+):
+    if body.content_type not in ALLOWED_CONTENT_TYPES:
+        raise HTTPException(
+            status_code=400,
+            detail=(
+                f"Unsupported file type: {body.content_type}. "
+                "Allowed: jpg, png, webp"
+            ),
+        )
+    ext = ALLOWED_CONTENT_TYPES[body.content_type]
+    key = get_upload_key(client_id, body.date, ext)
+    form = get_storage().presigned_upload(key, body.content_type)
+    if form is None:
+        raise HTTPException(
+            status_code=400,
+            detail="Direct upload is not supported by the storage backend",
+        )
+    return DirectUploadResponse(key=key, url=form["url"], fields=form["fields"])
+
+
+@router.post("/upload-complete", response_model=InputItemResponse, status_code=201)
+async def complete_direct_upload(
+    body: DirectUploadCompleteRequest,
+    client_id: uuid.UUID = Depends(get_client_id),
+    session: AsyncSession = Depends(get_session),
+):
+    # Keys are issued per client — never let one client claim another's object
+    if not is_upload_key(body.key, client_id, body.date):
+        raise HTTPException(status_code=400, detail="Invalid upload key")
+    storage = get_storage()
+    try:
+        stored = await storage.stat(body.key)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid upload key")
+    if stored is None:
+        raise HTTPException(status_code=404, detail="Uploaded file not found")
+    if stored.size > MAX_IMAGE_SIZE:
+        await storage.delete(body.key)
+        raise HTTPException(status_code=413, detail="Image exceeds 5 MB limit")
+    item = InputItem(
+        client_id=client_id,
+        date=body.date,
+        type="image",
+        content=body.key,
     )
     session.add(item)
+    await record_upload(session, client_id, body.key, stored.size)
+    await bump_day(session, client_id, item.date, inputs=1)
     await session.commit()
     await session.refresh(item)
     return item
@@ -148,7 +224,10 @@ async def update_input_item(
         item.importance = body.importance
     if body.include_in_generation is not None:
         item.include_in_generation = body.include_in_generation
+    await bump_day(session, client_id, item.date)
+    posts = await refresh_previews(session, client_id, item.date)
     await session.commit()
+    await _republish(posts)
     # Re-query with selectinload to get fresh edits
     result = await session.execute(
         select(InputItem)
@@ -175,7 +254,10 @@ async def delete_input_item(
         raise HTTPException(status_code=404, detail="Item not found")
     # Soft-delete: mark as cleared instead of removing from DB
     item.cleared = True
+    await bump_day(session, client_id, item.date)
+    posts = await refresh_previews(session, client_id, item.date)
     await session.commit()
+    await _republish(posts)
 
 
 @router.get("/export")
@@ -215,7 +297,7 @@ async def clear_day(
     client_id: uuid.UUID = Depends(get_client_id),
     session: AsyncSession = Depends(get_session),
 ):
-    await session.execute(
+    result = await session.execute(
         update(InputItem)
         .where(
             InputItem.client_id == client_id,
@@ -224,4 +306,9 @@ async def clear_day(
         )
         .values(cleared=True)
     )
+    posts = []
+    if result.rowcount:
+        await bump_day(session, client_id, date)
+        posts = await refresh_previews(session, client_id, date)
     await session.commit()
+    await _republish(posts)
@@ -1,78 +1,63 @@
+import base64
+import calendar as cal
 import datetime as dt
-from xml.sax.saxutils import escape as xml_escape
+import uuid
 
 from fastapi import APIRouter, Depends, HTTPException, Query
-from fastapi.responses import Response
-from sqlalchemy import Date, cast, distinct, extract, func, select
+from fastapi.responses import FileResponse, Response
+from sqlalchemy import func, select, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_session
-from app.models.generation import Generation
-from app.models.generation_result import GenerationResult
-from app.models.input_item import InputItem
+from app.config import settings
+from app.database import get_read_session
+from app.models.post_view import PostView
+from app.models.public_post_daily import PublicPostDaily
 from app.models.published_post import PublishedPost
 from app.schemas.publish import (
     ArchiveMonth,
     ArchiveResponse,
     CalendarDate,
     CalendarResponse,
+    PopularPostResponse,
+    PopularPostsResponse,
     PublishedPostListResponse,
     PublishedPostResponse,
+    RelatedPostsResponse,
     StatsResponse,
 )
+from app.services import og_images, related, view_counts
+from app.services.feeds import (
+    ATOM_TYPE,
+    JSON_FEED_TYPE,
+    RSS_TYPE,
+    FeedPage,
+    http_date,
+    load_page,
+    render_atom,
+    render_json_feed,
+    render_rss,
+)
+from app.services.public_stats import INPUT_CHANNEL
 
 router = APIRouter(prefix="/public", tags=["public"])
 
 
-async def _build_post_response(
-    post: PublishedPost,
-    result: GenerationResult | None,
-    generation: Generation | None,
-    session: AsyncSession,
-) -> PublishedPostResponse:
-    # Input-based post
-    if post.input_item_id and result is None:
-        return PublishedPostResponse(
-            id=post.id,
-            slug=post.slug,
-            channel_id=None,
-            style=None,
-            language=None,
-            text=post.text or "",
-            date=post.published_at.date(),
-            published_at=post.published_at,
-            input_items_preview=[],
-            source="input",
-        )
+def _encode_cursor(post: PublishedPost) -> str:
+    raw = f"{post.published_at.isoformat()}|{post.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
 
-    # Generation-based post
-    preview = []
-    if generation:
-        items_result = await session.execute(
-            select(InputItem)
-            .where(
-                InputItem.client_id == generation.client_id,
-                InputItem.date == generation.date,
-                InputItem.cleared == False,
-            )
-            .order_by(InputItem.created_at)
-            .limit(5)
-        )
-        items = items_result.scalars().all()
-        preview = [item.content[:80] for item in items]
-
-    return PublishedPostResponse(
-        id=post.id,
-        slug=post.slug,
-        channel_id=result.channel_id if result else None,
-        style=result.style if result else None,
-        language=result.language if result else None,
-        text=result.text if result else (post.text or ""),
-        date=generation.date if generation else post.published_at.date(),
-        published_at=post.published_at,
-        input_items_preview=preview,
-        source="generation" if result else "input",
-    )
+
+def _decode_cursor(cursor: str) -> tuple[dt.datetime, uuid.UUID | None]:
+    """(published_at, id) keyset position; bare timestamps are older cursors."""
+    try:
+        return dt.datetime.fromisoformat(cursor), None
+    except ValueError:
+        pass
+    try:
+        published_at, post_id = base64.urlsafe_b64decode(cursor).decode().split("|")
+        return dt.datetime.fromisoformat(published_at), uuid.UUID(post_id)
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
 
 
 @router.get("/posts", response_model=PublishedPostListResponse)
@@ -82,85 +67,166 @@ async def list_posts(
     channel: str | None = None,
     language: str | None = None,
     date: str | None = None,
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_read_session),
 ):
-    query = (
-        select(PublishedPost, GenerationResult, Generation)
-        .outerjoin(GenerationResult, PublishedPost.generation_result_id == GenerationResult.id)
-        .outerjoin(Generation, GenerationResult.generation_id == Generation.id)
-    )
+    # Single-table read: each filter has an index ending in (published_at, id)
+    query = select(PublishedPost)
 
     if cursor:
-        cursor_dt = dt.datetime.fromisoformat(cursor)
-        query = query.where(PublishedPost.published_at < cursor_dt)
+        cursor_at, cursor_id = _decode_cursor(cursor)
+        if cursor_id is None:
+            query = query.where(PublishedPost.published_at < cursor_at)
+        else:
+            query = query.where(
+                tuple_(PublishedPost.published_at, PublishedPost.id)
+                < tuple_(cursor_at, cursor_id)
+            )
 
     if channel:
-        query = query.where(GenerationResult.channel_id == channel)
+        query = query.where(PublishedPost.channel_id == channel)
 
     if language:
-        query = query.where(GenerationResult.language == language)
+        query = query.where(PublishedPost.language == language)
 
     if date:
-        query = query.where(Generation.date == dt.date.fromisoformat(date))
+        query = query.where(PublishedPost.date == dt.date.fromisoformat(date))
 
-    query = query.order_by(PublishedPost.published_at.desc()).limit(limit + 1)
+    query = query.order_by(
+        PublishedPost.published_at.desc(), PublishedPost.id.desc()
+    ).limit(limit + 1)
 
     result = await session.execute(query)
-    rows = result.all()
+    posts = result.scalars().all()
 
-    has_more = len(rows) > limit
-    rows = rows[:limit]
+    has_more = len(posts) > limit
+    posts = posts[:limit]
 
-    items = []
-    for post, gen_result, generation in rows:
-        resp = await _build_post_response(post, gen_result, generation, session)
-        items.append(resp)
-
-    next_cursor = None
-    if has_more and items:
-        next_cursor = items[-1].published_at.isoformat()
+    items = [PublishedPostResponse.model_validate(post) for post in posts]
+    next_cursor = _encode_cursor(posts[-1]) if has_more and posts else None
 
     return PublishedPostListResponse(items=items, cursor=next_cursor, has_more=has_more)
 
 
+@router.get("/posts/popular", response_model=PopularPostsResponse)
+async def popular_posts(
+    limit: int = Query(default=10, ge=1, le=50),
+    session: AsyncSession = Depends(get_read_session),
+):
+    # Walks idx_post_views_view_count from the top; counts lag by up to
+    # VIEW_COUNT_FLUSH_SECONDS plus the response cache TTL
+    result = await session.execute(
+        select(PublishedPost, PostView.view_count)
+        .join(PostView, PostView.post_id == PublishedPost.id)
+        .order_by(PostView.view_count.desc(), PublishedPost.id)
+        .limit(limit)
+    )
+    items = [
+        PopularPostResponse.model_validate(post).model_copy(update={"view_count": n})
+        for post, n in result.all()
+    ]
+    return PopularPostsResponse(items=items)
+
+
+@router.post("/posts/{slug}/view", status_code=204)
+async def record_view(slug: str):
+    # Beacon from the post page: GET /posts/{slug} is answered by the response
+    # cache or a static snapshot, so it can't count views itself. Malformed
+    # slugs are refused so junk can't fill the buffer
+    if not view_counts.is_post_slug(slug):
+        raise HTTPException(status_code=404, detail="Post not found")
+    view_counts.counter.record(slug)
+    return Response(status_code=204)
+
+
 @router.get("/posts/{slug}", response_model=PublishedPostResponse)
 async def get_post(
     slug: str,
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_read_session),
 ):
     result = await session.execute(
-        select(PublishedPost, GenerationResult, Generation)
-        .outerjoin(GenerationResult, PublishedPost.generation_result_id == GenerationResult.id)
-        .outerjoin(Generation, GenerationResult.generation_id == Generation.id)
-        .where(PublishedPost.slug == slug)
+        select(PublishedPost).where(PublishedPost.slug == slug)
     )
-    row = result.one_or_none()
-    if row is None:
+    post = result.scalar_one_or_none()
+    if post is None:
         raise HTTPException(status_code=404, detail="Post not found")
+    return PublishedPostResponse.model_validate(post)
 
-    post, gen_result, generation = row
-    return await _build_post_response(post, gen_result, generation, session)
+
+@router.get("/posts/{slug}/related", response_model=RelatedPostsResponse)
+async def related_posts(
+    slug: str,
+    limit: int = Query(default=5, ge=1, le=20),
+    session: AsyncSession = Depends(get_read_session),
+):
+    result = await session.execute(
+        select(PublishedPost).where(PublishedPost.slug == slug)
+    )
+    post = result.scalar_one_or_none()
+    if post is None:
+        raise HTTPException(status_code=404, detail="Post not found")
+    # Ranked by the related-posts index; posts it knows but the read session
+    # doesn't (yet) are skipped
+    ids = await related.find(post, limit)
+    if not ids:
+        return RelatedPostsResponse(items=[])
+    result = await session.execute(
+        select(PublishedPost).where(PublishedPost.id.in_(ids))
+    )
+    by_id = {found.id: found for found in result.scalars().all()}
+    items = [
+        PublishedPostResponse.model_validate(by_id[post_id])
+        for post_id in ids
+        if post_id in by_id
+    ]
+    return RelatedPostsResponse(items=items)
+
+
+@router.get("/posts/{slug}/og.png", response_class=FileResponse)
+async def post_og_image(
+    slug: str,
+    session: AsyncSession = Depends(get_read_session),
+):
+    result = await session.execute(
+        select(PublishedPost).where(PublishedPost.slug == slug)
+    )
+    post = result.scalar_one_or_none()
+    if post is None:
+        raise HTTPException(status_code=404, detail="Post not found")
+    try:
+        path = await og_images.image_path(post)
+    except og_images.OgImageBusyError:
+        raise HTTPException(
+            status_code=503,
+            detail="Preview image is being rendered, try again shortly",
+            headers={"Retry-After": "1"},
+        )
+    # Bypasses the public response cache: the file is named after the hash of
+    # its content, so the card can be cached for good
+    return FileResponse(
+        path,
+        media_type="image/png",
+        headers={
+            "ETag": f'"{path.stem}"',
+            "Cache-Control": (
+                f"public, max-age={settings.OG_IMAGE_MAX_AGE_SECONDS}, immutable"
+            ),
+        },
+    )
 
 
 @router.get("/calendar", response_model=CalendarResponse)
 async def get_calendar(
     year: int,
     month: int,
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_read_session),
 ):
     start = dt.date(year, month, 1)
-    if month == 12:
-        end = dt.date(year + 1, 1, 1)
-    else:
-        end = dt.date(year, month + 1, 1)
-
     result = await session.execute(
-        select(Generation.date, func.count(PublishedPost.id))
-        .join(GenerationResult, PublishedPost.generation_result_id == GenerationResult.id)
-        .join(Generation, GenerationResult.generation_id == Generation.id)
-        .where(Generation.date >= start, Generation.date < end)
-        .group_by(Generation.date)
-        .order_by(Generation.date)
+        select(PublicPostDaily.date, func.sum(PublicPostDaily.post_count))
+        .where(PublicPostDaily.month == start)
+        .group_by(PublicPostDaily.date)
+        .having(func.sum(PublicPostDaily.post_count) > 0)
+        .order_by(PublicPostDaily.date)
     )
     rows = result.all()
 
@@ -170,100 +236,90 @@ async def get_calendar(
 
 @router.get("/archive", response_model=ArchiveResponse)
 async def get_archive(
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_read_session),
 ):
-    month_key = func.to_char(Generation.date, "YYYY-MM")
     result = await session.execute(
         select(
-            month_key.label("month_key"),
-            func.count(PublishedPost.id).label("cnt"),
+            PublicPostDaily.month,
+            func.sum(PublicPostDaily.post_count).label("cnt"),
         )
-        .select_from(PublishedPost)
-        .join(GenerationResult, PublishedPost.generation_result_id == GenerationResult.id)
-        .join(Generation, GenerationResult.generation_id == Generation.id)
-        .group_by(month_key)
-        .order_by(month_key.desc())
+        .group_by(PublicPostDaily.month)
+        .having(func.sum(PublicPostDaily.post_count) > 0)
+        .order_by(PublicPostDaily.month.desc())
     )
     rows = result.all()
 
-    import calendar as cal
     months = []
-    for row in rows:
-        year, mon = row[0].split("-")
-        label = f"{cal.month_name[int(mon)]} {year}"
-        months.append(ArchiveMonth(month=row[0], label=label, post_count=row[1]))
+    for month, count in rows:
+        label = f"{cal.month_name[month.month]} {month.year}"
+        months.append(
+            ArchiveMonth(month=month.strftime("%Y-%m"), label=label, post_count=count)
+        )
     return ArchiveResponse(months=months)
 
 
 @router.get("/stats", response_model=StatsResponse)
 async def get_stats(
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_read_session),
 ):
-    total = await session.execute(
-        select(func.count(PublishedPost.id))
+    result = await session.execute(
+        select(
+            PublicPostDaily.date,
+            PublicPostDaily.channel_id,
+            PublicPostDaily.post_count,
+        ).where(PublicPostDaily.post_count > 0)
     )
-    total_posts = total.scalar() or 0
+    rows = result.all()
 
-    days_result = await session.execute(
-        select(func.count(distinct(Generation.date)))
-        .select_from(PublishedPost)
-        .join(GenerationResult, PublishedPost.generation_result_id == GenerationResult.id)
-        .join(Generation, GenerationResult.generation_id == Generation.id)
+    return StatsResponse(
+        total_posts=sum(row.post_count for row in rows),
+        total_days=len({row.date for row in rows}),
+        channels_used=sorted(
+            {row.channel_id for row in rows if row.channel_id != INPUT_CHANNEL}
+        ),
     )
-    total_days = days_result.scalar() or 0
 
-    channels_result = await session.execute(
-        select(distinct(GenerationResult.channel_id))
-        .join(PublishedPost, PublishedPost.generation_result_id == GenerationResult.id)
-    )
-    channels_used = [row[0] for row in channels_result.all()]
 
-    return StatsResponse(
-        total_posts=total_posts,
-        total_days=total_days,
-        channels_used=channels_used,
-    )
+async def _feed_page(
+    name: str, session: AsyncSession, page: int | None
+) -> FeedPage:
+    feed = await load_page(session, name, page)
+    if feed is None:
+        raise HTTPException(status_code=404, detail="Feed page not found")
+    return feed
+
+
+def _feed_response(page: FeedPage, body: str, media_type: str) -> Response:
+    # ETag and 304s come from the public response cache (app/public_cache.py)
+    headers = {"Last-Modified": http_date(page.updated)}
+    if page.hub_url:
+        # WebSub discovery (the documents carry the same links)
+        headers["Link"] = f'<{page.hub_url}>; rel="hub", <{page.self_url}>; rel="self"'
+    return Response(content=body, media_type=media_type, headers=headers)
 
 
 @router.get("/rss")
 async def rss_feed(
-    session: AsyncSession = Depends(get_session),
+    page: int | None = Query(default=None, ge=1),
+    session: AsyncSession = Depends(get_read_session),
 ):
-    result = await session.execute(
-        select(PublishedPost, GenerationResult, Generation)
-        .outerjoin(GenerationResult, PublishedPost.generation_result_id == GenerationResult.id)
-        .outerjoin(Generation, GenerationResult.generation_id == Generation.id)
-        .order_by(PublishedPost.published_at.desc())
-        .limit(50)
-    )
-    rows = result.all()
+    feed = await _feed_page("rss", session, page)
+    return _feed_response(feed, render_rss(feed), RSS_TYPE)
+
+
+@router.get("/atom")
+async def atom_feed(
+    page: int | None = Query(default=None, ge=1),
+    session: AsyncSession = Depends(get_read_session),
+):
+    feed = await _feed_page("atom", session, page)
+    return _feed_response(feed, render_atom(feed), ATOM_TYPE)
 
-    items_xml = []
-    for post, gen_result, generation in rows:
-        pub_date = post.published_at.strftime("%a, %d %b %Y %H:%M:%S +0000")
-        title = gen_result.channel_id if gen_result else "Personal"
-        post_date = str(generation.date) if generation else str(post.published_at.date())
-        text = gen_result.text if gen_result else (post.text or "")
-        items_xml.append(
-            f"""    <item>
-      <title>{xml_escape(title)} - {xml_escape(post_date)}</title>
-      <link>http://192.168.31.131:3000/post/{xml_escape(post.slug)}</link>
-      <guid isPermaLink="false">{post.id}</guid>
-      <pubDate>{pub_date}</pubDate>
-      <description>{xml_escape(text[:500])}</description>
-    </item>"""
-        )
 
-    xml = f"""<?xml version="1.0" encoding="UTF-8"?>
-<rss version="2.0">
-  <channel>
-    <title>DayCast Blog</title>
-    <link>http://192.168.31.131:3000</link>
-    <description>AI-generated content from daily thoughts</description>
-    <language>en</language>
-    <lastBuildDate>{dt.datetime.now(dt.timezone.utc).strftime("%a, %d %b %Y %H:%M:%S +0000")}</lastBuildDate>
-{chr(10).join(items_xml)}
-  </channel>
-</rss>"""
-
-    return Response(content=xml, media_type="application/rss+xml")
+@router.get("/feed.json")
+async def json_feed(
+    page: int | None = Query(default=None, ge=1),
+    session: AsyncSession = Depends(get_read_session),
+):
+    feed = await _feed_page("feed.json", session, page)
+    return _feed_response(feed, render_json_feed(feed), JSON_FEED_TYPE)
@@ -5,6 +5,7 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
+from app import public_cache
 from app.database import get_session
 from app.dependencies import get_client_id
 from app.models.generation import Generation
@@ -17,49 +18,14 @@ from app.schemas.publish import (
     PublishedPostResponse,
     PublishStatusResponse,
 )
+from app.services import related, snapshots, websub
+from app.services.day_stats import bump_day
+from app.services.post_previews import build_preview
+from app.services.public_stats import bump_public_day
 
 router = APIRouter(prefix="/publish", tags=["publish"])
 
 
-def _build_response(
-    post: PublishedPost,
-    result: GenerationResult | None,
-    generation: Generation | None,
-    input_items: list[InputItem],
-    source_item: InputItem | None = None,
-) -> PublishedPostResponse:
-    if source_item:
-        # Published from InputItem directly
-        return PublishedPostResponse(
-            id=post.id,
-            slug=post.slug,
-            channel_id=None,
-            style=None,
-            language=None,
-            text=post.text or source_item.content,
-            date=source_item.date,
-            published_at=post.published_at,
-            input_items_preview=[],
-            source="input",
-        )
-    # Published from GenerationResult
-    preview = [
-        item.content[:80] for item in input_items[:5] if not item.cleared
-    ]
-    return PublishedPostResponse(
-        id=post.id,
-        slug=post.slug,
-        channel_id=result.channel_id if result else None,
-        style=result.style if result else None,
-        language=result.language if result else None,
-        text=result.text if result else (post.text or ""),
-        date=generation.date if generation else post.published_at.date(),
-        published_at=post.published_at,
-        input_items_preview=preview,
-        source="generation",
-    )
-
-
 @router.post("", response_model=PublishedPostResponse, status_code=201)
 async def publish_post(
     body: PublishRequest,
@@ -101,24 +67,25 @@ async def publish_post(
         generation_result_id=body.generation_result_id,
         client_id=client_id,
         slug=slug,
+        source="generation",
+        date=generation.date,
+        channel_id=gen_result.channel_id,
+        style=gen_result.style,
+        language=gen_result.language,
+        text=gen_result.text,
+        preview=await build_preview(session, client_id, generation.date),
     )
     session.add(post)
+    await bump_day(session, client_id, post.date, published=1)
+    await bump_public_day(session, post.date, post.channel_id, 1)
+    await websub.schedule_delivery(session)
     await session.commit()
     await session.refresh(post)
-
-    # Load input items for preview
-    items_result = await session.execute(
-        select(InputItem)
-        .where(
-            InputItem.client_id == client_id,
-            InputItem.date == generation.date,
-            InputItem.cleared == False,
-        )
-        .order_by(InputItem.created_at)
-    )
-    input_items = items_result.scalars().all()
-
-    return _build_response(post, gen_result, generation, list(input_items))
+    await public_cache.invalidate()
+    websub.notify()
+    await snapshots.after_publish(session, post)
+    await related.after_publish(post)
+    return PublishedPostResponse.model_validate(post)
 
 
 @router.post("/input", response_model=PublishedPostResponse, status_code=201)
@@ -153,13 +120,21 @@ async def publish_input_item(
         input_item_id=body.input_item_id,
         client_id=client_id,
         slug=slug,
+        source="input",
+        date=item.date,
         text=item.content,
     )
     session.add(post)
+    await bump_day(session, client_id, post.date, published=1)
+    await bump_public_day(session, post.date, post.channel_id, 1)
+    await websub.schedule_delivery(session)
     await session.commit()
     await session.refresh(post)
-
-    return _build_response(post, None, None, [], source_item=item)
+    await public_cache.invalidate()
+    websub.notify()
+    await snapshots.after_publish(session, post)
+    await related.after_publish(post)
+    return PublishedPostResponse.model_validate(post)
 
 
 @router.delete("/{post_id}", status_code=204)
@@ -178,8 +153,16 @@ async def unpublish_post(
     if post is None:
         raise HTTPException(status_code=404, detail="Published post not found")
 
+    removal = await snapshots.before_removal(session, PublishedPost.id == post.id)
     await session.delete(post)
+    await bump_day(session, client_id, post.date, published=-1)
+    await bump_public_day(session, post.date, post.channel_id, -1)
+    await websub.schedule_delivery(session)
     await session.commit()
+    await public_cache.invalidate()
+    websub.notify()
+    await snapshots.after_removal(session, removal)
+    await related.after_removal([post.id])
 
 
 @router.get("/input-status", response_model=PublishStatusResponse)
@@ -0,0 +1,39 @@
+import uuid
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_session
+from app.dependencies import get_client_id
+from app.schemas.search import SearchHitResponse, SearchResponse
+from app.services.search import InvalidCursorError, search
+
+router = APIRouter(prefix="/search", tags=["search"])
+
+
+@router.get("", response_model=SearchResponse)
+async def search_history(
+    q: str = Query(min_length=1, max_length=200),
+    limit: int = Query(default=20, ge=1, le=50),
+    cursor: str | None = Query(default=None),
+    client_id: uuid.UUID = Depends(get_client_id),
+    session: AsyncSession = Depends(get_session),
+):
+    try:
+        hits, next_cursor = await search(session, client_id, q, limit, cursor)
+    except InvalidCursorError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return SearchResponse(
+        items=[
+            SearchHitResponse(
+                kind=h.kind,
+                id=h.id,
+                date=h.date,
+                channel_id=h.channel_id,
+                rank=h.rank,
+                snippet=h.snippet,
+            )
+            for h in hits
+        ],
+        cursor=next_cursor,
+    )
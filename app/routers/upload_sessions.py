@@ -0,0 +1,243 @@
+"""Resumable uploads, modelled on the tus protocol.
+
+1. POST   /inputs/uploads                 create (content_type, length, date)
+2. PATCH  /inputs/uploads/{id}            append bytes at the ``Upload-Offset`` header
+3. HEAD   /inputs/uploads/{id}            current offset after a dropped connection
+4. POST   /inputs/uploads/{id}/finalize   turn the completed upload into an InputItem
+"""
+
+import asyncio
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, Response
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.requests import ClientDisconnect
+
+from app.config import settings
+from app.database import get_session
+from app.dependencies import get_client_id
+from app.models.input_item import InputItem
+from app.models.upload_session import UploadSession
+from app.schemas.input_item import InputItemResponse
+from app.schemas.upload import UploadSessionCreateRequest, UploadSessionResponse
+from app.services.day_stats import bump_day
+from app.services.file_storage import (
+    ALLOWED_CONTENT_TYPES,
+    MAX_IMAGE_SIZE,
+    get_upload_key,
+    save_upload,
+)
+from app.services.storage_usage import record_upload
+from app.services.upload_sessions import (
+    ChunkTooLargeError,
+    UploadBusyError,
+    discard_part,
+    is_expired,
+    locked_part,
+    new_chunk,
+    part_path,
+    receive_chunk,
+    write_at,
+)
+
+router = APIRouter(prefix="/inputs/uploads", tags=["uploads"])
+
+CHUNK_CONTENT_TYPE = "application/offset+octet-stream"
+
+
+def _offset_headers(upload: UploadSession) -> dict[str, str]:
+    return {
+        "Upload-Offset": str(upload.offset),
+        "Upload-Length": str(upload.length),
+        "Cache-Control": "no-store",
+    }
+
+
+async def _get_upload(
+    session: AsyncSession, upload_id: uuid.UUID, client_id: uuid.UUID
+) -> UploadSession:
+    result = await session.execute(
+        select(UploadSession).where(
+            UploadSession.id == upload_id, UploadSession.client_id == client_id
+        )
+    )
+    upload = result.scalar_one_or_none()
+    if upload is None:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    if is_expired(upload):
+        await session.delete(upload)
+        await session.commit()
+        discard_part(upload_id)
+        raise HTTPException(status_code=410, detail="Upload expired")
+    return upload
+
+
+@router.post("", response_model=UploadSessionResponse, status_code=201)
+async def create_upload(
+    body: UploadSessionCreateRequest,
+    request: Request,
+    response: Response,
+    client_id: uuid.UUID = Depends(get_client_id),
+    session: AsyncSession = Depends(get_session),
+):
+    if body.content_type not in ALLOWED_CONTENT_TYPES:
+        raise HTTPException(
+            status_code=400,
+            detail=(
+                f"Unsupported file type: {body.content_type}. "
+                "Allowed: jpg, png, webp"
+            ),
+        )
+    if body.length > MAX_IMAGE_SIZE:
+        raise HTTPException(status_code=413, detail="Image exceeds 5 MB limit")
+    upload = UploadSession(
+        client_id=client_id,
+        date=body.date,
+        content_type=body.content_type,
+        length=body.length,
+        offset=0,
+        expires_at=datetime.now(timezone.utc)
+        + timedelta(hours=settings.UPLOAD_SESSION_TTL_HOURS),
+    )
+    session.add(upload)
+    await session.commit()
+    response.headers.update(_offset_headers(upload))
+    response.headers["Location"] = f"{str(request.url).rstrip('/')}/{upload.id}"
+    return upload
+
+
+@router.head("/{upload_id}")
+async def get_upload_offset(
+    upload_id: uuid.UUID,
+    client_id: uuid.UUID = Depends(get_client_id),
+    session: AsyncSession = Depends(get_session),
+):
+    upload = await _get_upload(session, upload_id, client_id)
+    return Response(status_code=200, headers=_offset_headers(upload))
+
+
+@router.get("/{upload_id}", response_model=UploadSessionResponse)
+async def get_upload(
+    upload_id: uuid.UUID,
+    response: Response,
+    client_id: uuid.UUID = Depends(get_client_id),
+    session: AsyncSession = Depends(get_session),
+):
+    upload = await _get_upload(session, upload_id, client_id)
+    response.headers.update(_offset_headers(upload))
+    return upload
+
+
+async def _append(
+    session: AsyncSession, upload_id: uuid.UUID, upload_offset: int, chunk: Path
+) -> int:
+    """Copy a received chunk into the part file and store the new offset."""
+    try:
+        with locked_part(upload_id) as part:
+            # Only the lock holder writes the part file; re-check that no
+            # concurrent PATCH at this offset got there first
+            result = await session.execute(
+                select(UploadSession.offset).where(UploadSession.id == upload_id)
+            )
+            if result.scalar_one_or_none() != upload_offset:
+                raise HTTPException(
+                    status_code=409, detail="Concurrent upload to same offset"
+                )
+            new_offset = write_at(part, upload_offset, chunk)
+            await session.execute(
+                update(UploadSession)
+                .where(UploadSession.id == upload_id)
+                .values(offset=new_offset)
+            )
+            await session.commit()
+    except UploadBusyError:
+        raise HTTPException(status_code=409, detail="Concurrent upload to same offset")
+    return new_offset
+
+
+@router.patch("/{upload_id}", status_code=204)
+async def append_chunk(
+    upload_id: uuid.UUID,
+    request: Request,
+    upload_offset: int = Header(alias="Upload-Offset", ge=0),
+    content_type: str = Header(alias="Content-Type", default=""),
+    client_id: uuid.UUID = Depends(get_client_id),
+    session: AsyncSession = Depends(get_session),
+):
+    if content_type != CHUNK_CONTENT_TYPE:
+        raise HTTPException(
+            status_code=415, detail=f"Content-Type must be {CHUNK_CONTENT_TYPE}"
+        )
+    upload = await _get_upload(session, upload_id, client_id)
+    if upload_offset != upload.offset:
+        raise HTTPException(
+            status_code=409,
+            detail=f"Offset mismatch: upload is at {upload.offset}",
+        )
+    # Mobile clients stream slowly; no pooled connection is held meanwhile
+    await session.close()
+    chunk = new_chunk(upload_id)
+    try:
+        try:
+            await receive_chunk(chunk, upload.length - upload_offset, request.stream())
+        except ChunkTooLargeError:
+            raise HTTPException(status_code=413, detail="Chunk exceeds declared length")
+        except (ClientDisconnect, asyncio.CancelledError):
+            # Keep what arrived: the client resumes from there, not from zero
+            if chunk.stat().st_size:
+                await asyncio.shield(_append(session, upload_id, upload_offset, chunk))
+            raise
+        new_offset = await _append(session, upload_id, upload_offset, chunk)
+    finally:
+        chunk.unlink(missing_ok=True)
+    upload.offset = new_offset
+    return Response(status_code=204, headers=_offset_headers(upload))
+
+
+@router.post(
+    "/{upload_id}/finalize", response_model=InputItemResponse, status_code=201
+)
+async def finalize_upload(
+    upload_id: uuid.UUID,
+    client_id: uuid.UUID = Depends(get_client_id),
+    session: AsyncSession = Depends(get_session),
+):
+    upload = await _get_upload(session, upload_id, client_id)
+    if upload.offset != upload.length:
+        raise HTTPException(
+            status_code=409,
+            detail=f"Upload incomplete: {upload.offset}/{upload.length} bytes",
+        )
+    data = part_path(upload_id).read_bytes()
+    ext = ALLOWED_CONTENT_TYPES[upload.content_type]
+    key = get_upload_key(client_id, upload.date, ext)
+    await save_upload(data, key, upload.content_type)
+    item = InputItem(
+        client_id=client_id,
+        date=upload.date,
+        type="image",
+        content=key,
+    )
+    session.add(item)
+    await record_upload(session, client_id, key, len(data))
+    await bump_day(session, client_id, item.date, inputs=1)
+    await session.delete(upload)
+    await session.commit()
+    await session.refresh(item)
+    discard_part(upload_id)
+    return item
+
+
+@router.delete("/{upload_id}", status_code=204)
+async def abort_upload(
+    upload_id: uuid.UUID,
+    client_id: uuid.UUID = Depends(get_client_id),
+    session: AsyncSession = Depends(get_session),
+):
+    upload = await _get_upload(session, upload_id, client_id)
+    await session.delete(upload)
+    await session.commit()
+    discard_part(upload_id)
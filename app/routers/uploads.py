@@ -1,18 +1,41 @@
-from pathlib import Path
+import uuid
 
-from fastapi import APIRouter, HTTPException
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import FileResponse, RedirectResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.services.file_storage import UPLOAD_DIR
+from app.database import get_session
+from app.dependencies import get_client_id
+from app.schemas.upload import StorageUsageResponse
+from app.services.file_storage import get_storage
+from app.services.storage_usage import get_usage
 
 router = APIRouter(prefix="/uploads", tags=["uploads"])
 
 
+@router.get("/usage", response_model=StorageUsageResponse)
+async def get_storage_usage(
+    client_id: uuid.UUID = Depends(get_client_id),
+    session: AsyncSession = Depends(get_session),
+):
+    bytes_used, object_count = await get_usage(session, client_id)
+    return StorageUsageResponse(bytes_used=bytes_used, object_count=object_count)
+
+
 @router.get("/{file_path:path}")
 async def serve_upload(file_path: str):
-    full_path = (UPLOAD_DIR / file_path).resolve()
-    if not full_path.is_relative_to(UPLOAD_DIR.resolve()):
+    storage = get_storage()
+    try:
+        full_path = storage.local_path(file_path)
+    except ValueError:
         raise HTTPException(status_code=403, detail="Forbidden")
-    if not full_path.is_file():
+
+    if full_path is not None:
+        if not full_path.is_file():
+            raise HTTPException(status_code=404, detail="File not found")
+        return FileResponse(full_path)
+
+    # Remote backend: hand the client a presigned URL so bytes skip the API
+    if await storage.stat(file_path) is None:
         raise HTTPException(status_code=404, detail="File not found")
-    return FileResponse(full_path)
+    return RedirectResponse(storage.presigned_download_url(file_path), status_code=307)
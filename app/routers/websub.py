@@ -0,0 +1,65 @@
+"""WebSub hub (https://www.w3.org/TR/websub/) for the public feeds.
+
+Intent is verified against the callback before the 202 is sent, so a
+subscriber whose callback doesn't echo the challenge gets a 400 instead of a
+silently dropped subscription. Content is pushed by app.services.websub.
+Callbacks must resolve to public addresses, and each client address may make
+WEBSUB_REQUESTS_PER_MINUTE hub requests.
+"""
+
+import httpx
+from fastapi import APIRouter, Depends, Form, HTTPException, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import get_session
+from app.rate_limit import get_rate_limit_backend
+from app.services import websub
+
+router = APIRouter(prefix="/websub", tags=["websub"])
+
+
+async def get_hub_client():
+    async with websub.client() as http:
+        yield http
+
+
+async def check_hub_rate_limit(request: Request) -> None:
+    # Every accepted request makes the hub fetch a URL of the caller's choosing
+    key = f"websub:{request.client.host if request.client else ''}"
+    limit = settings.WEBSUB_REQUESTS_PER_MINUTE
+    if not await get_rate_limit_backend().hit(key, limit, 60.0):
+        raise HTTPException(status_code=429, detail="Rate limit exceeded")
+
+
+@router.post("", status_code=202, dependencies=[Depends(check_hub_rate_limit)])
+async def hub(
+    mode: str = Form(alias="hub.mode"),
+    topic: str = Form(alias="hub.topic"),
+    callback: str = Form(alias="hub.callback", max_length=2048),
+    lease_seconds: int | None = Form(default=None, alias="hub.lease_seconds", ge=1),
+    secret: str | None = Form(default=None, alias="hub.secret", max_length=199),
+    session: AsyncSession = Depends(get_session),
+    http: httpx.AsyncClient = Depends(get_hub_client),
+):
+    if mode not in ("subscribe", "unsubscribe"):
+        raise HTTPException(status_code=400, detail=f"Unsupported hub.mode: {mode}")
+    if websub.topic_feed(topic) is None:
+        raise HTTPException(status_code=400, detail="Unknown hub.topic")
+    if not await websub.public_callback(callback):
+        raise HTTPException(status_code=400, detail="Invalid hub.callback")
+
+    if mode == "subscribe":
+        lease = min(
+            lease_seconds or settings.WEBSUB_LEASE_SECONDS,
+            settings.WEBSUB_LEASE_SECONDS,
+        )
+        if not await websub.verify_intent(http, mode, topic, callback, lease):
+            raise HTTPException(status_code=400, detail="Callback verification failed")
+        await websub.subscribe(session, topic, callback, secret, lease)
+    else:
+        if not await websub.verify_intent(http, mode, topic, callback):
+            raise HTTPException(status_code=400, detail="Callback verification failed")
+        await websub.unsubscribe(session, topic, callback)
+    await session.commit()
+    return Response(status_code=202)
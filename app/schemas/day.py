@@ -16,8 +16,22 @@ class DaySummary(BaseModel):
     date: dt.date
     input_count: int
     generation_count: int
+    published_count: int = 0
+    last_activity_at: dt.datetime | None = None
 
 
 class DayListResponse(BaseModel):
     items: list[DaySummary]
     cursor: str | None = None
+
+
+class DayActivity(BaseModel):
+    date: dt.date
+    input_count: int
+    generation_count: int
+    published_count: int
+
+
+class ActivityResponse(BaseModel):
+    year: int
+    days: list[DayActivity]
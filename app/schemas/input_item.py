@@ -51,3 +51,19 @@ class InputItemEditResponse(BaseModel):
 
 class InputItemWithEditsResponse(InputItemResponse):
     edits: list[InputItemEditResponse] = []
+
+
+class DirectUploadRequest(BaseModel):
+    content_type: str
+    date: dt.date = Field(default_factory=dt.date.today)
+
+
+class DirectUploadResponse(BaseModel):
+    key: str
+    url: str
+    fields: dict[str, str]
+
+
+class DirectUploadCompleteRequest(BaseModel):
+    key: str = Field(max_length=256)
+    date: dt.date
@@ -1,7 +1,7 @@
 import uuid
 import datetime as dt
 
-from pydantic import BaseModel
+from pydantic import AliasChoices, BaseModel, Field
 
 
 class PublishRequest(BaseModel):
@@ -21,12 +21,27 @@ class PublishedPostResponse(BaseModel):
     text: str
     date: dt.date
     published_at: dt.datetime
-    input_items_preview: list[str] = []
+    # Built straight from a PublishedPost, whose snapshot column is "preview"
+    input_items_preview: list[str] = Field(
+        default=[], validation_alias=AliasChoices("input_items_preview", "preview")
+    )
     source: str = "generation"  # "generation" or "input"
 
     model_config = {"from_attributes": True}
 
 
+class PopularPostResponse(PublishedPostResponse):
+    view_count: int = 0
+
+
+class PopularPostsResponse(BaseModel):
+    items: list[PopularPostResponse]
+
+
+class RelatedPostsResponse(BaseModel):
+    items: list[PublishedPostResponse]
+
+
 class PublishStatusResponse(BaseModel):
     statuses: dict[str, str | None]
 
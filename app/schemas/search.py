@@ -0,0 +1,18 @@
+import datetime as dt
+import uuid
+
+from pydantic import BaseModel
+
+
+class SearchHitResponse(BaseModel):
+    kind: str  # "item" | "result"
+    id: uuid.UUID
+    date: dt.date
+    channel_id: str | None = None
+    rank: float
+    snippet: str  # HTML-escaped text, matches wrapped in <mark>
+
+
+class SearchResponse(BaseModel):
+    items: list[SearchHitResponse]
+    cursor: str | None = None
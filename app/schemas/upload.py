@@ -0,0 +1,24 @@
+import datetime as dt
+import uuid
+
+from pydantic import BaseModel, Field
+
+
+class StorageUsageResponse(BaseModel):
+    bytes_used: int
+    object_count: int
+
+
+class UploadSessionCreateRequest(BaseModel):
+    content_type: str
+    length: int = Field(ge=1)
+    date: dt.date = Field(default_factory=dt.date.today)
+
+
+class UploadSessionResponse(BaseModel):
+    id: uuid.UUID
+    offset: int
+    length: int
+    expires_at: dt.datetime
+
+    model_config = {"from_attributes": True}
@@ -8,7 +8,7 @@ import httpx
 import structlog
 
 from app.config import settings
-from app.services.file_storage import UPLOAD_DIR
+from app.services.file_storage import get_storage
 from app.services.product_config import get_ai_config, get_channels, get_lengths
 
 logger = structlog.get_logger()
@@ -20,20 +20,38 @@ REGENERATE_TEMPLATE = (PROJECT_ROOT / "prompts" / "regenerate_v1.md").read_text(
 OPENAI_CHAT_URL = "https://api.openai.com/v1/chat/completions"
 
 
-def _image_to_data_url(relative_path: str) -> str | None:
-    """Read image from disk and return as base64 data URL for OpenAI vision."""
-    file_path = UPLOAD_DIR / relative_path
-    if not file_path.exists():
-        logger.warning("image_not_found", path=str(file_path))
+async def _image_to_data_url(relative_path: str) -> str | None:
+    """Read image from storage and return as base64 data URL for OpenAI vision."""
+    try:
+        data = await get_storage().read(relative_path)
+    except ValueError:
+        data = None
+    if data is None:
+        logger.warning("image_not_found", path=relative_path)
         return None
-    mime, _ = mimetypes.guess_type(file_path.name)
+    mime, _ = mimetypes.guess_type(relative_path)
     if not mime:
         mime = "image/jpeg"
-    data = file_path.read_bytes()
     b64 = base64.b64encode(data).decode()
     return f"data:{mime};base64,{b64}"
 
 
+async def _build_content_parts(prompt_text: str, items: list[dict]) -> list[dict]:
+    """Prompt text followed by any images (as base64 data URLs)."""
+    content_parts: list[dict] = [{"type": "text", "text": prompt_text}]
+    for item in items:
+        if item["type"] == "image":
+            data_url = await _image_to_data_url(item["content"])
+            if data_url:
+                content_parts.append(
+                    {
+                        "type": "image_url",
+                        "image_url": {"url": data_url, "detail": "low"},
+                    }
+                )
+    return content_parts
+
+
 def _build_items_block(items: list[dict]) -> str:
     """Build the items section for the prompt."""
     parts = []
@@ -95,7 +113,7 @@ def _build_extra_instructions(
     return "\n\n".join(parts)
 
 
-def _build_messages(
+async def _build_messages(
     items: list[dict],
     channel_ids: list[str],
     style_override: str | None,
@@ -120,17 +138,7 @@ def _build_messages(
     )
 
     # Build content parts — text + any images (as base64 data URLs)
-    content_parts: list[dict] = [{"type": "text", "text": prompt_text}]
-    for item in items:
-        if item["type"] == "image":
-            data_url = _image_to_data_url(item["content"])
-            if data_url:
-                content_parts.append(
-                    {
-                        "type": "image_url",
-                        "image_url": {"url": data_url, "detail": "low"},
-                    }
-                )
+    content_parts = await _build_content_parts(prompt_text, items)
 
     return [{"role": "user", "content": content_parts}]
 
@@ -166,7 +174,7 @@ async def generate(
     Retries up to 3 times on invalid JSON.
     """
     ai_config = get_ai_config()
-    messages = _build_messages(
+    messages = await _build_messages(
         items, channel_ids, style_override, language_override, channel_settings,
         custom_instruction, separate_business_personal,
     )
@@ -253,18 +261,7 @@ async def regenerate(
         .replace("{extra_instructions}", extra_instructions)
     )
 
-    content_parts: list[dict] = [{"type": "text", "text": prompt_text}]
-    for item in items:
-        if item["type"] == "image":
-            data_url = _image_to_data_url(item["content"])
-            if data_url:
-                content_parts.append(
-                    {
-                        "type": "image_url",
-                        "image_url": {"url": data_url, "detail": "low"},
-                    }
-                )
-
+    content_parts = await _build_content_parts(prompt_text, items)
     messages = [{"role": "user", "content": content_parts}]
 
     last_error = None
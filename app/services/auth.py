@@ -1,23 +1,72 @@
+import asyncio
+import time
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 
 import bcrypt
 import jwt
 
+from app.cache import TTLCache
 from app.config import settings
 
 JWT_ALGORITHM = "HS256"
 JWT_EXPIRATION_DAYS = 30
 
+# Verified tokens -> user_id, so hot tokens skip the HMAC check
+_verified_tokens = TTLCache(
+    maxsize=settings.JWT_CACHE_SIZE, ttl=settings.JWT_CACHE_TTL_SECONDS
+)
+
+# bcrypt releases the GIL, so a small thread pool keeps hashing off the event loop
+_hash_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt"
+)
+_pending_hashes = 0
+
+
+class PasswordHasherBusyError(Exception):
+    """Raised when PASSWORD_HASH_MAX_PENDING hashes are already queued or running."""
+
 
 def hash_password(password: str) -> str:
-    return bcrypt.hashpw(password.encode(), bcrypt.gensalt()).decode()
+    salt = bcrypt.gensalt(rounds=settings.BCRYPT_ROUNDS)
+    return bcrypt.hashpw(password.encode(), salt).decode()
 
 
 def verify_password(password: str, password_hash: str) -> bool:
     return bcrypt.checkpw(password.encode(), password_hash.encode())
 
 
+def password_needs_rehash(password_hash: str) -> bool:
+    """True if the hash was made with a cost other than BCRYPT_ROUNDS."""
+    try:
+        cost = int(password_hash.split("$")[2])
+    except (IndexError, ValueError):
+        return True
+    return cost != settings.BCRYPT_ROUNDS
+
+
+async def _run_hasher(fn, *args):
+    global _pending_hashes
+    if _pending_hashes >= settings.PASSWORD_HASH_MAX_PENDING:
+        raise PasswordHasherBusyError()
+    _pending_hashes += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_hash_executor, fn, *args)
+    finally:
+        _pending_hashes -= 1
+
+
+async def hash_password_async(password: str) -> str:
+    return await _run_hasher(hash_password, password)
+
+
+async def verify_password_async(password: str, password_hash: str) -> bool:
+    return await _run_hasher(verify_password, password, password_hash)
+
+
 def create_jwt(user_id: uuid.UUID) -> str:
     payload = {
         "sub": str(user_id),
@@ -29,5 +78,11 @@ def create_jwt(user_id: uuid.UUID) -> str:
 
 def decode_jwt(token: str) -> uuid.UUID:
     """Decode JWT and return user_id. Raises jwt.PyJWTError on failure."""
+    user_id = _verified_tokens.get(token)
+    if user_id is not None:
+        return user_id
     payload = jwt.decode(token, settings.JWT_SECRET, algorithms=[JWT_ALGORITHM])
-    return uuid.UUID(payload["sub"])
+    user_id = uuid.UUID(payload["sub"])
+    # Never serve a memoized token past its own expiry
+    _verified_tokens.set(token, user_id, ttl=payload["exp"] - time.time())
+    return user_id
@@ -0,0 +1,132 @@
+"""Per-day counters for /days and the activity heatmap.
+
+Every write path that adds or removes input items, generations or published
+posts calls ``bump_day`` in its own transaction, so ``day_stats`` never drifts
+from the rows it summarises. ``rebuild`` recomputes it from scratch
+(``python -m app.jobs.day_stats``) after a backfill or a manual repair.
+"""
+
+import uuid
+from datetime import date, datetime, timezone
+
+from sqlalchemy import delete, func, literal, select, text, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import dialect_insert
+from app.models.day_stats import DayStats
+from app.models.generation import Generation
+from app.models.input_item import InputItem
+from app.models.published_post import PublishedPost
+
+
+async def bump_day(
+    session: AsyncSession,
+    client_id: uuid.UUID,
+    day: date,
+    *,
+    inputs: int = 0,
+    generations: int = 0,
+    published: int = 0,
+) -> None:
+    """Adjust one day's counters and touch its activity time.
+
+    Runs in the caller's transaction; zero deltas just record activity.
+    """
+    table = DayStats.__table__
+    now = datetime.now(timezone.utc)
+    stmt = dialect_insert(session, table).values(
+        client_id=client_id,
+        date=day,
+        input_count=max(inputs, 0),
+        generation_count=max(generations, 0),
+        published_count=max(published, 0),
+        last_activity_at=now,
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.client_id, table.c.date],
+        set_={
+            "input_count": table.c.input_count + inputs,
+            "generation_count": table.c.generation_count + generations,
+            "published_count": table.c.published_count + published,
+            "last_activity_at": now,
+        },
+    )
+    await session.execute(stmt)
+
+
+async def forget_day(session: AsyncSession, client_id: uuid.UUID, day: date) -> None:
+    """Drop a day's counters after its rows were deleted. Caller's transaction."""
+    await session.execute(
+        delete(DayStats).where(DayStats.client_id == client_id, DayStats.date == day)
+    )
+
+
+def _activity_rows(client_id: uuid.UUID | None):
+    """One row per counted entity: (client_id, date, i, g, p, at)."""
+    zero, one = literal(0), literal(1)
+    items = select(
+        InputItem.client_id,
+        InputItem.date,
+        one.label("i"),
+        zero.label("g"),
+        zero.label("p"),
+        InputItem.updated_at.label("at"),
+    )
+    gens = select(
+        Generation.client_id, Generation.date, zero, one, zero, Generation.created_at
+    )
+    posts = select(
+        PublishedPost.client_id,
+        PublishedPost.date,
+        zero,
+        zero,
+        one,
+        PublishedPost.published_at,
+    )
+    parts = [items, gens, posts]
+    if client_id is not None:
+        parts = [
+            items.where(InputItem.client_id == client_id),
+            gens.where(Generation.client_id == client_id),
+            posts.where(PublishedPost.client_id == client_id),
+        ]
+    return union_all(*parts).subquery()
+
+
+async def rebuild(session: AsyncSession, client_id: uuid.UUID | None = None) -> int:
+    """Recompute counters from the source tables; returns the number of days.
+
+    On PostgreSQL the table is locked against concurrent ``bump_day`` calls
+    for the duration, so writes that commit meanwhile are neither lost nor
+    counted twice. The caller commits.
+    """
+    if session.bind.dialect.name == "postgresql":
+        await session.execute(text("LOCK TABLE day_stats IN EXCLUSIVE MODE"))
+    wipe = delete(DayStats)
+    if client_id is not None:
+        wipe = wipe.where(DayStats.client_id == client_id)
+    await session.execute(wipe)
+
+    rows = _activity_rows(client_id)
+    summary = select(
+        rows.c.client_id,
+        rows.c.date,
+        func.sum(rows.c.i),
+        func.sum(rows.c.g),
+        func.sum(rows.c.p),
+        func.max(rows.c.at),
+    ).group_by(rows.c.client_id, rows.c.date)
+    result = await session.execute(
+        DayStats.__table__.insert().from_select(
+            [
+                "client_id",
+                "date",
+                "input_count",
+                "generation_count",
+                "published_count",
+                "last_activity_at",
+            ],
+            summary,
+        )
+    )
+    return result.rowcount
@@ -0,0 +1,253 @@
+"""RSS 2.0, Atom and JSON Feed rendering for the public blog.
+
+Each format has a subscription document with the newest FEED_PAGE_SIZE posts
+and numbered archive pages (RFC 5005 "archived feeds"): page 1 holds the
+oldest FEED_PAGE_SIZE posts, page 2 the next, and so on. Only full pages are
+archives, so publishing never changes one. Unpublishing does: every later post
+moves back a slot, so the post's page and all newer archives change, and the
+newest archive drops out once it is no longer full.
+The current document links to the newest archive and every archive to its
+neighbours; together they cover every post. Current documents also name the
+WebSub hub (app/services/websub.py) that pushes them to subscribers.
+"""
+
+import datetime as dt
+import json
+from dataclasses import dataclass
+from email.utils import format_datetime
+from xml.sax.saxutils import escape as xml_escape
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.datastructures import URL
+
+from app.config import settings
+from app.models.public_post_daily import PublicPostDaily
+from app.models.published_post import PublishedPost
+
+TITLE = "DayCast Blog"
+DESCRIPTION = "AI-generated content from daily thoughts"
+SUMMARY_CHARS = 500
+
+RSS_TYPE = "application/rss+xml"
+ATOM_TYPE = "application/atom+xml"
+JSON_FEED_TYPE = "application/feed+json"
+
+FEED_PATH = "/api/v1/public/"
+HUB_PATH = "/api/v1/websub"
+
+
+@dataclass(frozen=True)
+class FeedPage:
+    posts: list[PublishedPost]  # newest first
+    site_url: str
+    self_url: str
+    current_url: str
+    prev_archive_url: str | None  # older
+    next_archive_url: str | None  # newer
+    is_archive: bool
+    hub_url: str | None = None  # current documents only
+
+    @property
+    def updated(self) -> dt.datetime:
+        if self.posts:
+            return max(post.published_at for post in self.posts)
+        return dt.datetime(1970, 1, 1, tzinfo=dt.timezone.utc)
+
+
+def archive_count(total_posts: int, page_size: int) -> int:
+    return total_posts // page_size
+
+
+def api_url(path: str) -> URL:
+    """``path`` on PUBLIC_API_URL.
+
+    Feed links never come from the request: the Host header is the client's
+    to choose, and the documents are cached and pushed to everyone.
+    """
+    return URL(settings.PUBLIC_API_URL.rstrip("/") + path)
+
+
+def feed_url(name: str, page: int | None = None) -> URL:
+    """Where feed ``name`` ("rss", "atom" or "feed.json") or its archive is served."""
+    url = api_url(FEED_PATH + name)
+    return url if page is None else url.include_query_params(page=page)
+
+
+async def load_page(
+    session: AsyncSession, name: str, page: int | None
+) -> FeedPage | None:
+    """The current document (``page=None``) or archive ``page`` of feed ``name``.
+
+    None if that archive doesn't exist (yet).
+    """
+    size = settings.FEED_PAGE_SIZE
+    total = (
+        await session.execute(
+            select(func.coalesce(func.sum(PublicPostDaily.post_count), 0))
+        )
+    ).scalar_one()
+    archives = archive_count(total, size)
+
+    def page_url(number: int) -> str:
+        return str(feed_url(name, number))
+
+    newest_first = (PublishedPost.published_at.desc(), PublishedPost.id.desc())
+    if page is None:
+        query = select(PublishedPost).order_by(*newest_first).limit(size)
+        older = page_url(archives) if archives else None
+        newer = None
+    else:
+        if page > archives:
+            return None
+        # Archive pages count from the oldest post, so they stay put
+        oldest_page = (
+            select(PublishedPost.id)
+            .order_by(PublishedPost.published_at, PublishedPost.id)
+            .offset((page - 1) * size)
+            .limit(size)
+            .subquery()
+        )
+        query = (
+            select(PublishedPost)
+            .join(oldest_page, oldest_page.c.id == PublishedPost.id)
+            .order_by(*newest_first)
+        )
+        older = page_url(page - 1) if page > 1 else None
+        newer = page_url(page + 1) if page < archives else None
+    posts = list((await session.execute(query)).scalars().all())
+
+    return FeedPage(
+        posts=posts,
+        site_url=settings.PUBLIC_SITE_URL.rstrip("/"),
+        self_url=str(feed_url(name, page)),
+        current_url=str(feed_url(name)),
+        prev_archive_url=older,
+        next_archive_url=newer,
+        is_archive=page is not None,
+        hub_url=None if page else str(api_url(HUB_PATH)),
+    )
+
+
+def post_title(post: PublishedPost) -> str:
+    return f"{post.channel_id or 'Personal'} - {post.date}"
+
+
+def _link(page: FeedPage, post: PublishedPost) -> str:
+    return f"{page.site_url}/post/{post.slug}"
+
+
+def _summary(post: PublishedPost) -> str:
+    return (post.text or "")[:SUMMARY_CHARS]
+
+
+def _utc(value: dt.datetime) -> dt.datetime:
+    # SQLite hands back naive datetimes; stored values are UTC
+    return value if value.tzinfo else value.replace(tzinfo=dt.timezone.utc)
+
+
+def http_date(value: dt.datetime) -> str:
+    return format_datetime(_utc(value).astimezone(dt.timezone.utc), usegmt=True)
+
+
+def _rfc3339(value: dt.datetime) -> str:
+    return _utc(value).isoformat()
+
+
+def _atom_links(page: FeedPage, feed_type: str) -> list[str]:
+    links = [(page.self_url, "self"), (page.current_url, "current")]
+    if page.prev_archive_url:
+        links.append((page.prev_archive_url, "prev-archive"))
+    if page.next_archive_url:
+        links.append((page.next_archive_url, "next-archive"))
+    tag = "atom:link" if feed_type == RSS_TYPE else "link"
+    rendered = [
+        f'<{tag} href="{xml_escape(href)}" rel="{rel}" type="{feed_type}"/>'
+        for href, rel in links
+    ]
+    if page.hub_url:
+        rendered.append(f'<{tag} href="{xml_escape(page.hub_url)}" rel="hub"/>')
+    return rendered
+
+
+def render_rss(page: FeedPage) -> str:
+    items = "\n".join(
+        f"""    <item>
+      <title>{xml_escape(post_title(post))}</title>
+      <link>{xml_escape(_link(page, post))}</link>
+      <guid isPermaLink="false">{post.id}</guid>
+      <pubDate>{http_date(post.published_at)}</pubDate>
+      <description>{xml_escape(_summary(post))}</description>
+    </item>"""
+        for post in page.posts
+    )
+    links = "\n".join(f"    {link}" for link in _atom_links(page, RSS_TYPE))
+    archive = "    <fh:archive/>\n" if page.is_archive else ""
+    return f"""<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0" xmlns:atom="http://www.w3.org/2005/Atom" \
+xmlns:fh="http://purl.org/syndication/history/1.0">
+  <channel>
+    <title>{TITLE}</title>
+    <link>{xml_escape(page.site_url)}</link>
+    <description>{DESCRIPTION}</description>
+    <language>en</language>
+    <lastBuildDate>{http_date(page.updated)}</lastBuildDate>
+{links}
+{archive}{items}
+  </channel>
+</rss>"""
+
+
+def render_atom(page: FeedPage) -> str:
+    entries = "\n".join(
+        f"""  <entry>
+    <id>urn:uuid:{post.id}</id>
+    <title>{xml_escape(post_title(post))}</title>
+    <link href="{xml_escape(_link(page, post))}"/>
+    <published>{_rfc3339(post.published_at)}</published>
+    <updated>{_rfc3339(post.published_at)}</updated>
+    <summary>{xml_escape(_summary(post))}</summary>
+  </entry>"""
+        for post in page.posts
+    )
+    links = "\n".join(f"  {link}" for link in _atom_links(page, ATOM_TYPE))
+    archive = "  <fh:archive/>\n" if page.is_archive else ""
+    return f"""<?xml version="1.0" encoding="UTF-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom" \
+xmlns:fh="http://purl.org/syndication/history/1.0">
+  <id>{xml_escape(page.self_url)}</id>
+  <title>{TITLE}</title>
+  <subtitle>{DESCRIPTION}</subtitle>
+  <updated>{_rfc3339(page.updated)}</updated>
+  <author><name>DayCast</name></author>
+  <link href="{xml_escape(page.site_url)}" rel="alternate" type="text/html"/>
+{links}
+{archive}{entries}
+</feed>"""
+
+
+def render_json_feed(page: FeedPage) -> str:
+    feed = {
+        "version": "https://jsonfeed.org/version/1.1",
+        "title": TITLE,
+        "description": DESCRIPTION,
+        "home_page_url": page.site_url,
+        "feed_url": page.self_url,
+        "language": "en",
+        "items": [
+            {
+                "id": str(post.id),
+                "url": _link(page, post),
+                "title": post_title(post),
+                "content_text": _summary(post),
+                "date_published": _rfc3339(post.published_at),
+            }
+            for post in page.posts
+        ],
+    }
+    # JSON Feed only knows "next" (older) pages
+    if page.prev_archive_url:
+        feed["next_url"] = page.prev_archive_url
+    if page.hub_url:
+        feed["hubs"] = [{"type": "WebSub", "url": page.hub_url}]
+    return json.dumps(feed, ensure_ascii=False)
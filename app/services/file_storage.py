@@ -1,9 +1,19 @@
+import asyncio
+import os
 import uuid
-from datetime import date
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
 from pathlib import Path
 
+from app.config import settings
+
 _PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
-UPLOAD_DIR = _PROJECT_ROOT / "data" / "uploads"
+UPLOAD_DIR = (
+    Path(settings.UPLOAD_DIR)
+    if settings.UPLOAD_DIR
+    else _PROJECT_ROOT / "data" / "uploads"
+)
 ALLOWED_CONTENT_TYPES = {
     "image/jpeg": ".jpg",
     "image/png": ".png",
@@ -12,11 +22,293 @@ ALLOWED_CONTENT_TYPES = {
 MAX_IMAGE_SIZE = 5 * 1024 * 1024  # 5 MB
 
 
-def get_upload_path(client_id: uuid.UUID, day: date, file_ext: str) -> Path:
+@dataclass
+class StoredObject:
+    key: str
+    size: int
+    modified_at: datetime
+
+
+class StorageBackend(ABC):
+    """Upload storage interface.
+
+    Keys are relative paths of the form ``{client_id}/{date}/{uuid}.{ext}`` —
+    the same value stored in ``InputItem.content`` for image items.
+    """
+
+    @abstractmethod
+    async def save(self, key: str, data: bytes, content_type: str) -> None:
+        ...
+
+    @abstractmethod
+    async def read(self, key: str) -> bytes | None:
+        ...
+
+    @abstractmethod
+    async def stat(self, key: str) -> StoredObject | None:
+        ...
+
+    @abstractmethod
+    async def delete(self, key: str) -> bool:
+        ...
+
+    @abstractmethod
+    async def list_objects(
+        self, start_after: str | None = None, limit: int = 1000
+    ) -> list[StoredObject]:
+        """Up to ``limit`` objects with key > ``start_after``, in key order."""
+
+    def local_path(self, key: str) -> Path | None:
+        """Filesystem path for the key, if the backend stores files locally."""
+        return None
+
+    def presigned_download_url(self, key: str) -> str | None:
+        """Short-lived URL the client can GET directly, or None if unsupported."""
+        return None
+
+    def presigned_upload(self, key: str, content_type: str) -> dict | None:
+        """Presigned POST form ({"url", "fields"}) for direct uploads, or None."""
+        return None
+
+
+class LocalStorage(StorageBackend):
+    def __init__(self, root: Path):
+        self.root = root
+
+    def local_path(self, key: str) -> Path:
+        path = (self.root / key).resolve()
+        if not path.is_relative_to(self.root.resolve()):
+            raise ValueError(f"Key escapes upload root: {key}")
+        return path
+
+    async def save(self, key: str, data: bytes, content_type: str) -> None:
+        path = self.local_path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+
+    async def read(self, key: str) -> bytes | None:
+        path = self.local_path(key)
+        if not path.is_file():
+            return None
+        return path.read_bytes()
+
+    async def stat(self, key: str) -> StoredObject | None:
+        path = self.local_path(key)
+        if not path.is_file():
+            return None
+        st = path.stat()
+        return StoredObject(
+            key=key,
+            size=st.st_size,
+            modified_at=datetime.fromtimestamp(st.st_mtime, tz=timezone.utc),
+        )
+
+    async def delete(self, key: str) -> bool:
+        path = self.local_path(key)
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            return False
+        return True
+
+    async def list_objects(
+        self, start_after: str | None = None, limit: int = 1000
+    ) -> list[StoredObject]:
+        return await asyncio.to_thread(self._list_objects, start_after, limit)
+
+    def _list_objects(self, start_after: str | None, limit: int) -> list[StoredObject]:
+        found: list[StoredObject] = []
+
+        def walk(directory: str, prefix: str) -> bool:
+            with os.scandir(directory) as it:
+                # Directories sort as "name/" so the walk matches plain key order
+                entries = sorted(
+                    it, key=lambda e: e.name + ("/" if e.is_dir() else "")
+                )
+            for entry in entries:
+                key = prefix + entry.name
+                if entry.is_dir():
+                    dir_prefix = key + "/"
+                    # Whole subtree sorts before the cursor — skip without listing it
+                    if (
+                        start_after
+                        and dir_prefix < start_after
+                        and not start_after.startswith(dir_prefix)
+                    ):
+                        continue
+                    if walk(entry.path, dir_prefix):
+                        return True
+                elif entry.is_file():
+                    if start_after and key <= start_after:
+                        continue
+                    st = entry.stat()
+                    found.append(
+                        StoredObject(
+                            key=key,
+                            size=st.st_size,
+                            modified_at=datetime.fromtimestamp(
+                                st.st_mtime, tz=timezone.utc
+                            ),
+                        )
+                    )
+                    if len(found) >= limit:
+                        return True
+            return False
+
+        if self.root.is_dir():
+            walk(str(self.root), "")
+        return found
+
+
+class S3Storage(StorageBackend):
+    """S3-compatible object storage (AWS S3, MinIO, R2, ...).
+
+    boto3 is synchronous, so every network call runs in a worker thread.
+    """
+
+    def __init__(
+        self,
+        bucket: str,
+        endpoint_url: str | None = None,
+        region: str | None = None,
+        access_key_id: str | None = None,
+        secret_access_key: str | None = None,
+        presign_expires: int = 900,
+    ):
+        try:
+            import boto3
+        except ImportError as e:
+            raise RuntimeError(
+                "STORAGE_BACKEND=s3 requires boto3 (pip install -e '.[s3]')"
+            ) from e
+
+        self.bucket = bucket
+        self.presign_expires = presign_expires
+        self._client = boto3.client(
+            "s3",
+            endpoint_url=endpoint_url or None,
+            region_name=region or None,
+            aws_access_key_id=access_key_id or None,
+            aws_secret_access_key=secret_access_key or None,
+        )
+
+    def _is_missing(self, exc: Exception) -> bool:
+        code = getattr(exc, "response", {}).get("Error", {}).get("Code")
+        return code in ("404", "NoSuchKey", "NotFound")
+
+    async def save(self, key: str, data: bytes, content_type: str) -> None:
+        await asyncio.to_thread(
+            self._client.put_object,
+            Bucket=self.bucket,
+            Key=key,
+            Body=data,
+            ContentType=content_type,
+        )
+
+    async def read(self, key: str) -> bytes | None:
+        try:
+            obj = await asyncio.to_thread(
+                self._client.get_object, Bucket=self.bucket, Key=key
+            )
+        except Exception as e:
+            if self._is_missing(e):
+                return None
+            raise
+        return await asyncio.to_thread(obj["Body"].read)
+
+    async def stat(self, key: str) -> StoredObject | None:
+        try:
+            head = await asyncio.to_thread(
+                self._client.head_object, Bucket=self.bucket, Key=key
+            )
+        except Exception as e:
+            if self._is_missing(e):
+                return None
+            raise
+        return StoredObject(
+            key=key, size=head["ContentLength"], modified_at=head["LastModified"]
+        )
+
+    async def delete(self, key: str) -> bool:
+        if await self.stat(key) is None:
+            return False
+        await asyncio.to_thread(
+            self._client.delete_object, Bucket=self.bucket, Key=key
+        )
+        return True
+
+    async def list_objects(
+        self, start_after: str | None = None, limit: int = 1000
+    ) -> list[StoredObject]:
+        params = {"Bucket": self.bucket, "MaxKeys": limit}
+        if start_after:
+            params["StartAfter"] = start_after
+        resp = await asyncio.to_thread(self._client.list_objects_v2, **params)
+        return [
+            StoredObject(key=o["Key"], size=o["Size"], modified_at=o["LastModified"])
+            for o in resp.get("Contents", [])
+        ]
+
+    def presigned_download_url(self, key: str) -> str:
+        return self._client.generate_presigned_url(
+            "get_object",
+            Params={"Bucket": self.bucket, "Key": key},
+            ExpiresIn=self.presign_expires,
+        )
+
+    def presigned_upload(self, key: str, content_type: str) -> dict:
+        return self._client.generate_presigned_post(
+            Bucket=self.bucket,
+            Key=key,
+            Fields={"Content-Type": content_type},
+            Conditions=[
+                {"Content-Type": content_type},
+                ["content-length-range", 1, MAX_IMAGE_SIZE],
+            ],
+            ExpiresIn=self.presign_expires,
+        )
+
+
+_storage: StorageBackend | None = None
+
+
+def get_storage() -> StorageBackend:
+    global _storage
+    if _storage is None:
+        if settings.STORAGE_BACKEND == "s3":
+            _storage = S3Storage(
+                bucket=settings.S3_BUCKET,
+                endpoint_url=settings.S3_ENDPOINT_URL,
+                region=settings.S3_REGION,
+                access_key_id=settings.S3_ACCESS_KEY_ID,
+                secret_access_key=settings.S3_SECRET_ACCESS_KEY,
+                presign_expires=settings.S3_PRESIGN_EXPIRES_SECONDS,
+            )
+        else:
+            _storage = LocalStorage(UPLOAD_DIR)
+    return _storage
+
+
+def get_upload_key(client_id: uuid.UUID, day: date, file_ext: str) -> str:
     file_id = uuid.uuid4()
-    return UPLOAD_DIR / str(client_id) / day.isoformat() / f"{file_id}{file_ext}"
+    return f"{client_id}/{day.isoformat()}/{file_id}{file_ext}"
+
+
+def is_upload_key(key: str, client_id: uuid.UUID, day: date) -> bool:
+    """True if ``key`` has exactly the shape get_upload_key gives this client
+    and day: no extra segments, no ``..``, a UUID file name, an allowed type."""
+    prefix = f"{client_id}/{day.isoformat()}/"
+    if not key.startswith(prefix):
+        return False
+    name = key.removeprefix(prefix)
+    stem, dot, ext = name.partition(".")
+    if f"{dot}{ext}" not in ALLOWED_CONTENT_TYPES.values():
+        return False
+    try:
+        return str(uuid.UUID(stem)) == stem
+    except ValueError:
+        return False
 
 
-async def save_upload(data: bytes, path: Path) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_bytes(data)
+async def save_upload(data: bytes, key: str, content_type: str) -> None:
+    await get_storage().save(key, data, content_type)
@@ -0,0 +1,49 @@
+import uuid
+from datetime import date
+
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import dialect_insert
+from app.models.generation_quota_usage import GenerationQuotaUsage
+
+
+async def reserve_generation(
+    session: AsyncSession, client_id: uuid.UUID, day: date, limit: int
+) -> bool:
+    """Take one generation from the client's quota for ``day``.
+
+    A single upsert whose update only fires while ``used < limit``: when the
+    quota is spent no row comes back, so concurrent requests can't overshoot.
+    Commits immediately so other requests see the reservation.
+    """
+    if limit <= 0:
+        return False
+    table = GenerationQuotaUsage.__table__
+    stmt = dialect_insert(session, table).values(client_id=client_id, day=day, used=1)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.client_id, table.c.day],
+        set_={"used": table.c.used + 1},
+        where=table.c.used < limit,
+    ).returning(table.c.used)
+    result = await session.execute(stmt)
+    reserved = result.scalar_one_or_none() is not None
+    await session.commit()
+    return reserved
+
+
+async def release_generation(
+    session: AsyncSession, client_id: uuid.UUID, day: date
+) -> None:
+    """Give back a reservation whose generation never got saved."""
+    await session.execute(
+        update(GenerationQuotaUsage)
+        .where(
+            GenerationQuotaUsage.client_id == client_id,
+            GenerationQuotaUsage.day == day,
+            GenerationQuotaUsage.used > 0,
+        )
+        .values(used=GenerationQuotaUsage.used - 1)
+    )
+    await session.commit()
+
@@ -0,0 +1,194 @@
+"""Open Graph preview cards for public posts (GET /public/posts/{slug}/og.png).
+
+A card shows the post's first line as its title, the channel, the date and an
+excerpt of the rest. Each card is rendered once, in a small thread pool, and
+kept in OG_IMAGE_DIR under a hash of everything drawn on it, so the burst of
+crawler hits after a link is shared reads one file. Concurrent misses for the
+same card share one render; at most OG_IMAGE_MAX_PENDING renders queue before
+requests are turned away. Bump RENDER_VERSION when the layout changes so the
+new design gets new files. Cards of unpublished posts are left on disk.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from functools import cache
+from pathlib import Path
+
+from PIL import Image, ImageDraw, ImageFont
+
+from app.config import settings
+from app.models.published_post import PublishedPost
+
+_PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+OG_IMAGE_DIR = (
+    Path(settings.OG_IMAGE_DIR)
+    if settings.OG_IMAGE_DIR
+    else _PROJECT_ROOT / "data" / "og"
+)
+
+RENDER_VERSION = 1
+WIDTH, HEIGHT = 1200, 630
+MARGIN = 80
+BACKGROUND = "#f8f5ef"
+ACCENT = "#d9643a"
+INK = "#1f1d1a"
+MUTED = "#6f6a62"
+TITLE_CHARS = 200
+EXCERPT_CHARS = 600
+# Not strftime("%B"): the card must not depend on the server's locale
+MONTHS = (
+    "January",
+    "February",
+    "March",
+    "April",
+    "May",
+    "June",
+    "July",
+    "August",
+    "September",
+    "October",
+    "November",
+    "December",
+)
+
+# Pillow draws text with the GIL held, so this only bounds the work; PNG
+# encoding (zlib) runs in parallel
+_executor = ThreadPoolExecutor(
+    max_workers=settings.OG_IMAGE_WORKERS, thread_name_prefix="og-image"
+)
+_inflight: dict[str, asyncio.Future] = {}
+
+
+class OgImageBusyError(Exception):
+    """Raised when OG_IMAGE_MAX_PENDING cards are already queued or rendering."""
+
+
+@dataclass(frozen=True)
+class Card:
+    title: str
+    channel: str
+    date: str
+    excerpt: str
+
+
+def card_for(post: PublishedPost) -> Card:
+    lines = [line.strip() for line in (post.text or "").splitlines() if line.strip()]
+    title = lines[0] if lines else str(post.date)
+    return Card(
+        title=title[:TITLE_CHARS],
+        channel=post.channel_id or "Personal",
+        date=f"{MONTHS[post.date.month - 1]} {post.date.day}, {post.date.year}",
+        excerpt=" ".join(lines[1:])[:EXCERPT_CHARS],
+    )
+
+
+def card_key(card: Card) -> str:
+    fonts = [settings.OG_FONT_PATH, settings.OG_FONT_BOLD_PATH]
+    payload = json.dumps([RENDER_VERSION, fonts, asdict(card)], ensure_ascii=False)
+    return hashlib.sha256(payload.encode()).hexdigest()[:32]
+
+
+@cache
+def _font(bold: bool, size: int) -> ImageFont.FreeTypeFont:
+    path = settings.OG_FONT_BOLD_PATH if bold else settings.OG_FONT_PATH
+    if path:
+        return ImageFont.truetype(path, size)
+    return ImageFont.load_default(size)
+
+
+def _wrap(
+    draw: ImageDraw.ImageDraw, text: str, font, width: int, max_lines: int
+) -> list[str]:
+    """Greedy word wrap to ``width`` pixels; the last kept line gets an ellipsis."""
+    lines: list[str] = []
+    line = ""
+    for word in text.split():
+        candidate = f"{line} {word}" if line else word
+        if draw.textlength(candidate, font=font) <= width:
+            line = candidate
+            continue
+        if line:
+            lines.append(line)
+        line = word
+        while draw.textlength(line, font=font) > width:  # a word wider than a line
+            cut = len(line) - 1
+            while cut > 1 and draw.textlength(line[:cut], font=font) > width:
+                cut -= 1
+            lines.append(line[:cut])
+            line = line[cut:]
+    if line:
+        lines.append(line)
+    if len(lines) <= max_lines:
+        return lines
+    last = lines[max_lines - 1]
+    while last and draw.textlength(f"{last}…", font=font) > width:
+        last = last[:-1].rstrip()
+    return lines[: max_lines - 1] + [f"{last}…"]
+
+
+def render(card: Card) -> Image.Image:
+    image = Image.new("RGB", (WIDTH, HEIGHT), BACKGROUND)
+    draw = ImageDraw.Draw(image)
+    draw.rectangle((0, 0, 16, HEIGHT), fill=ACCENT)
+    width = WIDTH - 2 * MARGIN
+
+    label, meta = _font(True, 30), _font(False, 30)
+    channel = card.channel.upper()
+    draw.text((MARGIN, 70), channel, font=label, fill=ACCENT)
+    offset = draw.textlength(f"{channel}   ", font=label)
+    draw.text((MARGIN + offset, 70), f"·   {card.date}", font=meta, fill=MUTED)
+
+    y = 140
+    title = _font(True, 60)
+    for line in _wrap(draw, card.title, title, width, max_lines=2):
+        draw.text((MARGIN, y), line, font=title, fill=INK)
+        y += 74
+
+    excerpt = _font(False, 34)
+    y += 20
+    lines = (HEIGHT - 110 - y) // 46
+    for line in _wrap(draw, card.excerpt, excerpt, width, max_lines=lines):
+        draw.text((MARGIN, y), line, font=excerpt, fill=MUTED)
+        y += 46
+
+    draw.text((MARGIN, HEIGHT - 80), "DayCast", font=_font(True, 30), fill=INK)
+    return image
+
+
+def _write_card(card: Card, path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    image = render(card)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-", suffix=".png")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            image.save(f, format="PNG", optimize=True)
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+async def image_path(post: PublishedPost) -> Path:
+    """Path of the post's card, rendering it first if it isn't on disk yet."""
+    card = card_for(post)
+    key = card_key(card)
+    path = OG_IMAGE_DIR / key[:2] / f"{key}.png"
+    if path.exists():
+        return path
+    pending = _inflight.get(key)
+    if pending is None:
+        if len(_inflight) >= settings.OG_IMAGE_MAX_PENDING:
+            raise OgImageBusyError()
+        loop = asyncio.get_running_loop()
+        pending = loop.run_in_executor(_executor, _write_card, card, path)
+        _inflight[key] = pending
+        pending.add_done_callback(lambda _: _inflight.pop(key, None))
+    # Shielded: a crawler hanging up mustn't cancel the render others wait on
+    await asyncio.shield(pending)
+    return path
@@ -0,0 +1,59 @@
+"""The input preview frozen onto generation posts at publish time.
+
+Public reads serve ``PublishedPost.preview`` instead of joining the day's
+input items. New items don't show up in it, but editing or clearing an item
+refreshes the preview of the day's posts, so deleted or rewritten notes and
+image keys don't stay public.
+"""
+
+import uuid
+from datetime import date
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.input_item import InputItem
+from app.models.published_post import PublishedPost
+
+PREVIEW_ITEMS = 5
+
+
+async def build_preview(
+    session: AsyncSession, client_id: uuid.UUID, day: date
+) -> list[str]:
+    """First live items of the day, as shown under the post."""
+    result = await session.execute(
+        select(InputItem.content)
+        .where(
+            InputItem.client_id == client_id,
+            InputItem.date == day,
+            InputItem.cleared == False,  # noqa: E712
+        )
+        .order_by(InputItem.created_at)
+        .limit(PREVIEW_ITEMS)
+    )
+    return [content[:80] for content in result.scalars().all()]
+
+
+async def refresh_previews(
+    session: AsyncSession, client_id: uuid.UUID, day: date
+) -> list[PublishedPost]:
+    """Trim the day's post previews to what is still live; caller commits.
+
+    Returns the posts whose preview changed.
+    """
+    result = await session.execute(
+        select(PublishedPost).where(
+            PublishedPost.client_id == client_id,
+            PublishedPost.date == day,
+            PublishedPost.source == "generation",
+        )
+    )
+    posts = result.scalars().all()
+    if not posts:
+        return []
+    preview = await build_preview(session, client_id, day)
+    changed = [post for post in posts if post.preview != preview]
+    for post in changed:
+        post.preview = preview
+    return changed
@@ -0,0 +1,81 @@
+"""Posts-per-day-and-channel counters for the public calendar, archive and stats.
+
+``publish``/``unpublish`` adjust ``public_post_daily`` in the same
+transaction as the post itself; ``rebuild`` recomputes it from
+``published_posts`` (``python -m app.jobs.public_stats``).
+"""
+
+import uuid
+from datetime import date
+
+from sqlalchemy import delete, func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import dialect_insert
+from app.models.public_post_daily import PublicPostDaily
+from app.models.published_post import PublishedPost
+
+INPUT_CHANNEL = ""  # channel key for posts published straight from an input item
+
+
+async def bump_public_day(
+    session: AsyncSession, day: date, channel_id: str | None, delta: int
+) -> None:
+    """Add ``delta`` posts to (day, channel). Runs in the caller's transaction."""
+    table = PublicPostDaily.__table__
+    stmt = dialect_insert(session, table).values(
+        date=day,
+        channel_id=channel_id or INPUT_CHANNEL,
+        month=day.replace(day=1),
+        post_count=max(delta, 0),
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.date, table.c.channel_id],
+        set_={"post_count": table.c.post_count + delta},
+    )
+    await session.execute(stmt)
+
+
+async def forget_client_day(
+    session: AsyncSession, client_id: uuid.UUID, day: date
+) -> int:
+    """Uncount a client's posts for ``day`` before they are deleted with it.
+
+    Returns how many posts were uncounted.
+    """
+    result = await session.execute(
+        select(PublishedPost.channel_id, func.count())
+        .where(PublishedPost.client_id == client_id, PublishedPost.date == day)
+        .group_by(PublishedPost.channel_id)
+    )
+    total = 0
+    for channel_id, count in result.all():
+        await bump_public_day(session, day, channel_id, -count)
+        total += count
+    return total
+
+
+async def rebuild(session: AsyncSession) -> int:
+    """Recompute every counter; returns the number of rows. The caller commits.
+
+    On PostgreSQL the table is locked against concurrent publishes meanwhile.
+    """
+    if session.bind.dialect.name == "postgresql":
+        await session.execute(text("LOCK TABLE public_post_daily IN EXCLUSIVE MODE"))
+    await session.execute(delete(PublicPostDaily))
+    result = await session.execute(
+        select(PublishedPost.date, PublishedPost.channel_id, func.count())
+        .group_by(PublishedPost.date, PublishedPost.channel_id)
+    )
+    rows = [
+        PublicPostDaily(
+            date=day,
+            channel_id=channel_id or INPUT_CHANNEL,
+            month=day.replace(day=1),
+            post_count=count,
+        )
+        for day, channel_id, count in result.all()
+    ]
+    session.add_all(rows)
+    await session.flush()
+    return len(rows)
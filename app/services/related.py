@@ -0,0 +1,321 @@
+"""Related posts: a hashed TF-IDF index over the published texts.
+
+Each post is one row of RELATED_INDEX_DIM float32 weights. Words and word
+bigrams are hashed into the columns (with a hash-derived sign, so collisions
+tend to cancel out) with sublinear term frequency. The number of posts using
+each column is kept next to the rows and IDF is applied at query time, so
+publishing or unpublishing touches one row and never re-weights the matrix.
+Related posts are the rows with the highest cosine similarity after IDF
+weighting: one matrix-vector product, a few milliseconds for thousands of
+posts.
+
+Files in RELATED_INDEX_DIR, memory-mapped and so shared by every worker on the
+host through the page cache::
+
+    meta.json     dim, count, capacity, version
+    vectors.f32   capacity x dim weights; rows [0, count) are in use
+    ids.u8        capacity x 16 post UUID bytes
+    df.i32        posts with a non-zero weight per column
+
+Writers hold an exclusive ``flock`` on ``lock`` and queries a shared one, so a
+query never sees a half-moved row. A removed post's slot is filled with the
+last row. ``python -m app.jobs.related_index`` rebuilds the files from
+published_posts, e.g. after changing RELATED_INDEX_DIM.
+"""
+
+import asyncio
+import fcntl
+import json
+import math
+import os
+import re
+import uuid
+import zlib
+from collections import Counter
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+import structlog
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models.published_post import PublishedPost
+
+logger = structlog.get_logger()
+
+_PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+RELATED_INDEX_DIR = (
+    Path(settings.RELATED_INDEX_DIR)
+    if settings.RELATED_INDEX_DIR
+    else _PROJECT_ROOT / "data" / "related"
+)
+
+_WORD = re.compile(r"\w{2,}")
+MIN_CAPACITY = 64
+REBUILD_BATCH = 500
+
+
+def _features(text: str) -> Counter[str]:
+    words = [word for word in _WORD.findall(text.lower()) if not word.isdigit()]
+    features = Counter(words)
+    features.update(f"{a} {b}" for a, b in zip(words, words[1:]))
+    return features
+
+
+def vectorize(text: str, dim: int) -> np.ndarray:
+    vector = np.zeros(dim, dtype=np.float32)
+    for feature, count in _features(text).items():
+        h = zlib.crc32(feature.encode())
+        sign = 1.0 if h & 0x80000000 else -1.0
+        vector[h % dim] += sign * (1.0 + math.log(count))
+    return vector
+
+
+@dataclass
+class _State:
+    """A query-side view of one index version."""
+
+    version: int
+    vectors: np.ndarray  # count x dim, memory-mapped
+    ids: np.ndarray  # count x 16
+    rows: dict[bytes, int]
+    idf2: np.ndarray  # squared IDF per column
+    norms: np.ndarray  # IDF-weighted row norms; inf for empty rows
+
+
+class RelatedIndex:
+    def __init__(self, path: Path, dim: int):
+        self.path = Path(path)
+        self.dim = dim
+        self._state: _State | None = None
+
+    # -- files --
+
+    @contextmanager
+    def _locked(self, exclusive: bool) -> Iterator[None]:
+        self.path.mkdir(parents=True, exist_ok=True)
+        with open(self.path / "lock", "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _read_meta(self) -> dict | None:
+        try:
+            return json.loads((self.path / "meta.json").read_text())
+        except FileNotFoundError:
+            return None
+
+    def _write_meta(self, meta: dict) -> None:
+        tmp = self.path / "meta.json.tmp"
+        tmp.write_text(json.dumps(meta))
+        os.replace(tmp, self.path / "meta.json")
+
+    def _map(self, meta: dict, mode: str) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        shape = (meta["capacity"], meta["dim"])
+        vectors = np.memmap(self.path / "vectors.f32", np.float32, mode, shape=shape)
+        ids = np.memmap(self.path / "ids.u8", np.uint8, mode, shape=(shape[0], 16))
+        df = np.memmap(self.path / "df.i32", np.int32, mode, shape=(shape[1],))
+        return vectors, ids, df
+
+    def _allocate(self, meta: dict, capacity: int) -> None:
+        """Create or grow the files to ``capacity`` rows (new rows are zero)."""
+        for name, row_bytes in (("vectors.f32", 4 * meta["dim"]), ("ids.u8", 16)):
+            with open(self.path / name, "ab") as f:
+                f.truncate(capacity * row_bytes)
+        with open(self.path / "df.i32", "ab") as f:
+            f.truncate(4 * meta["dim"])
+        meta["capacity"] = capacity
+
+    def _writable_meta(self) -> dict:
+        meta = self._read_meta()
+        if meta is None:
+            meta = {"dim": self.dim, "count": 0, "capacity": 0, "version": 0}
+            self._allocate(meta, MIN_CAPACITY)
+        elif meta["dim"] != self.dim:
+            raise ValueError(
+                f"Related index has dim {meta['dim']}, RELATED_INDEX_DIM is "
+                f"{self.dim}: run python -m app.jobs.related_index"
+            )
+        return meta
+
+    # -- writes --
+
+    def add(self, post_id: uuid.UUID, text: str) -> None:
+        with self._locked(exclusive=True):
+            meta = self._writable_meta()
+            vectors, ids, df = self._map(meta, "r+")
+            count = meta["count"]
+            key = np.frombuffer(post_id.bytes, np.uint8)
+            if (ids[:count] == key).all(axis=1).any():
+                return
+            if count == meta["capacity"]:
+                del vectors, ids, df
+                self._allocate(meta, 2 * meta["capacity"])
+                vectors, ids, df = self._map(meta, "r+")
+            row = vectorize(text, self.dim)
+            vectors[count] = row
+            ids[count] = key
+            df += row != 0
+            vectors.flush()
+            ids.flush()
+            df.flush()
+            meta["count"] = count + 1
+            meta["version"] += 1
+            self._write_meta(meta)
+
+    def remove(self, post_ids: Iterable[uuid.UUID]) -> None:
+        with self._locked(exclusive=True):
+            meta = self._read_meta()
+            if meta is None:
+                return
+            vectors, ids, df = self._map(meta, "r+")
+            count = meta["count"]
+            for post_id in post_ids:
+                key = np.frombuffer(post_id.bytes, np.uint8)
+                matches = np.flatnonzero((ids[:count] == key).all(axis=1))
+                if not matches.size:
+                    continue
+                row, last = int(matches[0]), count - 1
+                df -= vectors[row] != 0
+                vectors[row], ids[row] = vectors[last], ids[last]
+                vectors[last], ids[last] = 0, 0
+                count -= 1
+            if count == meta["count"]:
+                return
+            vectors.flush()
+            ids.flush()
+            df.flush()
+            meta["count"] = count
+            meta["version"] += 1
+            self._write_meta(meta)
+
+    def rebuild(self, posts: Iterable[tuple[uuid.UUID, str]]) -> int:
+        posts = list(posts)
+        with self._locked(exclusive=True):
+            old = self._read_meta()
+            meta = {
+                "dim": self.dim,
+                "count": len(posts),
+                "capacity": 0,
+                "version": (old["version"] if old else 0) + 1,
+            }
+            for name in ("vectors.f32", "ids.u8", "df.i32"):
+                (self.path / name).unlink(missing_ok=True)
+            self._allocate(meta, max(MIN_CAPACITY, len(posts)))
+            vectors, ids, df = self._map(meta, "r+")
+            for row, (post_id, text) in enumerate(posts):
+                vectors[row] = vectorize(text, self.dim)
+                ids[row] = np.frombuffer(post_id.bytes, np.uint8)
+            df[:] = (vectors[: len(posts)] != 0).sum(axis=0)
+            vectors.flush()
+            ids.flush()
+            df.flush()
+            self._write_meta(meta)
+        return len(posts)
+
+    # -- queries --
+
+    def _load(self, meta: dict) -> _State:
+        vectors, ids, df = self._map(meta, "r")
+        count = meta["count"]
+        vectors, ids = vectors[:count], ids[:count]
+        idf = np.log((1 + count) / (1 + df.astype(np.float32))) + 1
+        idf2 = (idf * idf).astype(np.float32)
+        norms = np.sqrt((vectors * vectors) @ idf2)
+        norms[norms == 0] = np.inf
+        rows = {ids[row].tobytes(): row for row in range(count)}
+        return _State(meta["version"], vectors, ids, rows, idf2, norms)
+
+    def related(self, post_id: uuid.UUID, text: str, k: int) -> list[uuid.UUID]:
+        """Up to ``k`` indexed posts most similar to the given one, best first.
+
+        A post missing from the index (e.g. published before it existed) is
+        vectorized from ``text`` on the fly.
+        """
+        with self._locked(exclusive=False):
+            meta = self._read_meta()
+            if meta is None or meta["count"] == 0:
+                return []
+            if self._state is None or self._state.version != meta["version"]:
+                self._state = self._load(meta)
+            state = self._state
+
+            row = state.rows.get(post_id.bytes)
+            if row is not None:
+                query = state.vectors[row]
+            else:
+                query = vectorize(text, meta["dim"])
+            query_norm = math.sqrt(float((query * query) @ state.idf2))
+            if query_norm == 0:
+                return []
+            scores = state.vectors @ (query * state.idf2)
+            scores /= state.norms * query_norm
+            if row is not None:
+                scores[row] = -np.inf
+            k = min(k, len(scores))
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            return [
+                uuid.UUID(bytes=state.ids[i].tobytes()) for i in top if scores[i] > 0
+            ]
+
+
+index = RelatedIndex(RELATED_INDEX_DIR, settings.RELATED_INDEX_DIM)
+
+
+async def after_publish(post: PublishedPost) -> None:
+    """Index a newly published post. Call after commit."""
+    try:
+        await asyncio.to_thread(index.add, post.id, post.text)
+    except (OSError, ValueError) as e:
+        logger.warning(
+            "related_index_update_failed", post_id=str(post.id), error=str(e)
+        )
+
+
+async def before_removal(session: AsyncSession, *where) -> list[uuid.UUID]:
+    """Ids of the posts matching ``where`` that are about to be deleted."""
+    result = await session.execute(select(PublishedPost.id).where(*where))
+    return list(result.scalars().all())
+
+
+async def after_removal(post_ids: list[uuid.UUID]) -> None:
+    """Drop unpublished posts from the index. Call after commit."""
+    if not post_ids:
+        return
+    try:
+        await asyncio.to_thread(index.remove, post_ids)
+    except (OSError, ValueError) as e:
+        logger.warning("related_index_update_failed", error=str(e))
+
+
+async def find(post: PublishedPost, k: int) -> list[uuid.UUID]:
+    return await asyncio.to_thread(index.related, post.id, post.text, k)
+
+
+async def rebuild(session: AsyncSession) -> int:
+    """Re-index every published post. Returns the number indexed."""
+    posts: list[tuple[uuid.UUID, str]] = []
+    after = None
+    while True:
+        query = (
+            select(PublishedPost.id, PublishedPost.text, PublishedPost.published_at)
+            .order_by(PublishedPost.published_at, PublishedPost.id)
+            .limit(REBUILD_BATCH)
+        )
+        if after is not None:
+            query = query.where(
+                tuple_(PublishedPost.published_at, PublishedPost.id) > after
+            )
+        rows = (await session.execute(query)).all()
+        if not rows:
+            break
+        posts += [(row.id, row.text or "") for row in rows]
+        after = tuple_(rows[-1].published_at, rows[-1].id)
+    return await asyncio.to_thread(index.rebuild, posts)
@@ -0,0 +1,213 @@
+"""Full-text search over a client's notes and generated texts.
+
+Postgres: trigger-maintained ``search_vector`` columns with GIN indexes
+(migration 014; not mapped on the models). The query is OR-ed across the
+language configs we write in, ranked with ts_rank and paged by keyset on
+(rank, created_at, id).
+SQLite (tests, local dev): case-insensitive LIKE with the same response shape.
+"""
+
+import base64
+import datetime as dt
+import html
+import uuid
+from dataclasses import dataclass
+
+from sqlalchemy import or_, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.generation import Generation
+from app.models.generation_result import GenerationResult
+from app.models.input_item import InputItem
+
+QUERY_CONFIGS = ("simple", "russian", "english", "german")
+HEADLINE_OPTIONS = (
+    "StartSel=<mark>, StopSel=</mark>, MaxFragments=2, MaxWords=24, MinWords=8"
+)
+SNIPPET_CONTEXT = 60
+
+
+@dataclass
+class SearchHit:
+    kind: str  # "item" | "result"
+    id: uuid.UUID
+    date: dt.date
+    channel_id: str | None
+    created_at: dt.datetime
+    rank: float
+    snippet: str
+
+
+class InvalidCursorError(ValueError):
+    pass
+
+
+def encode_cursor(hit: SearchHit) -> str:
+    raw = f"{hit.rank!r}|{hit.created_at.isoformat()}|{hit.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[float, dt.datetime, uuid.UUID]:
+    try:
+        rank, created_at, hit_id = base64.urlsafe_b64decode(cursor).decode().split("|")
+        return float(rank), dt.datetime.fromisoformat(created_at), uuid.UUID(hit_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise InvalidCursorError("Invalid cursor") from e
+
+
+def _safe_snippet(snippet: str) -> str:
+    """HTML-escape user text but keep the <mark> highlighting."""
+    return (
+        html.escape(snippet)
+        .replace("&lt;mark&gt;", "<mark>")
+        .replace("&lt;/mark&gt;", "</mark>")
+    )
+
+
+_TS_QUERY = " || ".join(f"websearch_to_tsquery('{cfg}', :q)" for cfg in QUERY_CONFIGS)
+
+_PG_SEARCH = """
+WITH q AS (SELECT {ts_query} AS query),
+hits AS (
+    SELECT 'item' AS kind, i.id, i.date, NULL::varchar AS channel_id, i.created_at,
+           ts_rank(i.search_vector, q.query) AS rank,
+           'russian'::regconfig AS config,
+           concat_ws(' ', CASE WHEN i.type = 'image' THEN NULL ELSE i.content END,
+                     left(i.extracted_text, 20000)) AS body
+    FROM input_items i, q
+    WHERE i.client_id = :client_id AND NOT i.cleared AND i.search_vector @@ q.query
+    UNION ALL
+    SELECT 'result', r.id, g.date, r.channel_id, r.created_at,
+           ts_rank(r.search_vector, q.query),
+           CASE r.language
+               WHEN 'ru' THEN 'russian'::regconfig
+               WHEN 'en' THEN 'english'::regconfig
+               WHEN 'de' THEN 'german'::regconfig
+               ELSE 'simple'::regconfig
+           END,
+           r.text
+    FROM generation_results r JOIN generations g ON g.id = r.generation_id, q
+    WHERE g.client_id = :client_id AND r.search_vector @@ q.query
+),
+page AS (
+    SELECT * FROM hits
+    {after_cursor}
+    ORDER BY rank DESC, created_at DESC, id DESC
+    LIMIT :limit
+)
+SELECT page.kind, page.id, page.date, page.channel_id, page.created_at, page.rank,
+       ts_headline(page.config, page.body, q.query, :headline) AS snippet
+FROM page, q
+ORDER BY page.rank DESC, page.created_at DESC, page.id DESC
+"""
+
+
+async def _search_postgres(session, client_id, q, limit, after) -> list[SearchHit]:
+    params = {
+        "q": q,
+        "client_id": client_id,
+        "limit": limit,
+        "headline": HEADLINE_OPTIONS,
+    }
+    after_cursor = ""
+    if after is not None:
+        after_cursor = "WHERE (rank, created_at, id) < (:rank, :created_at, :id)"
+        params["rank"], params["created_at"], params["id"] = after
+    sql = _PG_SEARCH.format(ts_query=_TS_QUERY, after_cursor=after_cursor)
+    result = await session.execute(text(sql), params)
+    return [
+        SearchHit(
+            kind=row.kind,
+            id=row.id,
+            date=row.date,
+            channel_id=row.channel_id,
+            created_at=row.created_at,
+            rank=row.rank,
+            snippet=_safe_snippet(row.snippet),
+        )
+        for row in result
+    ]
+
+
+def _like_snippet(body: str, q: str) -> str:
+    pos = body.lower().find(q.lower())
+    if pos < 0:
+        return html.escape(body[: SNIPPET_CONTEXT * 2])
+    start = max(pos - SNIPPET_CONTEXT, 0)
+    end = pos + len(q)
+    return (
+        html.escape(body[start:pos])
+        + "<mark>"
+        + html.escape(body[pos:end])
+        + "</mark>"
+        + html.escape(body[end : end + SNIPPET_CONTEXT])
+    )
+
+
+def _item_body(item: InputItem) -> str:
+    content = item.content if item.type != "image" else ""
+    return " ".join(t for t in (content, item.extracted_text) if t)
+
+
+async def _search_like(session, client_id, q, limit, after) -> list[SearchHit]:
+    pattern = f"%{q}%"
+    items = await session.execute(
+        select(InputItem)
+        .where(
+            InputItem.client_id == client_id,
+            InputItem.cleared == False,  # noqa: E712
+            or_(
+                (InputItem.type != "image") & InputItem.content.ilike(pattern),
+                InputItem.extracted_text.ilike(pattern),
+            ),
+        )
+    )
+    results = await session.execute(
+        select(GenerationResult, Generation.date)
+        .join(Generation, GenerationResult.generation_id == Generation.id)
+        .where(Generation.client_id == client_id, GenerationResult.text.ilike(pattern))
+    )
+    hits = [
+        SearchHit(
+            "item",
+            item.id,
+            item.date,
+            None,
+            item.created_at,
+            1.0,
+            _like_snippet(_item_body(item), q),
+        )
+        for item in items.scalars()
+    ] + [
+        SearchHit(
+            "result",
+            r.id,
+            day,
+            r.channel_id,
+            r.created_at,
+            1.0,
+            _like_snippet(r.text, q),
+        )
+        for r, day in results
+    ]
+    hits.sort(key=lambda h: (h.rank, h.created_at, h.id), reverse=True)
+    if after is not None:
+        hits = [h for h in hits if (h.rank, h.created_at, h.id) < after]
+    return hits[:limit]
+
+
+async def search(
+    session: AsyncSession,
+    client_id: uuid.UUID,
+    q: str,
+    limit: int,
+    cursor: str | None = None,
+) -> tuple[list[SearchHit], str | None]:
+    """Best matches first; returns (hits, cursor for the next page or None)."""
+    after = decode_cursor(cursor) if cursor else None
+    if session.bind.dialect.name == "sqlite":
+        hits = await _search_like(session, client_id, q, limit + 1, after)
+    else:
+        hits = await _search_postgres(session, client_id, q, limit + 1, after)
+    next_cursor = encode_cursor(hits[limit - 1]) if len(hits) > limit else None
+    return hits[:limit], next_cursor
@@ -0,0 +1,342 @@
+"""Static snapshots of the public posts and feeds, served by Caddy without the API.
+
+With STATIC_SNAPSHOT_DIR set, the directory mirrors the anonymous reads the
+daycast-pub site makes::
+
+    posts/{slug}.json             GET /public/posts/{slug}
+    posts/{slug}.html             pre-rendered article fragment
+    rss.xml, atom.xml, feed.json  GET /public/rss, /public/atom, /public/feed.json
+    archive/rss/{n}.xml, ...      the same with ?page=n
+
+Publish writes the new post and the current feed documents, plus the archive
+pages whose contents or links changed once a page fills up. Unpublishing drops
+the post and rewrites the current documents; the archive pages from the first
+one that held a removed post shift too, and ``run_writer`` rewrites those in
+the background, one pass for however many removals queued up meanwhile.
+Files are replaced atomically; a snapshot that loses a race between two
+concurrent publishes, or a queued rewrite lost to a crash, is corrected by the
+next one or by ``python -m app.jobs.snapshots``, which rebuilds the whole tree.
+Links inside the documents use PUBLIC_API_URL. Snapshot failures are logged and
+never fail the request: the database change is already committed.
+"""
+
+import asyncio
+import html
+import os
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+
+import structlog
+from sqlalchemy import and_, func, or_, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import database
+from app.config import settings
+from app.models.public_post_daily import PublicPostDaily
+from app.models.published_post import PublishedPost
+from app.schemas.publish import PublishedPostResponse
+from app.services.feeds import (
+    archive_count,
+    load_page,
+    post_title,
+    render_atom,
+    render_json_feed,
+    render_rss,
+)
+
+logger = structlog.get_logger()
+
+# API feed name -> (renderer, current document, archive page n)
+FEEDS = {
+    "rss": (render_rss, "rss.xml", "archive/rss/{}.xml"),
+    "atom": (render_atom, "atom.xml", "archive/atom/{}.xml"),
+    "feed.json": (render_json_feed, "feed.json", "archive/feed.json/{}.json"),
+}
+
+POST_BATCH = 500
+RETRY_SECONDS = 30
+
+
+@dataclass(frozen=True)
+class Removal:
+    slugs: list[str]
+    first_page: int  # oldest archive page that held one of the posts
+    archives: int  # archive pages before the removal
+
+
+# Archive rewrite waiting for run_writer, merged across removals
+_queued: Removal | None = None
+_wake = asyncio.Event()
+
+
+def enabled() -> bool:
+    return bool(settings.STATIC_SNAPSHOT_DIR)
+
+
+def _root() -> Path:
+    return Path(settings.STATIC_SNAPSHOT_DIR)
+
+
+def _write_files(files: dict[str, str]) -> None:
+    root = _root()
+    for relative, content in files.items():
+        path = root / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(content)
+            os.chmod(tmp, 0o644)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+
+def _remove_files(relatives: list[str]) -> None:
+    root = _root()
+    for relative in relatives:
+        (root / relative).unlink(missing_ok=True)
+
+
+def render_post_html(post: PublishedPost) -> str:
+    paragraphs = [p.strip() for p in (post.text or "").split("\n\n") if p.strip()]
+    body = "\n".join(
+        f"  <p>{html.escape(p).replace(chr(10), '<br>')}</p>" for p in paragraphs
+    )
+    return f"""<article class="post" data-slug="{html.escape(post.slug)}">
+  <header>
+    <h1>{html.escape(post_title(post))}</h1>
+    <time datetime="{post.published_at.isoformat()}">{post.date}</time>
+  </header>
+{body}
+</article>
+"""
+
+
+def _post_files(post: PublishedPost) -> dict[str, str]:
+    return {
+        f"posts/{post.slug}.json": PublishedPostResponse.model_validate(
+            post
+        ).model_dump_json(),
+        f"posts/{post.slug}.html": render_post_html(post),
+    }
+
+
+def _post_paths(slug: str) -> list[str]:
+    return [f"posts/{slug}.json", f"posts/{slug}.html"]
+
+
+async def _total_posts(session: AsyncSession) -> int:
+    return (
+        await session.execute(
+            select(func.coalesce(func.sum(PublicPostDaily.post_count), 0))
+        )
+    ).scalar_one()
+
+
+async def _feed_files(session: AsyncSession, pages: list[int | None]) -> dict[str, str]:
+    files = {}
+    for name, (render, current, archive) in FEEDS.items():
+        for number in pages:
+            page = await load_page(session, name, number)
+            if page is None:
+                continue
+            path = current if number is None else archive.format(number)
+            files[path] = render(page)
+    return files
+
+
+def _archive_paths(first: int, last: int) -> list[str]:
+    return [
+        archive.format(number)
+        for _, _, archive in FEEDS.values()
+        for number in range(first, last + 1)
+    ]
+
+
+async def after_publish(session: AsyncSession, post: PublishedPost) -> None:
+    """Write ``post`` and the feed documents it changed. Call after commit."""
+    if not enabled():
+        return
+    try:
+        total = await _total_posts(session)
+        archives = archive_count(total, settings.FEED_PAGE_SIZE)
+        pages: list[int | None] = [None]
+        if archives and total % settings.FEED_PAGE_SIZE == 0:
+            # A new archive page just filled up; the one before it now links
+            # forward to it
+            pages += range(max(archives - 1, 1), archives + 1)
+        files = _post_files(post) | await _feed_files(session, pages)
+        await asyncio.to_thread(_write_files, files)
+    except Exception as e:
+        logger.warning("snapshot_write_failed", slug=post.slug, error=str(e))
+
+
+async def after_update(posts: list[PublishedPost]) -> None:
+    """Rewrite the files of posts whose public fields changed. Call after commit."""
+    if not enabled() or not posts:
+        return
+    try:
+        files: dict[str, str] = {}
+        for post in posts:
+            files |= _post_files(post)
+        await asyncio.to_thread(_write_files, files)
+    except Exception as e:
+        slugs = [post.slug for post in posts]
+        logger.warning("snapshot_write_failed", slugs=slugs, error=str(e))
+
+
+async def before_removal(session: AsyncSession, *where) -> Removal | None:
+    """Note which posts matching ``where`` are about to be deleted, and where."""
+    if not enabled():
+        return None
+    result = await session.execute(
+        select(PublishedPost.slug, PublishedPost.published_at, PublishedPost.id)
+        .where(*where)
+        .order_by(PublishedPost.published_at, PublishedPost.id)
+    )
+    rows = result.all()
+    if not rows:
+        return None
+    # Compare with the stored timestamp, not a round-tripped Python value
+    oldest_at = (
+        select(PublishedPost.published_at)
+        .where(PublishedPost.id == rows[0].id)
+        .correlate(None)
+        .scalar_subquery()
+    )
+    older = (
+        await session.execute(
+            select(func.count()).where(
+                or_(
+                    PublishedPost.published_at < oldest_at,
+                    and_(
+                        PublishedPost.published_at == oldest_at,
+                        PublishedPost.id < rows[0].id,
+                    ),
+                )
+            )
+        )
+    ).scalar_one()
+    return Removal(
+        slugs=[row.slug for row in rows],
+        first_page=older // settings.FEED_PAGE_SIZE + 1,
+        archives=archive_count(await _total_posts(session), settings.FEED_PAGE_SIZE),
+    )
+
+
+def _queue(removal: Removal) -> None:
+    global _queued
+    if _queued is not None:
+        removal = Removal(
+            slugs=_queued.slugs + removal.slugs,
+            first_page=min(_queued.first_page, removal.first_page),
+            archives=max(_queued.archives, removal.archives),
+        )
+    _queued = removal
+    _wake.set()
+
+
+async def after_removal(session: AsyncSession, removal: Removal | None) -> None:
+    """Drop removed posts, rewrite the current feeds and queue the archives.
+
+    Call after commit.
+    """
+    if removal is None:
+        return
+    _queue(removal)
+    try:
+        files = await _feed_files(session, [None])
+        stale = [path for slug in removal.slugs for path in _post_paths(slug)]
+        await asyncio.to_thread(_write_files, files)
+        await asyncio.to_thread(_remove_files, stale)
+    except Exception as e:
+        logger.warning("snapshot_write_failed", slugs=removal.slugs, error=str(e))
+
+
+async def rewrite_archives(session: AsyncSession) -> int:
+    """Rewrite the archive pages queued by ``after_removal``; return how many."""
+    global _queued
+    removal, _queued = _queued, None
+    if removal is None:
+        return 0
+    try:
+        archives = archive_count(await _total_posts(session), settings.FEED_PAGE_SIZE)
+        # Pages from the first removed post on shift; the newest loses its
+        # forward link
+        first = max(min(removal.first_page, archives), 1)
+        files = await _feed_files(session, list(range(first, archives + 1)))
+        stale = _archive_paths(archives + 1, removal.archives)
+        await asyncio.to_thread(_write_files, files)
+        await asyncio.to_thread(_remove_files, stale)
+    except BaseException:
+        _queue(removal)
+        raise
+    return len(files)
+
+
+async def flush() -> None:
+    if _queued is None:
+        return
+    async with database.async_jobs_session() as session:
+        await rewrite_archives(session)
+
+
+async def run_writer() -> None:
+    """Rewrite queued archive pages until cancelled; failures retry later."""
+    while True:
+        await _wake.wait()
+        _wake.clear()
+        try:
+            await flush()
+        except Exception as e:
+            logger.warning("snapshot_archive_rewrite_failed", error=str(e))
+            await asyncio.sleep(RETRY_SECONDS)
+
+
+async def rebuild(session: AsyncSession) -> int:
+    """Rewrite every snapshot and delete stale ones. Returns the post count."""
+    root = _root()
+    written: set[str] = set()
+    after = None
+    while True:
+        query = (
+            select(PublishedPost)
+            .order_by(PublishedPost.published_at, PublishedPost.id)
+            .limit(POST_BATCH)
+        )
+        if after is not None:
+            query = query.where(
+                tuple_(PublishedPost.published_at, PublishedPost.id) > after
+            )
+        posts = (await session.execute(query)).scalars().all()
+        if not posts:
+            break
+        files: dict[str, str] = {}
+        for post in posts:
+            files |= _post_files(post)
+        await asyncio.to_thread(_write_files, files)
+        written |= files.keys()
+        after = tuple_(posts[-1].published_at, posts[-1].id)
+
+    archives = archive_count(await _total_posts(session), settings.FEED_PAGE_SIZE)
+    for number in [None, *range(1, archives + 1)]:
+        files = await _feed_files(session, [number])
+        await asyncio.to_thread(_write_files, files)
+        written |= files.keys()
+
+    def remove_stale() -> int:
+        stale = [
+            path
+            for path in root.rglob("*")
+            if path.is_file() and path.relative_to(root).as_posix() not in written
+        ]
+        for path in stale:
+            path.unlink()
+        return len(stale)
+
+    removed = await asyncio.to_thread(remove_stale)
+    logger.info("snapshots_rebuilt", files=len(written), removed=removed)
+    return len(written)
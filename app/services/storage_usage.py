@@ -0,0 +1,60 @@
+import uuid
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import dialect_insert
+from app.models.client_storage_usage import ClientStorageUsage
+from app.models.counted_upload import CountedUpload
+
+
+async def record_usage(
+    session: AsyncSession,
+    client_id: uuid.UUID,
+    bytes_delta: int,
+    objects_delta: int,
+) -> None:
+    """Adjust the client's usage counters. Runs in the caller's transaction."""
+    table = ClientStorageUsage.__table__
+    stmt = dialect_insert(session, table).values(
+        client_id=client_id,
+        bytes_used=max(bytes_delta, 0),
+        object_count=max(objects_delta, 0),
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.client_id],
+        set_={
+            "bytes_used": table.c.bytes_used + bytes_delta,
+            "object_count": table.c.object_count + objects_delta,
+        },
+    )
+    await session.execute(stmt)
+
+
+async def record_upload(
+    session: AsyncSession, client_id: uuid.UUID, key: str, size: int
+) -> None:
+    """Count a newly stored upload once, however many items reference it.
+
+    Runs in the caller's transaction.
+    """
+    stmt = (
+        dialect_insert(session, CountedUpload.__table__)
+        .values(key=key, client_id=client_id, size=size)
+        .on_conflict_do_nothing(index_elements=["key"])
+    )
+    if (await session.execute(stmt)).rowcount:
+        await record_usage(session, client_id, size, 1)
+
+
+async def get_usage(session: AsyncSession, client_id: uuid.UUID) -> tuple[int, int]:
+    """Return (bytes_used, object_count) — a single primary-key lookup."""
+    result = await session.execute(
+        select(ClientStorageUsage.bytes_used, ClientStorageUsage.object_count).where(
+            ClientStorageUsage.client_id == client_id
+        )
+    )
+    row = result.one_or_none()
+    if row is None:
+        return 0, 0
+    return max(row.bytes_used, 0), max(row.object_count, 0)
@@ -0,0 +1,178 @@
+import uuid
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+
+import structlog
+from sqlalchemy import and_, delete, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.client_storage_usage import ClientStorageUsage
+from app.models.counted_upload import CountedUpload
+from app.models.input_item import InputItem
+from app.models.published_post import PublishedPost
+from app.services.file_storage import StorageBackend, StoredObject
+from app.services.storage_usage import record_usage
+
+logger = structlog.get_logger()
+
+
+@dataclass
+class GcBatchResult:
+    cursor: str | None  # None once the walk wraps around to the start
+    scanned: int = 0
+    deleted: list[str] = field(default_factory=list)
+    freed_bytes: int = 0
+
+
+def parse_upload_key(key: str) -> tuple[uuid.UUID, date] | None:
+    """Split ``{client_id}/{date}/{file}`` — None for anything that doesn't fit."""
+    parts = key.split("/")
+    if len(parts) != 3:
+        return None
+    try:
+        return uuid.UUID(parts[0]), date.fromisoformat(parts[1])
+    except ValueError:
+        return None
+
+
+async def _load_references(
+    session: AsyncSession, objects: list[StoredObject]
+) -> dict[str, list[tuple[bool, datetime, bool]]]:
+    """Map key -> [(cleared, updated_at, published)] for image items pointing at it."""
+    pairs = {p for p in (parse_upload_key(o.key) for o in objects) if p is not None}
+    if not pairs:
+        return {}
+    # Filter on (client_id, date) first so the lookup rides the composite index
+    days = [and_(InputItem.client_id == c, InputItem.date == d) for c, d in pairs]
+    result = await session.execute(
+        select(
+            InputItem.content,
+            InputItem.cleared,
+            InputItem.updated_at,
+            PublishedPost.id.is_not(None),
+        )
+        .outerjoin(PublishedPost, PublishedPost.input_item_id == InputItem.id)
+        .where(
+            or_(*days),
+            InputItem.type == "image",
+            InputItem.content.in_([o.key for o in objects]),
+        )
+    )
+    refs: dict[str, list[tuple[bool, datetime, bool]]] = {}
+    for content, cleared, updated_at, published in result.all():
+        refs.setdefault(content, []).append((cleared, updated_at, published))
+    return refs
+
+
+def _as_utc(value: datetime) -> datetime:
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+async def collect_batch(
+    session: AsyncSession,
+    storage: StorageBackend,
+    cursor: str | None,
+    batch_size: int,
+    grace: timedelta,
+) -> GcBatchResult:
+    """Reconcile one page of stored uploads against ``InputItem`` rows.
+
+    An object is deleted when it is older than ``grace`` and either nothing
+    references it (hard-deleted day, abandoned upload) or every referencing
+    item was soft-deleted more than ``grace`` ago and never published.
+    Usage counters give back what was counted for the object (nothing for an
+    abandoned upload), in the same transaction; the caller commits.
+    """
+    objects = await storage.list_objects(start_after=cursor, limit=batch_size)
+    if not objects:
+        return GcBatchResult(cursor=None)
+
+    now = datetime.now(timezone.utc)
+    cutoff = now - grace
+    refs = await _load_references(session, objects)
+    counted = {
+        row.key: row
+        for row in (
+            await session.execute(
+                select(CountedUpload).where(
+                    CountedUpload.key.in_([o.key for o in objects])
+                )
+            )
+        ).scalars()
+    }
+    batch = GcBatchResult(cursor=objects[-1].key, scanned=len(objects))
+
+    for obj in objects:
+        parsed = parse_upload_key(obj.key)
+        if parsed is None:
+            continue  # not an upload key — leave foreign objects alone
+        if _as_utc(obj.modified_at) > cutoff:
+            continue  # may still be mid-upload / not yet committed
+        item_refs = refs.get(obj.key, [])
+        if any(not cleared or published for cleared, _, published in item_refs):
+            continue
+        if any(_as_utc(updated_at) > cutoff for _, updated_at, _ in item_refs):
+            continue
+        if not await storage.delete(obj.key):
+            continue
+        batch.deleted.append(obj.key)
+        batch.freed_bytes += obj.size
+        upload = counted.get(obj.key)
+        if upload is not None:
+            size = obj.size if upload.size is None else upload.size
+            await record_usage(session, upload.client_id, -size, -1)
+            await session.execute(
+                delete(CountedUpload).where(CountedUpload.key == obj.key)
+            )
+
+    if len(objects) < batch_size:
+        batch.cursor = None
+    logger.info(
+        "upload_gc_batch",
+        scanned=batch.scanned,
+        deleted=len(batch.deleted),
+        freed_bytes=batch.freed_bytes,
+    )
+    return batch
+
+
+async def recount_usage(session: AsyncSession, storage: StorageBackend) -> int:
+    """Rebuild ``counted_uploads`` and usage from a full listing; caller commits.
+
+    Counts exactly what ``collect_batch`` can give back: stored objects that an
+    image item of the same client points at. Orphans are left to the GC.
+    Returns the number of clients with usage.
+    """
+    sizes: dict[str, int] = {}
+    cursor = None
+    while True:
+        objects = await storage.list_objects(start_after=cursor, limit=1000)
+        if not objects:
+            break
+        for obj in objects:
+            if parse_upload_key(obj.key) is not None:
+                sizes[obj.key] = obj.size
+        cursor = objects[-1].key
+
+    await session.execute(delete(CountedUpload))
+    await session.execute(delete(ClientStorageUsage))
+    result = await session.stream(
+        select(InputItem.client_id, InputItem.content)
+        .where(InputItem.type == "image")
+        .distinct()
+    )
+    totals: dict[uuid.UUID, list[int]] = {}
+    async for client_id, key in result:
+        parsed = parse_upload_key(key)
+        if key not in sizes or parsed is None or parsed[0] != client_id:
+            continue
+        size = sizes.pop(key)
+        session.add(CountedUpload(key=key, client_id=client_id, size=size))
+        entry = totals.setdefault(client_id, [0, 0])
+        entry[0] += size
+        entry[1] += 1
+    for client_id, (size, count) in totals.items():
+        session.add(
+            ClientStorageUsage(client_id=client_id, bytes_used=size, object_count=count)
+        )
+    return len(totals)
@@ -0,0 +1,124 @@
+import fcntl
+import os
+import shutil
+import tempfile
+import uuid
+from collections.abc import AsyncIterator, Iterator
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import BinaryIO
+
+import structlog
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models.upload_session import UploadSession
+
+logger = structlog.get_logger()
+
+_PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+PARTIAL_UPLOAD_DIR = (
+    Path(settings.PARTIAL_UPLOAD_DIR)
+    if settings.PARTIAL_UPLOAD_DIR
+    else _PROJECT_ROOT / "data" / "partial_uploads"
+)
+
+
+class ChunkTooLargeError(Exception):
+    pass
+
+
+class UploadBusyError(Exception):
+    """Another request is appending to the same upload right now."""
+
+
+def part_path(upload_id: uuid.UUID) -> Path:
+    return PARTIAL_UPLOAD_DIR / f"{upload_id}.part"
+
+
+def new_chunk(upload_id: uuid.UUID) -> Path:
+    """An empty file for one PATCH body, next to the part file; caller deletes it."""
+    PARTIAL_UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(
+        dir=PARTIAL_UPLOAD_DIR, prefix=f"{upload_id}.", suffix=".chunk"
+    )
+    os.close(fd)
+    return Path(tmp)
+
+
+async def receive_chunk(
+    chunk: Path, max_bytes: int, chunks: AsyncIterator[bytes]
+) -> None:
+    """Stream one PATCH body into ``chunk``.
+
+    Nothing touches the part file while the (possibly slow) body arrives, so
+    a retry racing the original request can't clobber bytes already accepted.
+    If the body stops early, ``chunk`` keeps what did arrive for the caller to
+    append. Raises ChunkTooLargeError past ``max_bytes``.
+    """
+    size = 0
+    with chunk.open("wb") as f:
+        async for data in chunks:
+            size += len(data)
+            if size > max_bytes:
+                raise ChunkTooLargeError()
+            f.write(data)
+
+
+@contextmanager
+def locked_part(upload_id: uuid.UUID) -> Iterator[BinaryIO]:
+    """The part file, opened for writing under an exclusive ``flock``.
+
+    Raises UploadBusyError instead of waiting (like ``FOR UPDATE NOWAIT``):
+    the holder may be a coroutine on this same event loop.
+    """
+    path = part_path(upload_id)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.touch(exist_ok=True)
+    with path.open("r+b") as f:
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            raise UploadBusyError() from None
+        yield f  # closing the file releases the lock
+
+
+def write_at(part: BinaryIO, offset: int, chunk: Path) -> int:
+    """Copy ``chunk`` into ``part`` at ``offset``; return the new offset."""
+    part.seek(offset)
+    with chunk.open("rb") as f:
+        shutil.copyfileobj(f, part)
+    part.flush()
+    return part.tell()
+
+
+def discard_part(upload_id: uuid.UUID) -> None:
+    part_path(upload_id).unlink(missing_ok=True)
+    # Chunks orphaned by a crash mid-request
+    for chunk in PARTIAL_UPLOAD_DIR.glob(f"{upload_id}.*.chunk"):
+        chunk.unlink(missing_ok=True)
+
+
+def is_expired(upload: UploadSession) -> bool:
+    expires_at = upload.expires_at
+    if expires_at.tzinfo is None:
+        expires_at = expires_at.replace(tzinfo=timezone.utc)
+    return expires_at <= datetime.now(timezone.utc)
+
+
+async def purge_expired(session: AsyncSession) -> int:
+    """Delete expired sessions and their partial files. Caller commits."""
+    now = datetime.now(timezone.utc)
+    result = await session.execute(
+        select(UploadSession.id).where(UploadSession.expires_at <= now)
+    )
+    ids = result.scalars().all()
+    if not ids:
+        return 0
+    await session.execute(delete(UploadSession).where(UploadSession.id.in_(ids)))
+    for upload_id in ids:
+        discard_part(upload_id)
+    logger.info("upload_sessions_expired", count=len(ids))
+    return len(ids)
@@ -0,0 +1,110 @@
+"""Write-behind view counts for public posts.
+
+A view only bumps a counter in this worker's memory (``counter.record``);
+``run_flusher`` moves the buffered counts to ``post_views`` every
+VIEW_COUNT_FLUSH_SECONDS with one multi-row upsert, so a popular post costs one
+row update per worker per interval instead of one per view. A crash loses at
+most one interval of this worker's views; a failed flush puts its counts back
+for the next one. At most VIEW_COUNT_MAX_PENDING distinct posts are buffered;
+views of further posts are dropped until the next flush.
+"""
+
+import asyncio
+import re
+from collections import Counter
+
+import structlog
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import database
+from app.config import settings
+from app.database import dialect_insert
+from app.models.post_view import PostView
+from app.models.published_post import PublishedPost
+
+logger = structlog.get_logger()
+
+# Slugs as app/routers/publish.py makes them: date, channel or "input", hex
+_SLUG = re.compile(r"\d{4}-\d{2}-\d{2}-[\w.-]{1,32}-[0-9a-f]{4,6}")
+
+
+def is_post_slug(slug: str) -> bool:
+    return _SLUG.fullmatch(slug) is not None
+
+
+class ViewCounter:
+    """Per-worker buffer of views by post slug."""
+
+    def __init__(self, max_pending: int):
+        self.max_pending = max_pending
+        self._pending: Counter[str] = Counter()
+        self.dropped = 0
+
+    def record(self, slug: str) -> None:
+        if slug not in self._pending and len(self._pending) >= self.max_pending:
+            self.dropped += 1
+            return
+        self._pending[slug] += 1
+
+    def pending(self) -> dict[str, int]:
+        return dict(self._pending)
+
+    async def flush(self, session: AsyncSession) -> int:
+        """Add the buffered views to ``post_views`` and commit.
+
+        Returns how many posts were updated. Slugs of posts that don't exist
+        (any longer) are discarded.
+        """
+        batch, self._pending = self._pending, Counter()
+        if self.dropped:
+            logger.warning("view_counts_dropped", views=self.dropped)
+            self.dropped = 0
+        if not batch:
+            return 0
+        try:
+            result = await session.execute(
+                select(PublishedPost.slug, PublishedPost.id).where(
+                    PublishedPost.slug.in_(list(batch))
+                )
+            )
+            # Sorted, so concurrent flushes from other workers lock rows in
+            # the same order
+            rows = [
+                {"post_id": post_id, "view_count": batch[slug]}
+                for slug, post_id in sorted(result.all(), key=lambda row: row.id)
+            ]
+            if rows:
+                table = PostView.__table__
+                stmt = dialect_insert(session, table).values(rows)
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=[table.c.post_id],
+                    set_={
+                        "view_count": table.c.view_count + stmt.excluded.view_count,
+                        "updated_at": func.now(),
+                    },
+                )
+                await session.execute(stmt)
+            await session.commit()
+        except BaseException:
+            self._pending.update(batch)
+            raise
+        return len(rows)
+
+
+counter = ViewCounter(settings.VIEW_COUNT_MAX_PENDING)
+
+
+async def flush() -> None:
+    async with database.async_jobs_session() as session:
+        await counter.flush(session)
+
+
+async def run_flusher() -> None:
+    """Flush every VIEW_COUNT_FLUSH_SECONDS until cancelled."""
+    while True:
+        await asyncio.sleep(settings.VIEW_COUNT_FLUSH_SECONDS)
+        try:
+            await flush()
+        except Exception as e:
+            logger.warning("view_counts_flush_failed", error=str(e))
@@ -0,0 +1,341 @@
+"""WebSub hub for the public feeds.
+
+Subscribers POST ``hub.mode=subscribe`` for the current RSS, Atom or JSON
+Feed document and the hub verifies intent against their callback. Publishing
+or unpublishing marks every live subscription due (``schedule_delivery``, in
+the same transaction as the post) and wakes ``run_worker``, which renders each
+topic once and POSTs it to the due callbacks. A failed push is retried with
+exponential backoff; pushes that pile up while one is pending collapse into a
+single delivery of the latest feed.
+
+Every API worker runs ``run_worker``; due rows are claimed with
+``FOR UPDATE SKIP LOCKED`` so each push is sent once.
+"""
+
+import asyncio
+import hashlib
+import hmac
+import ipaddress
+import secrets
+import socket
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import httpx
+import structlog
+from sqlalchemy import delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import database
+from app.config import settings
+from app.database import dialect_insert
+from app.models.websub_subscription import WebSubSubscription
+from app.services.feeds import (
+    ATOM_TYPE,
+    HUB_PATH,
+    JSON_FEED_TYPE,
+    RSS_TYPE,
+    api_url,
+    feed_url,
+    load_page,
+    render_atom,
+    render_json_feed,
+    render_rss,
+)
+
+logger = structlog.get_logger()
+
+# Feed name -> (renderer, content type); only current documents are topics
+TOPICS = {
+    "rss": (render_rss, RSS_TYPE),
+    "atom": (render_atom, ATOM_TYPE),
+    "feed.json": (render_json_feed, JSON_FEED_TYPE),
+}
+
+MAX_RETRY_DELAY = timedelta(hours=6)
+
+_wake = asyncio.Event()
+
+
+def topic_feed(topic: str) -> str | None:
+    """The feed a topic URL names, or None if this hub doesn't serve it.
+
+    Topics are exactly the feed URLs on PUBLIC_API_URL, so a subscriber can't
+    get a feed rendered with links to a host of its choosing.
+    """
+    for name in TOPICS:
+        if topic == str(feed_url(name)):
+            return name
+    return None
+
+
+IPAddress = ipaddress.IPv4Address | ipaddress.IPv6Address
+
+
+async def resolve(host: str, port: int) -> list[IPAddress]:
+    infos = await asyncio.get_running_loop().getaddrinfo(
+        host, port, type=socket.SOCK_STREAM
+    )
+    return [ipaddress.ip_address(info[4][0]) for info in infos]
+
+
+NOT_PUBLIC = "Callback does not resolve to a public address"
+
+
+async def public_address(url: httpx.URL) -> IPAddress | None:
+    """Where to connect for ``url``, if it is http(s) on a host that resolves
+    only to public addresses, so anonymous subscribers can't aim the hub's
+    requests at loopback, the LAN, link-local or cloud metadata addresses."""
+    if url.scheme not in ("http", "https") or not url.host:
+        return None
+    try:
+        port = url.port or (443 if url.scheme == "https" else 80)
+        addresses = await resolve(url.host, port)
+    except (OSError, ValueError):
+        return None
+    if not addresses or not all(address.is_global for address in addresses):
+        return None
+    return addresses[0]
+
+
+async def public_callback(callback: str) -> bool:
+    """Up-front check for the hub endpoint; every request through ``client()``
+    is checked again when it connects, as DNS may have changed since."""
+    return await public_address(httpx.URL(callback)) is not None
+
+
+class PublicTransport(httpx.AsyncBaseTransport):
+    """Connects every request to the address ``public_address`` just checked.
+
+    Letting httpx resolve the host again would leave a window in which DNS
+    rebinds it to a private address after the check. The Host header and the
+    TLS server name (SNI and certificate) still use the callback's host.
+    """
+
+    def __init__(self, transport: httpx.AsyncBaseTransport | None = None):
+        self._transport = transport or httpx.AsyncHTTPTransport(trust_env=False)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        address = await public_address(request.url)
+        if address is None:
+            raise httpx.ConnectError(NOT_PUBLIC, request=request)
+        request.url = request.url.copy_with(host=str(address))
+        request.extensions = {**request.extensions, "sni_hostname": host}
+        return await self._transport.handle_async_request(request)
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+def client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        transport=PublicTransport(),
+        timeout=settings.WEBSUB_TIMEOUT_SECONDS,
+        follow_redirects=False,
+    )
+
+
+async def verify_intent(
+    http: httpx.AsyncClient,
+    mode: str,
+    topic: str,
+    callback: str,
+    lease_seconds: int | None = None,
+) -> bool:
+    """Ask the callback to echo a challenge, as the WebSub spec requires."""
+    challenge = secrets.token_urlsafe(24)
+    params = {"hub.mode": mode, "hub.topic": topic, "hub.challenge": challenge}
+    if lease_seconds is not None:
+        params["hub.lease_seconds"] = str(lease_seconds)
+    try:
+        # Merge rather than replace: the callback may carry its own query string
+        resp = await http.get(httpx.URL(callback).copy_merge_params(params))
+    except httpx.HTTPError as e:
+        logger.info("websub_verify_failed", callback=callback, error=str(e))
+        return False
+    return resp.is_success and resp.text == challenge
+
+
+async def subscribe(
+    session: AsyncSession,
+    topic: str,
+    callback: str,
+    secret: str | None,
+    lease_seconds: int,
+) -> None:
+    """Create or renew a subscription. Runs in the caller's transaction."""
+    table = WebSubSubscription.__table__
+    expires_at = datetime.now(timezone.utc) + timedelta(seconds=lease_seconds)
+    stmt = dialect_insert(session, table).values(
+        id=uuid.uuid4(),
+        topic=topic,
+        callback=callback,
+        secret=secret,
+        lease_expires_at=expires_at,
+        attempts=0,
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.topic, table.c.callback],
+        set_={"secret": secret, "lease_expires_at": expires_at},
+    )
+    await session.execute(stmt)
+
+
+async def unsubscribe(session: AsyncSession, topic: str, callback: str) -> None:
+    await session.execute(
+        delete(WebSubSubscription).where(
+            WebSubSubscription.topic == topic, WebSubSubscription.callback == callback
+        )
+    )
+
+
+async def schedule_delivery(session: AsyncSession) -> None:
+    """Mark every live subscription due. Runs in the publish transaction."""
+    now = datetime.now(timezone.utc)
+    await session.execute(
+        update(WebSubSubscription)
+        .where(WebSubSubscription.lease_expires_at > now)
+        .values(next_delivery_at=now, attempts=0, last_error=None)
+    )
+
+
+def notify() -> None:
+    """Wake this worker's pusher. Call after committing ``schedule_delivery``."""
+    _wake.set()
+
+
+def retry_delay(attempts: int) -> timedelta:
+    seconds = settings.WEBSUB_RETRY_BASE_SECONDS * 2 ** (attempts - 1)
+    return timedelta(seconds=min(seconds, MAX_RETRY_DELAY.total_seconds()))
+
+
+def _signature(secret: str, body: bytes) -> str:
+    return "sha256=" + hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+
+
+async def _push(
+    http: httpx.AsyncClient,
+    subscription: WebSubSubscription,
+    body: bytes,
+    content_type: str,
+) -> httpx.Response | str:
+    """POST the feed to one callback: the response, or the transport error."""
+    hub_url = str(api_url(HUB_PATH))
+    headers = {
+        "Content-Type": content_type,
+        "Link": f'<{hub_url}>; rel="hub", <{subscription.topic}>; rel="self"',
+    }
+    if subscription.secret:
+        headers["X-Hub-Signature"] = _signature(subscription.secret, body)
+    try:
+        return await http.post(subscription.callback, content=body, headers=headers)
+    except httpx.HTTPError as e:
+        return str(e) or type(e).__name__
+
+
+async def _gone() -> httpx.Response:
+    return httpx.Response(410)  # the topic no longer exists: drop the subscription
+
+
+def _outcome(attempts: int, outcome: httpx.Response | str, now: datetime) -> dict:
+    """Column values after one push; ``{}`` means drop the subscription."""
+    if isinstance(outcome, httpx.Response) and outcome.is_success:
+        return {"next_delivery_at": None, "attempts": 0, "last_error": None}
+    if isinstance(outcome, httpx.Response) and outcome.status_code == 410:
+        return {}  # the subscriber is gone for good
+    attempts += 1
+    if isinstance(outcome, httpx.Response):
+        error = f"HTTP {outcome.status_code}"
+    else:
+        error = outcome
+    if attempts >= settings.WEBSUB_MAX_ATTEMPTS:
+        logger.warning("websub_delivery_abandoned", attempts=attempts, error=error)
+        retry_at = None
+    else:
+        retry_at = now + retry_delay(attempts)
+    return {"next_delivery_at": retry_at, "attempts": attempts, "last_error": error}
+
+
+async def deliver_due(session: AsyncSession, http: httpx.AsyncClient) -> int:
+    """Push the current feed to up to WEBSUB_BATCH_SIZE due subscribers.
+
+    Due rows are claimed by moving ``next_delivery_at`` past the push timeout
+    and committing, so no lock is held while callbacks respond. A publish
+    during the push sets it back to now; that row keeps its new schedule and
+    gets the newer feed on the next pass. Returns how many were attempted.
+    """
+    now = datetime.now(timezone.utc)
+    await session.execute(
+        delete(WebSubSubscription).where(WebSubSubscription.lease_expires_at <= now)
+    )
+    result = await session.execute(
+        select(WebSubSubscription)
+        .where(WebSubSubscription.next_delivery_at <= now)
+        .order_by(WebSubSubscription.next_delivery_at)
+        .limit(settings.WEBSUB_BATCH_SIZE)
+        .with_for_update(skip_locked=True)
+    )
+    due = list(result.scalars().all())
+    claimed_until = now + timedelta(seconds=2 * settings.WEBSUB_TIMEOUT_SECONDS)
+    for subscription in due:
+        subscription.next_delivery_at = claimed_until
+    await session.commit()
+    if not due:
+        return 0
+
+    bodies: dict[str, tuple[bytes, str]] = {}
+    for topic in {subscription.topic for subscription in due}:
+        name = topic_feed(topic)
+        if name is None:
+            continue  # subscribed under another PUBLIC_API_URL
+        render, content_type = TOPICS[name]
+        page = await load_page(session, name, None)
+        bodies[topic] = (render(page).encode(), content_type)
+    outcomes = await asyncio.gather(
+        *(
+            _push(http, sub, *bodies[sub.topic]) if sub.topic in bodies else _gone()
+            for sub in due
+        )
+    )
+
+    now = datetime.now(timezone.utc)
+    delivered = 0
+    for subscription, outcome in zip(due, outcomes):
+        values = _outcome(subscription.attempts, outcome, now)
+        if values.get("attempts") == 0:
+            delivered += 1
+        unchanged = (
+            WebSubSubscription.id == subscription.id,
+            WebSubSubscription.next_delivery_at == claimed_until,
+        )
+        if values:
+            stmt = update(WebSubSubscription).where(*unchanged).values(**values)
+        else:
+            stmt = delete(WebSubSubscription).where(*unchanged)
+        await session.execute(stmt)
+    await session.commit()
+    logger.info("websub_delivered", attempted=len(due), delivered=delivered)
+    return len(due)
+
+
+async def run_worker() -> None:
+    """Push feeds to due subscribers until cancelled.
+
+    Wakes on ``notify()`` and every WEBSUB_POLL_SECONDS for retries and for
+    publishes made by other workers.
+    """
+    async with client() as http:
+        while True:
+            _wake.clear()
+            try:
+                async with database.async_jobs_session() as session:
+                    batch = settings.WEBSUB_BATCH_SIZE
+                    while await deliver_due(session, http) == batch:
+                        pass
+            except Exception as e:
+                logger.warning("websub_worker_failed", error=str(e))
+            try:
+                await asyncio.wait_for(_wake.wait(), settings.WEBSUB_POLL_SECONDS)
+            except TimeoutError:
+                pass
@@ -80,6 +80,7 @@ cp ~/daycast/daycast-api/infra/Caddyfile ~/daycast/Caddyfile
 cp ~/daycast/daycast-api/infra/launchd/com.daycast.api.plist "$LAUNCH_DIR/"
 cp ~/daycast/daycast-api/infra/launchd/com.daycast.caddy.plist "$LAUNCH_DIR/"
 cp ~/daycast/daycast-api/infra/launchd/com.daycast.backup.plist "$LAUNCH_DIR/"
+cp ~/daycast/daycast-api/infra/launchd/com.daycast.upload-gc.plist "$LAUNCH_DIR/"
 chmod +x ~/daycast/daycast-api/infra/backup/backup.sh
 
 # Restart API
@@ -90,6 +91,10 @@ launchctl load "$LAUNCH_DIR/com.daycast.api.plist"
 launchctl unload "$LAUNCH_DIR/com.daycast.caddy.plist" 2>/dev/null || true
 launchctl load "$LAUNCH_DIR/com.daycast.caddy.plist"
 
+# (Re)load scheduled jobs
+launchctl unload "$LAUNCH_DIR/com.daycast.upload-gc.plist" 2>/dev/null || true
+launchctl load "$LAUNCH_DIR/com.daycast.upload-gc.plist"
+
 echo "  Services restarted."
 REMOTE_SCRIPT
 
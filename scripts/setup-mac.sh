@@ -140,6 +140,7 @@ chmod +x "$API_DIR/infra/backup/backup.sh"
 cp "$API_DIR/infra/launchd/com.daycast.api.plist" "$LAUNCH_DIR/"
 cp "$API_DIR/infra/launchd/com.daycast.caddy.plist" "$LAUNCH_DIR/"
 cp "$API_DIR/infra/launchd/com.daycast.backup.plist" "$LAUNCH_DIR/"
+cp "$API_DIR/infra/launchd/com.daycast.upload-gc.plist" "$LAUNCH_DIR/"
 
 echo "  launchd plists installed."
 
@@ -160,6 +161,7 @@ else
 fi
 
 launchctl load "$LAUNCH_DIR/com.daycast.backup.plist" 2>/dev/null || true
+launchctl load "$LAUNCH_DIR/com.daycast.upload-gc.plist" 2>/dev/null || true
 
 echo ""
 echo "=== Setup Complete ==="
@@ -2,11 +2,17 @@ import uuid
 
 import pytest
 from httpx import ASGITransport, AsyncClient
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 
-from app.database import get_session
+from app import public_cache
+from app.config import settings
+from app.database import get_public_session, get_session
+from app.dependencies import _known_clients
 from app.main import app
 from app.models import Base
+from app.services import related
+from app.services.auth import create_jwt
 
 TEST_DATABASE_URL = "sqlite+aiosqlite:///file::memory:?cache=shared&uri=true"
 
@@ -20,6 +26,9 @@ async def override_get_session():
 
 
 app.dependency_overrides[get_session] = override_get_session
+app.dependency_overrides[get_public_session] = override_get_session
+# DATABASE_URL still names Postgres, but these tests run on SQLite: no NOTIFY
+settings.PUBLIC_CACHE_BACKEND = "memory"
 
 CLIENT_ID = str(uuid.uuid4())
 
@@ -31,11 +40,34 @@ async def setup_db():
     yield
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.drop_all)
+    _known_clients.clear()
+    public_cache.cache.invalidate()
+
+
+@pytest.fixture(autouse=True)
+def related_index(tmp_path_factory, monkeypatch):
+    """Keep each test's related-posts index out of the project's data dir."""
+    index = related.RelatedIndex(tmp_path_factory.mktemp("related"), dim=256)
+    monkeypatch.setattr(related, "index", index)
+    return index
+
+
+@pytest.fixture
+def query_log():
+    """SQL statements executed on the test engine while the fixture is active."""
+    statements: list[str] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", record)
+    yield statements
+    event.remove(engine.sync_engine, "before_cursor_execute", record)
 
 
 @pytest.fixture
 def client_headers():
-    return {"X-Client-ID": CLIENT_ID}
+    return {"Authorization": f"Bearer {create_jwt(uuid.UUID(CLIENT_ID))}"}
 
 
 @pytest.fixture
@@ -44,3 +76,20 @@ async def http_client():
         transport=ASGITransport(app=app), base_url="http://test"
     ) as client:
         yield client
+
+
+async def publish_post(http_client, headers, content="Published"):
+    """Add a text input for 2024-01-01 and publish it; returns the post."""
+    resp = await http_client.post(
+        "/api/v1/inputs",
+        json={"type": "text", "content": content, "date": "2024-01-01"},
+        headers=headers,
+    )
+    resp = await http_client.post(
+        "/api/v1/publish/input",
+        json={"input_item_id": resp.json()["id"]},
+        headers=headers,
+    )
+    # Drop the read-your-writes cookie so later reads look anonymous
+    http_client.cookies.clear()
+    return resp.json()
@@ -0,0 +1,76 @@
+import pytest
+from sqlalchemy import select
+
+from app.config import settings
+from app.models.user import User
+from app.services import auth
+from tests.conftest import TestSession
+
+
+@pytest.fixture(autouse=True)
+def fast_bcrypt(monkeypatch):
+    monkeypatch.setattr(settings, "BCRYPT_ROUNDS", 4)
+
+
+async def _register(http_client, username="alice", password="secret1"):
+    resp = await http_client.post(
+        "/api/v1/auth/register", json={"username": username, "password": password}
+    )
+    assert resp.status_code == 201
+    return resp.json()
+
+
+async def _stored_hash(username="alice") -> str:
+    async with TestSession() as session:
+        result = await session.execute(
+            select(User.password_hash).where(User.username == username)
+        )
+        return result.scalar_one()
+
+
+@pytest.mark.asyncio
+async def test_register_and_login(http_client):
+    await _register(http_client)
+    resp = await http_client.post(
+        "/api/v1/auth/login", json={"username": "alice", "password": "secret1"}
+    )
+    assert resp.status_code == 200
+    assert resp.json()["token"]
+
+
+@pytest.mark.asyncio
+async def test_login_wrong_password(http_client):
+    await _register(http_client)
+    resp = await http_client.post(
+        "/api/v1/auth/login", json={"username": "alice", "password": "wrong!!"}
+    )
+    assert resp.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_login_rehashes_on_cost_change(http_client, monkeypatch):
+    await _register(http_client)
+    assert (await _stored_hash()).startswith("$2b$04$")
+
+    monkeypatch.setattr(settings, "BCRYPT_ROUNDS", 5)
+    resp = await http_client.post(
+        "/api/v1/auth/login", json={"username": "alice", "password": "secret1"}
+    )
+    assert resp.status_code == 200
+    assert (await _stored_hash()).startswith("$2b$05$")
+
+
+@pytest.mark.asyncio
+async def test_login_shed_when_hasher_saturated(http_client, monkeypatch):
+    await _register(http_client)
+    monkeypatch.setattr(settings, "PASSWORD_HASH_MAX_PENDING", 0)
+    resp = await http_client.post(
+        "/api/v1/auth/login", json={"username": "alice", "password": "secret1"}
+    )
+    assert resp.status_code == 429
+    assert resp.headers["Retry-After"] == "1"
+
+
+def test_password_needs_rehash():
+    assert auth.password_needs_rehash(auth.hash_password("pw")) is False
+    assert auth.password_needs_rehash("not-a-bcrypt-hash") is True
@@ -0,0 +1,56 @@
+import uuid
+from datetime import date
+
+import pytest
+
+from app.services.auth import _verified_tokens, create_jwt, decode_jwt
+
+TODAY = date.today().isoformat()
+
+
+def _client_queries(statements):
+    return [s for s in statements if "clients" in s]
+
+
+@pytest.mark.asyncio
+async def test_known_client_skips_clients_table(http_client, client_headers, query_log):
+    # First request for a client ensures the row exists (one INSERT ... ON CONFLICT)
+    await http_client.get(f"/api/v1/inputs?date={TODAY}", headers=client_headers)
+    first = list(query_log)
+    query_log.clear()
+
+    await http_client.get(f"/api/v1/inputs?date={TODAY}", headers=client_headers)
+    second = list(query_log)
+
+    assert len(_client_queries(first)) == 1
+    assert "ON CONFLICT" in _client_queries(first)[0]
+    assert _client_queries(second) == []
+    assert len(second) == len(first) - 1
+
+
+@pytest.mark.asyncio
+async def test_registered_user_first_request(http_client):
+    resp = await http_client.post(
+        "/api/v1/auth/register", json={"username": "alice", "password": "secret1"}
+    )
+    token = resp.json()["token"]
+    resp = await http_client.get(
+        f"/api/v1/inputs?date={TODAY}", headers={"Authorization": f"Bearer {token}"}
+    )
+    assert resp.status_code == 200
+
+
+def test_decode_jwt_memoizes_verified_tokens():
+    user_id = uuid.uuid4()
+    token = create_jwt(user_id)
+    assert decode_jwt(token) == user_id
+    assert _verified_tokens.get(token) == user_id
+
+
+@pytest.mark.asyncio
+async def test_invalid_token_not_cached(http_client):
+    resp = await http_client.get(
+        f"/api/v1/inputs?date={TODAY}", headers={"Authorization": "Bearer nope"}
+    )
+    assert resp.status_code == 401
+    assert _verified_tokens.get("nope") is None
@@ -0,0 +1,126 @@
+import os
+
+import pytest
+from sqlalchemy import exc, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app import database
+from app.config import settings
+from app.database import (
+    Bulkhead,
+    MeteredQueuePool,
+    engine_options,
+    get_public_session,
+    pool_metrics,
+)
+from app.main import app
+from tests.conftest import override_get_session
+
+TEST_POSTGRES_URL = os.environ.get("TEST_POSTGRES_URL")
+
+
+def test_engine_options_sqlite_keeps_defaults():
+    assert engine_options("sqlite+aiosqlite:///x.db") == {}
+
+
+def test_engine_options_pgbouncer(monkeypatch):
+    monkeypatch.setattr(settings, "DB_PGBOUNCER", True)
+    options = engine_options("postgresql+asyncpg://u:p@bouncer/db")
+    assert options["poolclass"] is NullPool
+    assert options["connect_args"]["statement_cache_size"] == 0
+    assert options["connect_args"]["prepared_statement_cache_size"] == 0
+    name_func = options["connect_args"]["prepared_statement_name_func"]
+    assert name_func() != name_func()
+
+
+@pytest.mark.asyncio
+async def test_metered_pool_counts_checkouts_and_timeouts(tmp_path):
+    db = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}",
+        poolclass=MeteredQueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.05,
+    )
+    async with db.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+        assert pool_metrics(db)["checked_out"] == 1
+        with pytest.raises(exc.TimeoutError):
+            async with db.connect():
+                pass
+
+    metrics = pool_metrics(db)
+    assert metrics["checkouts"] == 1
+    assert metrics["timeouts"] == 1
+    assert metrics["checked_out"] == 0
+    assert metrics["peak_checked_out"] == 1
+    assert metrics["wait_ms_max"] >= 50
+    await db.dispose()
+
+
+def test_bulkheads_get_their_own_pool_and_statement_timeout(monkeypatch):
+    monkeypatch.setitem(database.BULKHEADS, "public", Bulkhead(3, 2, 1.0, 3000))
+    monkeypatch.setitem(database.BULKHEADS, "jobs", Bulkhead(1, 1, 30.0, 0))
+    url = "postgresql+asyncpg://u:p@db/daycast"
+
+    public = engine_options(url, "public")
+    assert (public["pool_size"], public["max_overflow"], public["pool_timeout"]) == (
+        3,
+        2,
+        1.0,
+    )
+    assert public["connect_args"]["server_settings"] == {"statement_timeout": "3000"}
+    assert "server_settings" not in engine_options(url, "jobs")["connect_args"]
+
+
+@pytest.mark.asyncio
+async def test_exhausted_public_pool_answers_503(http_client, tmp_path):
+    busy = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'busy.db'}",
+        poolclass=MeteredQueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.05,
+    )
+    sessions = async_sessionmaker(busy, expire_on_commit=False)
+
+    async def busy_session():
+        async with sessions() as session:
+            yield session
+
+    app.dependency_overrides[get_public_session] = busy_session
+    try:
+        async with busy.connect():  # a slow query holding the only connection
+            resp = await http_client.get("/api/v1/public/stats")
+    finally:
+        app.dependency_overrides[get_public_session] = override_get_session
+        await busy.dispose()
+
+    assert resp.status_code == 503
+    assert resp.json()["code"] == "service_unavailable"
+    assert resp.headers["Retry-After"] == "1"
+
+
+@pytest.mark.skipif(not TEST_POSTGRES_URL, reason="set TEST_POSTGRES_URL")
+@pytest.mark.asyncio
+async def test_statement_timeout_answers_503(http_client, monkeypatch):
+    monkeypatch.setitem(database.BULKHEADS, "public", Bulkhead(1, 0, 1.0, 50))
+    slow = create_async_engine(
+        TEST_POSTGRES_URL, **engine_options(TEST_POSTGRES_URL, "public")
+    )
+    sessions = async_sessionmaker(slow, expire_on_commit=False)
+
+    async def slow_session():
+        async with sessions() as session:
+            await session.execute(text("SELECT pg_sleep(1)"))
+            yield session
+
+    app.dependency_overrides[get_public_session] = slow_session
+    try:
+        resp = await http_client.get("/api/v1/public/stats")
+    finally:
+        app.dependency_overrides[get_public_session] = override_get_session
+        await slow.dispose()
+
+    assert resp.status_code == 503
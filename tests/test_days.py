@@ -3,6 +3,11 @@ from datetime import date
 from unittest.mock import AsyncMock, patch
 
 import pytest
+from sqlalchemy import select
+
+from app.models.day_stats import DayStats
+from app.services.day_stats import rebuild
+from tests.conftest import TestSession
 
 TODAY = date.today().isoformat()
 
@@ -146,3 +151,100 @@ async def test_delete_day_does_not_affect_other_days(http_client, client_headers
         "/api/v1/days/2024-06-02", headers=client_headers
     )
     assert len(resp.json()["input_items"]) == 1
+
+
+async def _summary(http_client, headers, day):
+    resp = await http_client.get("/api/v1/days", headers=headers)
+    return next((d for d in resp.json()["items"] if d["date"] == day), None)
+
+
+@pytest.mark.asyncio
+async def test_day_stats_track_publish_and_clear(http_client, client_headers):
+    resp = await http_client.post(
+        "/api/v1/inputs",
+        json={"type": "text", "content": "Note", "date": "2024-07-01"},
+        headers=client_headers,
+    )
+    item_id = resp.json()["id"]
+    resp = await http_client.post(
+        "/api/v1/publish/input",
+        json={"input_item_id": item_id},
+        headers=client_headers,
+    )
+    post_id = resp.json()["id"]
+    summary = await _summary(http_client, client_headers, "2024-07-01")
+    assert summary["published_count"] == 1
+    assert summary["last_activity_at"] is not None
+
+    await http_client.delete(f"/api/v1/publish/{post_id}", headers=client_headers)
+    await http_client.delete("/api/v1/inputs?date=2024-07-01", headers=client_headers)
+    summary = await _summary(http_client, client_headers, "2024-07-01")
+    # Cleared items still belong to the day, as in the day detail
+    assert summary["input_count"] == 1
+    assert summary["published_count"] == 0
+
+
+@pytest.mark.asyncio
+async def test_delete_day_removes_summary(http_client, client_headers):
+    await _add_item(http_client, client_headers, day="2024-08-01")
+    await http_client.delete("/api/v1/days/2024-08-01", headers=client_headers)
+    assert await _summary(http_client, client_headers, "2024-08-01") is None
+
+
+@pytest.mark.asyncio
+async def test_activity_heatmap(http_client, client_headers):
+    await _add_item(http_client, client_headers, day="2023-12-31")
+    await _add_item(http_client, client_headers, day="2024-02-01")
+    await _add_item(http_client, client_headers, day="2024-02-01")
+    with _mock_openai():
+        await http_client.post(
+            "/api/v1/generate",
+            json={"date": "2024-02-01", "channels": ["blog"]},
+            headers=client_headers,
+        )
+
+    resp = await http_client.get(
+        "/api/v1/days/activity?year=2024", headers=client_headers
+    )
+    assert resp.status_code == 200
+    assert resp.json() == {
+        "year": 2024,
+        "days": [
+            {
+                "date": "2024-02-01",
+                "input_count": 2,
+                "generation_count": 1,
+                "published_count": 0,
+            }
+        ],
+    }
+
+
+@pytest.mark.asyncio
+async def test_rebuild_matches_incremental_counters(http_client, client_headers):
+    await _add_item(http_client, client_headers, day="2024-09-01")
+    await _add_item(http_client, client_headers, day="2024-09-02")
+    with _mock_openai():
+        resp = await http_client.post(
+            "/api/v1/generate",
+            json={"date": "2024-09-02", "channels": ["blog"]},
+            headers=client_headers,
+        )
+    await http_client.post(
+        "/api/v1/publish",
+        json={"generation_result_id": resp.json()["results"][0]["id"]},
+        headers=client_headers,
+    )
+
+    columns = (
+        DayStats.date,
+        DayStats.input_count,
+        DayStats.generation_count,
+        DayStats.published_count,
+    )
+    async with TestSession() as session:
+        incremental = (await session.execute(select(*columns))).all()
+        assert await rebuild(session) == 2
+        await session.commit()
+        rebuilt = (await session.execute(select(*columns))).all()
+    assert sorted(rebuilt) == sorted(incremental)
@@ -0,0 +1,116 @@
+import xml.etree.ElementTree as ET
+
+import pytest
+
+from app.config import settings
+from tests.conftest import publish_post
+
+ATOM = "{http://www.w3.org/2005/Atom}"
+FH = "{http://purl.org/syndication/history/1.0}"
+
+
+@pytest.fixture
+def small_pages(monkeypatch):
+    monkeypatch.setattr(settings, "FEED_PAGE_SIZE", 2)
+    monkeypatch.setattr(settings, "PUBLIC_SITE_URL", "https://blog.example.com/")
+
+
+def _rss_links(body):
+    channel = ET.fromstring(body).find("channel")
+    return {link.get("rel"): link.get("href") for link in channel.iter(f"{ATOM}link")}
+
+
+def _rss_texts(body):
+    return [item.findtext("description") for item in ET.fromstring(body).iter("item")]
+
+
+@pytest.mark.asyncio
+async def test_rss_archives_cover_every_post(http_client, client_headers, small_pages):
+    for i in range(5):
+        await publish_post(http_client, client_headers, f"post {i}")
+
+    resp = await http_client.get("/api/v1/public/rss")
+    assert resp.headers["content-type"].startswith("application/rss+xml")
+    current = resp.text
+    links = _rss_links(current)
+    assert links["prev-archive"].endswith("/api/v1/public/rss?page=2")
+    assert "next-archive" not in links
+    assert ET.fromstring(current).find(f"channel/{FH}archive") is None
+    link = ET.fromstring(current).find("channel/item/link").text
+    assert link.startswith("https://blog.example.com/post/")
+
+    seen = set(_rss_texts(current))
+    url = links["prev-archive"]
+    while url:
+        page = (await http_client.get(url)).text
+        assert ET.fromstring(page).find(f"channel/{FH}archive") is not None
+        seen |= set(_rss_texts(page))
+        url = _rss_links(page).get("prev-archive")
+    assert seen == {f"post {i}" for i in range(5)}
+
+    assert (await http_client.get("/api/v1/public/rss?page=3")).status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_atom_and_json_feed(http_client, client_headers, small_pages):
+    for i in range(3):
+        await publish_post(http_client, client_headers, f"post {i}")
+
+    resp = await http_client.get("/api/v1/public/atom")
+    assert resp.headers["content-type"].startswith("application/atom+xml")
+    feed = ET.fromstring(resp.text)
+    assert len(feed.findall(f"{ATOM}entry")) == 2
+    rels = {link.get("rel") for link in feed.findall(f"{ATOM}link")}
+    assert {"self", "current", "prev-archive"} <= rels
+
+    resp = await http_client.get("/api/v1/public/feed.json")
+    assert resp.headers["content-type"].startswith("application/feed+json")
+    data = resp.json()
+    assert data["version"] == "https://jsonfeed.org/version/1.1"
+    assert len(data["items"]) == 2
+    older = (await http_client.get(data["next_url"])).json()
+    assert "next_url" not in older
+    assert len(older["items"]) == 2  # page 1: the two oldest posts
+
+
+@pytest.mark.asyncio
+async def test_feed_conditional_requests(http_client, client_headers):
+    await publish_post(http_client, client_headers, "post 0")
+    resp = await http_client.get("/api/v1/public/rss")
+    last_modified = resp.headers["Last-Modified"]
+
+    resp = await http_client.get(
+        "/api/v1/public/rss", headers={"If-Modified-Since": last_modified}
+    )
+    assert resp.status_code == 304
+    assert resp.headers["Last-Modified"] == last_modified
+
+    resp = await http_client.get(
+        "/api/v1/public/rss",
+        headers={"If-Modified-Since": last_modified, "If-None-Match": '"other"'},
+    )
+    assert resp.status_code == 200
+
+    # A new post changes both validators
+    etag = resp.headers["ETag"]
+    await publish_post(http_client, client_headers, "post 1")
+    resp = await http_client.get("/api/v1/public/rss", headers={"If-None-Match": etag})
+    assert resp.status_code == 200
+    assert len(_rss_texts(resp.text)) == 2
+
+
+@pytest.mark.asyncio
+async def test_feed_links_ignore_the_host_header(http_client, monkeypatch):
+    monkeypatch.setattr(settings, "PUBLIC_API_URL", "https://daycast.example.com")
+    resp = await http_client.get(
+        "/api/v1/public/rss", headers={"Host": "evil.example"}
+    )
+    assert "evil.example" not in resp.text
+    assert "evil.example" not in resp.headers["Link"]
+
+    # The cached copy other readers get is just as clean
+    resp = await http_client.get("/api/v1/public/rss")
+    assert resp.headers["X-Cache"] == "HIT"
+    links = _rss_links(resp.text)
+    assert links["self"] == "https://daycast.example.com/api/v1/public/rss"
+    assert links["hub"] == "https://daycast.example.com/api/v1/websub"
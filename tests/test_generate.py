@@ -1,9 +1,12 @@
+import asyncio
 import json
 from datetime import date
 from unittest.mock import AsyncMock, patch
 
 import pytest
 
+from tests.conftest import engine
+
 TODAY = date.today().isoformat()
 
 MOCK_AI_RESPONSE = {
@@ -245,3 +248,43 @@ async def test_multiple_generations_per_day(http_client, client_headers):
     data = day_resp.json()
     assert len(data["input_items"]) == 2
     assert len(data["generations"]) == 2
+
+
+@pytest.mark.asyncio
+async def test_generate_releases_connection_during_ai_call(
+    http_client, client_headers
+):
+    """Generations in flight hold no pooled connection while the AI call runs."""
+    await _create_text_item(http_client, client_headers)
+    arrivals: asyncio.Queue[asyncio.Event] = asyncio.Queue()
+
+    async def slow_generate(**kwargs):
+        gate = asyncio.Event()
+        await arrivals.put(gate)
+        await gate.wait()
+        return [{"channel_id": "blog", "text": "Blog"}], "gpt-5.2", 10
+
+    with patch("app.routers.generate.generate", slow_generate):
+        # Start requests one by one (SQLite allows a single writer) until
+        # five are parked inside the AI call at once
+        tasks, gates = [], []
+        for _ in range(5):
+            tasks.append(
+                asyncio.create_task(
+                    http_client.post(
+                        "/api/v1/generate",
+                        json={"date": TODAY, "channels": ["blog"]},
+                        headers=client_headers,
+                    )
+                )
+            )
+            gates.append(await arrivals.get())
+        in_flight_checked_out = engine.pool.checkedout()
+
+        responses = []
+        for gate, task in zip(gates, tasks):
+            gate.set()
+            responses.append(await task)
+
+    assert in_flight_checked_out == 0
+    assert [r.status_code for r in responses] == [201] * 5
@@ -0,0 +1,81 @@
+import asyncio
+import uuid
+from datetime import date
+from unittest.mock import AsyncMock, patch
+
+import httpx
+import pytest
+
+from app.models.generation_quota_usage import GenerationQuotaUsage
+from app.rate_limit import reserve_generation_quota
+from app.services.generation_quota import release_generation, reserve_generation
+from tests.conftest import CLIENT_ID, TestSession
+
+TODAY = date.today()
+
+
+async def _used() -> int:
+    async with TestSession() as session:
+        usage = await session.get(
+            GenerationQuotaUsage, (uuid.UUID(CLIENT_ID), TODAY)
+        )
+        return usage.used if usage else 0
+
+
+@pytest.mark.asyncio
+async def test_reserve_stops_at_limit_and_release_returns_one():
+    client_id = uuid.UUID(CLIENT_ID)
+    async with TestSession() as session:
+        results = [
+            await reserve_generation(session, client_id, TODAY, 2) for _ in range(3)
+        ]
+        assert results == [True, True, False]
+
+        await release_generation(session, client_id, TODAY)
+        assert await reserve_generation(session, client_id, TODAY, 2) is True
+    assert await _used() == 2
+
+
+@pytest.mark.asyncio
+async def test_rejected_request_does_not_use_quota(http_client, client_headers):
+    # No input items for the day: 400 after the reservation was taken
+    for _ in range(12):
+        resp = await http_client.post(
+            "/api/v1/generate",
+            json={"date": TODAY.isoformat(), "channels": ["blog"]},
+            headers=client_headers,
+        )
+        assert resp.status_code == 400
+    assert await _used() == 0
+
+
+@pytest.mark.asyncio
+async def test_ai_failure_releases_reservation(http_client, client_headers):
+    await http_client.post(
+        "/api/v1/inputs",
+        json={"type": "text", "content": "test", "date": TODAY.isoformat()},
+        headers=client_headers,
+    )
+    error = httpx.HTTPStatusError(
+        "boom", request=httpx.Request("POST", "http://ai"), response=httpx.Response(500)
+    )
+    with patch("app.routers.generate.generate", AsyncMock(side_effect=error)):
+        resp = await http_client.post(
+            "/api/v1/generate",
+            json={"date": TODAY.isoformat(), "channels": ["blog"]},
+            headers=client_headers,
+        )
+    assert resp.status_code == 502
+    assert await _used() == 0
+
+
+@pytest.mark.asyncio
+async def test_cancelled_request_releases_reservation():
+    async with TestSession() as session:
+        dependency = reserve_generation_quota(uuid.UUID(CLIENT_ID), session)
+        await anext(dependency)
+        assert await _used() == 1
+        # What the framework throws in when the client disconnects mid-call
+        with pytest.raises(asyncio.CancelledError):
+            await dependency.athrow(asyncio.CancelledError())
+    assert await _used() == 0
@@ -6,3 +6,13 @@ async def test_health_returns_ok(http_client):
     response = await http_client.get("/api/v1/health")
     assert response.status_code == 200
     assert response.json() == {"status": "ok"}
+
+
+@pytest.mark.asyncio
+async def test_pool_metrics(http_client):
+    response = await http_client.get("/api/v1/health/pool")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["pool"] == "MeteredQueuePool"
+    expected = {"size", "checked_out", "overflow", "checkouts", "wait_ms_max"}
+    assert expected <= data.keys()
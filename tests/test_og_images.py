@@ -0,0 +1,89 @@
+import asyncio
+import io
+
+import pytest
+from PIL import Image
+
+from app.config import settings
+from app.services import og_images
+from tests.conftest import publish_post
+
+
+@pytest.fixture
+def og_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(og_images, "OG_IMAGE_DIR", tmp_path / "og")
+    return tmp_path / "og"
+
+
+@pytest.fixture
+def renders(monkeypatch):
+    calls = []
+    write_card = og_images._write_card
+
+    def counted(card, path):
+        calls.append(card)
+        write_card(card, path)
+
+    monkeypatch.setattr(og_images, "_write_card", counted)
+    return calls
+
+
+@pytest.mark.asyncio
+async def test_card_is_rendered_once_and_cached(
+    http_client, client_headers, og_dir, renders
+):
+    post = await publish_post(
+        http_client, client_headers, "A long walk\n\n" + "by the river " * 80
+    )
+    url = f"/api/v1/public/posts/{post['slug']}/og.png"
+
+    first, second = await asyncio.gather(http_client.get(url), http_client.get(url))
+    assert first.status_code == second.status_code == 200
+    assert len(renders) == 1  # concurrent misses share one render
+    assert renders[0].title == "A long walk"
+    assert renders[0].channel == "Personal"
+    assert renders[0].date == "January 1, 2024"
+
+    resp = await http_client.get(url)
+    assert len(renders) == 1
+    assert resp.headers["content-type"] == "image/png"
+    assert resp.headers["cache-control"] == (
+        f"public, max-age={settings.OG_IMAGE_MAX_AGE_SECONDS}, immutable"
+    )
+    assert "x-cache" not in resp.headers  # not held in the response cache
+    assert Image.open(io.BytesIO(resp.content)).size == (1200, 630)
+    (stored,) = og_dir.rglob("*.png")
+    assert resp.headers["etag"] == f'"{stored.stem}"'
+
+    resp = await http_client.get("/api/v1/public/posts/nope/og.png")
+    assert resp.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_busy_renderer_is_a_503(
+    http_client, client_headers, og_dir, monkeypatch
+):
+    post = await publish_post(http_client, client_headers, "Queued")
+    monkeypatch.setattr(settings, "OG_IMAGE_MAX_PENDING", 0)
+    resp = await http_client.get(f"/api/v1/public/posts/{post['slug']}/og.png")
+    assert resp.status_code == 503
+    assert resp.headers["retry-after"] == "1"
+
+
+def test_card_key_follows_content():
+    card = og_images.Card("Title", "linkedin", "January 1, 2024", "Body")
+    assert og_images.card_key(card) == og_images.card_key(
+        og_images.Card("Title", "linkedin", "January 1, 2024", "Body")
+    )
+    assert og_images.card_key(card) != og_images.card_key(
+        og_images.Card("Title", "linkedin", "January 1, 2024", "Body!")
+    )
+
+
+def test_wrap_truncates_with_ellipsis():
+    draw = og_images.ImageDraw.Draw(og_images.Image.new("RGB", (10, 10)))
+    font = og_images._font(False, 34)
+    lines = og_images._wrap(draw, "word " * 200 + "x" * 500, font, 400, max_lines=3)
+    assert len(lines) == 3
+    assert lines[-1].endswith("…")
+    assert all(draw.textlength(line, font=font) <= 400 for line in lines)
@@ -0,0 +1,257 @@
+import json
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from sqlalchemy import select, update
+
+from app.models.public_post_daily import PublicPostDaily
+from app.models.published_post import PublishedPost
+from app.services.public_stats import rebuild
+from tests.conftest import TestSession
+
+DAYS = ["2024-01-01", "2024-01-02", "2024-01-03"]
+
+
+def _mock_openai():
+    body = {
+        "choices": [
+            {
+                "message": {
+                    "content": json.dumps(
+                        {"results": [{"channel_id": "blog", "text": "Blog"}]}
+                    )
+                }
+            }
+        ],
+        "model": "gpt-5.2",
+    }
+    mock_resp = AsyncMock()
+    mock_resp.status_code = 200
+    mock_resp.json = lambda: body
+    mock_resp.raise_for_status = lambda: None
+    mock_client = AsyncMock()
+    mock_client.post = AsyncMock(return_value=mock_resp)
+    mock_client.__aenter__ = AsyncMock(return_value=mock_client)
+    mock_client.__aexit__ = AsyncMock(return_value=False)
+    return patch("app.services.ai.httpx.AsyncClient", return_value=mock_client)
+
+
+async def _add_item(http_client, headers, content, day):
+    resp = await http_client.post(
+        "/api/v1/inputs",
+        json={"type": "text", "content": content, "date": day},
+        headers=headers,
+    )
+    return resp.json()
+
+
+async def _publish_day(http_client, headers, day):
+    with _mock_openai():
+        resp = await http_client.post(
+            "/api/v1/generate",
+            json={"date": day, "channels": ["blog"]},
+            headers=headers,
+        )
+    resp = await http_client.post(
+        "/api/v1/publish",
+        json={"generation_result_id": resp.json()["results"][0]["id"]},
+        headers=headers,
+    )
+    return resp.json()
+
+
+@pytest.fixture
+async def published(http_client, client_headers):
+    for day in DAYS:
+        for i in range(7):
+            await _add_item(http_client, client_headers, f"{day} note {i}", day)
+    cleared = await _add_item(http_client, client_headers, "hidden", DAYS[0])
+    await http_client.delete(f"/api/v1/inputs/{cleared['id']}", headers=client_headers)
+    posts = []
+    for day in DAYS:
+        posts.append(await _publish_day(http_client, client_headers, day))
+        posts.append(await _publish_day(http_client, client_headers, day))
+    item = await _add_item(http_client, client_headers, "standalone", DAYS[0])
+    await http_client.post(
+        "/api/v1/publish/input",
+        json={"input_item_id": item["id"]},
+        headers=client_headers,
+    )
+    return posts
+
+
+@pytest.mark.asyncio
+async def test_list_posts_previews(http_client, published):
+    resp = await http_client.get("/api/v1/public/posts?limit=50")
+    assert resp.status_code == 200
+    items = resp.json()["items"]
+    assert len(items) == 7
+    by_date = {}
+    for item in items:
+        if item["source"] == "generation":
+            by_date.setdefault(item["date"], []).append(item["input_items_preview"])
+        else:
+            assert item["input_items_preview"] == []
+    for day in DAYS:
+        expected = [f"{day} note {i}" for i in range(5)]
+        assert by_date[day] == [expected, expected]
+
+
+@pytest.mark.asyncio
+async def test_list_posts_constant_queries(http_client, published, query_log):
+    await http_client.get("/api/v1/public/posts?limit=2")
+    small = len(query_log)
+    query_log.clear()
+    await http_client.get("/api/v1/public/posts?limit=50")
+    assert len(query_log) == small == 1
+
+
+@pytest.mark.asyncio
+async def test_get_post_preview(http_client, published):
+    slug = published[0]["slug"]
+    resp = await http_client.get(f"/api/v1/public/posts/{slug}")
+    assert resp.status_code == 200
+    assert resp.json()["input_items_preview"] == [
+        f"{DAYS[0]} note {i}" for i in range(5)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_preview_is_snapshotted_at_publish(
+    http_client, client_headers, published
+):
+    await _add_item(http_client, client_headers, "added later", DAYS[0])
+    resp = await http_client.get(f"/api/v1/public/posts/{published[0]['slug']}")
+    assert "added later" not in resp.json()["input_items_preview"]
+
+
+@pytest.mark.asyncio
+async def test_preview_follows_edits_and_deletes(
+    http_client, client_headers, published
+):
+    url = f"/api/v1/public/posts/{published[0]['slug']}"
+    assert (await http_client.get(url)).status_code == 200  # now cached
+    resp = await http_client.get(
+        f"/api/v1/inputs?date={DAYS[0]}", headers=client_headers
+    )
+    first, second = resp.json()[:2]
+
+    await http_client.delete(f"/api/v1/inputs/{first['id']}", headers=client_headers)
+    await http_client.put(
+        f"/api/v1/inputs/{second['id']}",
+        json={"content": "rewritten"},
+        headers=client_headers,
+    )
+    preview = (await http_client.get(url)).json()["input_items_preview"]
+    assert preview == ["rewritten"] + [f"{DAYS[0]} note {i}" for i in range(2, 6)]
+
+    await http_client.delete(f"/api/v1/inputs?date={DAYS[0]}", headers=client_headers)
+    assert (await http_client.get(url)).json()["input_items_preview"] == []
+
+
+@pytest.mark.asyncio
+async def test_filters_include_input_posts(http_client, published):
+    resp = await http_client.get(f"/api/v1/public/posts?date={DAYS[0]}&limit=50")
+    items = resp.json()["items"]
+    assert sorted(item["source"] for item in items) == [
+        "generation",
+        "generation",
+        "input",
+    ]
+    assert {item["date"] for item in items} == {DAYS[0]}
+
+    resp = await http_client.get("/api/v1/public/posts?channel=blog&limit=50")
+    assert len(resp.json()["items"]) == 6
+
+
+@pytest.mark.asyncio
+async def test_keyset_cursor_pages_through_ties(http_client, published):
+    # Same published_at everywhere: only the id tiebreaker keeps pages apart
+    async with TestSession() as session:
+        await session.execute(
+            update(PublishedPost).values(
+                published_at=datetime(2024, 1, 5, tzinfo=timezone.utc)
+            )
+        )
+        await session.commit()
+
+    seen, cursor = [], None
+    while True:
+        url = "/api/v1/public/posts?limit=2"
+        if cursor:
+            url += f"&cursor={cursor}"
+        data = (await http_client.get(url)).json()
+        seen += [item["id"] for item in data["items"]]
+        cursor = data["cursor"]
+        if not data["has_more"]:
+            break
+    assert len(seen) == len(set(seen)) == 7
+
+
+@pytest.mark.asyncio
+async def test_invalid_cursor(http_client):
+    resp = await http_client.get("/api/v1/public/posts?cursor=not-a-cursor")
+    assert resp.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_legacy_timestamp_cursor(http_client, published):
+    legacy = "2999-01-01T00:00:00%2B00:00"
+    resp = await http_client.get(f"/api/v1/public/posts?cursor={legacy}")
+    assert resp.status_code == 200
+    assert len(resp.json()["items"]) == 7
+
+
+@pytest.mark.asyncio
+async def test_calendar_archive_stats_count_input_posts(http_client, published):
+    resp = await http_client.get("/api/v1/public/calendar?year=2024&month=1")
+    assert resp.json()["dates"] == [
+        {"date": DAYS[0], "post_count": 3},
+        {"date": DAYS[1], "post_count": 2},
+        {"date": DAYS[2], "post_count": 2},
+    ]
+
+    resp = await http_client.get("/api/v1/public/archive")
+    assert resp.json()["months"] == [
+        {"month": "2024-01", "label": "January 2024", "post_count": 7}
+    ]
+
+    resp = await http_client.get("/api/v1/public/stats")
+    assert resp.json() == {
+        "total_posts": 7,
+        "total_days": 3,
+        "channels_used": ["blog"],
+    }
+
+
+@pytest.mark.asyncio
+async def test_aggregates_follow_unpublish_and_day_delete(
+    http_client, client_headers, published
+):
+    await http_client.delete(
+        f"/api/v1/publish/{published[0]['id']}", headers=client_headers
+    )
+    await http_client.delete(f"/api/v1/days/{DAYS[1]}", headers=client_headers)
+    http_client.cookies.clear()
+
+    resp = await http_client.get("/api/v1/public/calendar?year=2024&month=1")
+    assert resp.json()["dates"] == [
+        {"date": DAYS[0], "post_count": 2},
+        {"date": DAYS[2], "post_count": 2},
+    ]
+    resp = await http_client.get("/api/v1/public/stats")
+    assert resp.json()["total_posts"] == 4
+
+    columns = (
+        PublicPostDaily.date,
+        PublicPostDaily.channel_id,
+        PublicPostDaily.post_count,
+    )
+    live = select(*columns).where(PublicPostDaily.post_count > 0)
+    async with TestSession() as session:
+        incremental = (await session.execute(live)).all()
+        await rebuild(session)
+        await session.commit()
+        rebuilt = (await session.execute(select(*columns))).all()
+    assert sorted(rebuilt) == sorted(incremental)
@@ -0,0 +1,170 @@
+import asyncio
+import os
+
+import asyncpg
+import pytest
+from sqlalchemy.engine import make_url
+
+from app import public_cache
+from app.config import settings
+from app.public_cache import CachedResponse, PublicResponseCache
+
+TEST_POSTGRES_URL = os.environ.get("TEST_POSTGRES_URL")
+
+
+async def _post(http_client, headers, content="Note"):
+    resp = await http_client.post(
+        "/api/v1/inputs",
+        json={"type": "text", "content": content, "date": "2024-01-01"},
+        headers=headers,
+    )
+    resp = await http_client.post(
+        "/api/v1/publish/input",
+        json={"input_item_id": resp.json()["id"]},
+        headers=headers,
+    )
+    # Anonymous reader from here on: no read-your-writes cookie
+    http_client.cookies.clear()
+    return resp.json()
+
+
+@pytest.mark.asyncio
+async def test_repeat_requests_skip_the_database(
+    http_client, client_headers, query_log
+):
+    await _post(http_client, client_headers)
+    query_log.clear()
+
+    first = await http_client.get("/api/v1/public/posts")
+    assert first.headers["X-Cache"] == "MISS"
+    assert query_log
+    query_log.clear()
+
+    second = await http_client.get("/api/v1/public/posts")
+    assert second.headers["X-Cache"] == "HIT"
+    assert second.json() == first.json()
+    assert query_log == []
+
+    revalidated = await http_client.get(
+        "/api/v1/public/posts", headers={"If-None-Match": first.headers["ETag"]}
+    )
+    assert revalidated.status_code == 304
+    assert revalidated.content == b""
+    assert query_log == []
+
+
+@pytest.mark.asyncio
+async def test_query_params_are_part_of_the_key(http_client, client_headers):
+    await _post(http_client, client_headers)
+    await http_client.get("/api/v1/public/posts?limit=1")
+    resp = await http_client.get("/api/v1/public/posts?limit=2")
+    assert resp.headers["X-Cache"] == "MISS"
+
+
+@pytest.mark.asyncio
+async def test_publish_and_unpublish_invalidate(http_client, client_headers):
+    post = await _post(http_client, client_headers, "first")
+    etag = (await http_client.get("/api/v1/public/posts")).headers["ETag"]
+
+    await _post(http_client, client_headers, "second")
+    resp = await http_client.get(
+        "/api/v1/public/posts", headers={"If-None-Match": etag}
+    )
+    assert resp.status_code == 200
+    assert {item["text"] for item in resp.json()["items"]} == {"first", "second"}
+
+    await http_client.delete(f"/api/v1/publish/{post['id']}", headers=client_headers)
+    http_client.cookies.clear()
+    resp = await http_client.get("/api/v1/public/posts")
+    assert [item["text"] for item in resp.json()["items"]] == ["second"]
+
+
+@pytest.mark.asyncio
+async def test_signed_in_and_error_responses_are_not_cached(
+    http_client, client_headers
+):
+    await _post(http_client, client_headers)
+    resp = await http_client.get("/api/v1/public/posts", headers=client_headers)
+    assert "X-Cache" not in resp.headers
+    assert len(public_cache.cache) == 0
+
+    resp = await http_client.get("/api/v1/public/posts/missing")
+    assert resp.status_code == 404
+    assert len(public_cache.cache) == 0
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_compute_once():
+    cache = PublicResponseCache(maxsize=10, ttl=60)
+    gate = asyncio.Event()
+    calls = 0
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        await gate.wait()
+        return CachedResponse(200, b"body", {}, '"etag"')
+
+    tasks = [asyncio.create_task(cache.get_or_compute("k", compute)) for _ in range(10)]
+    await asyncio.sleep(0)
+    gate.set()
+    results = await asyncio.gather(*tasks)
+    assert calls == 1
+    assert sum(hit for _, hit in results) == 9
+    assert {entry.body for entry, _ in results} == {b"body"}
+
+
+@pytest.mark.asyncio
+async def test_invalidation_during_miss_is_not_overwritten():
+    cache = PublicResponseCache(maxsize=10, ttl=60)
+
+    async def compute():
+        cache.invalidate()  # a publish lands while the page renders
+        return CachedResponse(200, b"stale", {}, '"etag"')
+
+    entry, hit = await cache.get_or_compute("k", compute)
+    assert entry.body == b"stale" and not hit
+    assert len(cache) == 0
+
+
+def test_postgres_databases_share_invalidation_by_default(monkeypatch):
+    monkeypatch.setattr(settings, "PUBLIC_CACHE_BACKEND", "")
+    monkeypatch.setattr(settings, "DATABASE_URL", "postgresql+asyncpg://db/daycast")
+    assert public_cache.backend() == "postgres"
+    monkeypatch.setattr(settings, "DB_PGBOUNCER", True)  # no LISTEN through it
+    assert public_cache.backend() == "memory"
+    monkeypatch.setattr(settings, "DB_PGBOUNCER", False)
+    monkeypatch.setattr(settings, "DATABASE_URL", "sqlite+aiosqlite:///daycast.db")
+    assert public_cache.backend() == "memory"
+    monkeypatch.setattr(settings, "PUBLIC_CACHE_BACKEND", "memory")
+    monkeypatch.setattr(settings, "DATABASE_URL", "postgresql+asyncpg://db/daycast")
+    assert public_cache.backend() == "memory"
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not TEST_POSTGRES_URL, reason="set TEST_POSTGRES_URL")
+async def test_notify_invalidates_other_workers(monkeypatch):
+    monkeypatch.setattr(settings, "DATABASE_URL", TEST_POSTGRES_URL)
+    cache = PublicResponseCache(maxsize=10, ttl=60)
+    monkeypatch.setattr(public_cache, "cache", cache)
+    listener = asyncio.create_task(public_cache.listen(retry_seconds=0.1))
+    try:
+        while cache.version == 0:  # connected and listening
+            await asyncio.sleep(0.01)
+        await cache.get_or_compute(
+            "k", lambda: asyncio.sleep(0, CachedResponse(200, b"x", {}, '"e"'))
+        )
+        assert len(cache) == 1
+
+        # Another worker publishes
+        url = make_url(TEST_POSTGRES_URL).set(drivername="postgresql")
+        conn = await asyncpg.connect(url.render_as_string(hide_password=False))
+        await conn.execute(f"NOTIFY {public_cache.CHANNEL}")
+        await conn.close()
+        for _ in range(100):
+            if len(cache) == 0:
+                break
+            await asyncio.sleep(0.01)
+        assert len(cache) == 0
+    finally:
+        listener.cancel()
@@ -0,0 +1,114 @@
+import os
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.rate_limit import PostgresRateLimitBackend, SlidingWindowLimiter
+
+TEST_POSTGRES_URL = os.environ.get("TEST_POSTGRES_URL")
+
+
+def test_limit_enforced_within_window():
+    limiter = SlidingWindowLimiter(window=60.0)
+    assert all(limiter.hit("a", 5, now=0.0 + i) for i in range(5))
+    assert limiter.hit("a", 5, now=10.0) is False
+    # Other keys are independent
+    assert limiter.hit("b", 5, now=10.0) is True
+
+
+def test_previous_window_weighs_in():
+    limiter = SlidingWindowLimiter(window=60.0)
+    for i in range(10):
+        limiter.hit("a", 10, now=50.0)
+    # 15s into the next window, 75% of the previous 10 still counts (7.5),
+    # leaving room for 3 more requests
+    assert [limiter.hit("a", 10, now=75.0) for _ in range(4)] == [
+        True,
+        True,
+        True,
+        False,
+    ]
+
+
+def test_rejected_requests_are_not_counted():
+    limiter = SlidingWindowLimiter(window=60.0)
+    for _ in range(20):
+        limiter.hit("a", 4, now=50.0)
+    # Only the 4 allowed requests carry over (3 at 75%), not all 20
+    assert limiter.hit("a", 4, now=75.0) is True
+    assert limiter.hit("a", 4, now=75.0) is False
+
+
+def test_counts_reset_after_two_windows():
+    limiter = SlidingWindowLimiter(window=60.0)
+    for _ in range(10):
+        limiter.hit("a", 10, now=0.0)
+    assert limiter.hit("a", 10, now=130.0) is True
+
+
+def test_idle_keys_evicted():
+    limiter = SlidingWindowLimiter(window=60.0)
+    for i in range(1000):
+        limiter.hit(i, 10, now=0.0)
+    limiter.hit("fresh", 10, now=200.0)
+    assert len(limiter) == 1
+
+
+def test_max_keys_bounds_memory():
+    limiter = SlidingWindowLimiter(window=60.0, max_keys=100)
+    for i in range(10_000):
+        limiter.hit(i, 10, now=1.0)
+    assert len(limiter) == 100
+
+
+@pytest.mark.asyncio
+async def test_postgres_backend_falls_back_to_local():
+    unreachable = create_async_engine("postgresql+asyncpg://x:x@127.0.0.1:1/x")
+    backend = PostgresRateLimitBackend(unreachable)
+    assert await backend.hit("api:a", 2, 60.0) is True
+    assert await backend.hit("api:a", 2, 60.0) is True
+    assert await backend.hit("api:a", 2, 60.0) is False
+    await unreachable.dispose()
+
+
+@pytest.fixture
+async def pg():
+    if not TEST_POSTGRES_URL:
+        pytest.skip("set TEST_POSTGRES_URL")
+    pg = create_async_engine(TEST_POSTGRES_URL)
+    async with pg.begin() as conn:
+        await conn.execute(text("DROP TABLE IF EXISTS rate_limit_counters"))
+        await conn.execute(
+            text(
+                "CREATE UNLOGGED TABLE rate_limit_counters (key TEXT, "
+                "window_start BIGINT, count INTEGER NOT NULL DEFAULT 0, "
+                "PRIMARY KEY (key, window_start))"
+            )
+        )
+    yield pg
+    await pg.dispose()
+
+
+@pytest.mark.asyncio
+async def test_postgres_backend_shares_counts_across_workers(pg):
+    # Two backends stand in for two uvicorn workers
+    worker_a = PostgresRateLimitBackend(pg)
+    worker_b = PostgresRateLimitBackend(pg)
+    results = [
+        await (worker_a if i % 2 else worker_b).hit("api:shared", 4, 3600.0)
+        for i in range(6)
+    ]
+    assert results.count(True) == 4
+
+
+@pytest.mark.asyncio
+async def test_postgres_backend_does_not_count_rejects(pg):
+    backend = PostgresRateLimitBackend(pg)
+    results = [await backend.hit("api:flood", 4, 3600.0) for _ in range(20)]
+    assert results == [True] * 4 + [False] * 16
+    async with pg.connect() as conn:
+        count = await conn.scalar(
+            text("SELECT count FROM rate_limit_counters WHERE key = 'api:flood'")
+        )
+    assert count == 4
@@ -0,0 +1,125 @@
+import os
+import time
+import uuid
+from datetime import date
+
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app import database
+from app.database import LAST_WRITE_COOKIE, ReplicaLagMonitor
+from app.models import Base
+from app.models.published_post import PublishedPost
+from tests.conftest import CLIENT_ID
+
+TEST_POSTGRES_URL = os.environ.get("TEST_POSTGRES_URL")
+TEST_POSTGRES_READ_URL = os.environ.get("TEST_POSTGRES_READ_URL")
+
+REPLICA_URL = "sqlite+aiosqlite:///file:replica?mode=memory&cache=shared&uri=true"
+SLUG = "only-on-replica"
+
+
+@pytest.fixture
+async def replica(monkeypatch):
+    """A second database standing in for the replica; holds a post the primary lacks."""
+    read_engine = create_async_engine(REPLICA_URL)
+    async with read_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    sessions = async_sessionmaker(read_engine, expire_on_commit=False)
+    async with sessions() as session:
+        session.add(
+            PublishedPost(
+                client_id=uuid.UUID(CLIENT_ID),
+                slug=SLUG,
+                text="Hello",
+                date=date.today(),
+            )
+        )
+        await session.commit()
+
+    lag = ReplicaLagMonitor(read_engine, interval=0.0)
+    lag.reported = 0.0
+
+    async def measure():
+        return lag.reported
+
+    monkeypatch.setattr(lag, "measure", measure)
+    monkeypatch.setattr(database, "read_engine", read_engine)
+    monkeypatch.setattr(database, "async_read_session", sessions)
+    monkeypatch.setattr(database, "replica_lag", lag)
+    yield lag
+    async with read_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+    await read_engine.dispose()
+
+
+async def _served_by_replica(http_client, **kwargs) -> bool:
+    resp = await http_client.get(f"/api/v1/public/posts/{SLUG}", **kwargs)
+    assert resp.status_code in (200, 404)
+    return resp.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_anonymous_reads_go_to_replica(http_client, replica):
+    assert await _served_by_replica(http_client)
+
+
+@pytest.mark.asyncio
+async def test_signed_in_reads_stay_on_primary(http_client, client_headers, replica):
+    assert not await _served_by_replica(http_client, headers=client_headers)
+
+
+@pytest.mark.asyncio
+async def test_recent_writer_reads_from_primary(http_client, client_headers, replica):
+    resp = await http_client.post(
+        "/api/v1/inputs",
+        json={"type": "text", "content": "note"},
+        headers=client_headers,
+    )
+    assert resp.status_code == 201
+    wrote_at = resp.cookies[LAST_WRITE_COOKIE]
+    http_client.cookies.clear()
+
+    assert not await _served_by_replica(
+        http_client, cookies={LAST_WRITE_COOKIE: wrote_at}
+    )
+    stale = str(time.time() - 3600)
+    assert await _served_by_replica(http_client, cookies={LAST_WRITE_COOKIE: stale})
+
+
+@pytest.mark.asyncio
+async def test_lagging_replica_falls_back_to_primary(http_client, replica):
+    replica.reported = 60.0
+    assert not await _served_by_replica(http_client)
+    replica.reported = 0.5
+    assert await _served_by_replica(http_client)
+
+
+@pytest.mark.asyncio
+async def test_lag_monitor_caches_and_treats_errors_as_lagging():
+    calls = 0
+
+    class Monitor(ReplicaLagMonitor):
+        async def measure(self):
+            nonlocal calls
+            calls += 1
+            raise ConnectionRefusedError("replica down")
+
+    monitor = Monitor(None, interval=60.0)
+    assert await monitor.current_lag() == float("inf")
+    assert await monitor.current_lag() == float("inf")
+    assert calls == 1
+
+
+@pytest.mark.skipif(
+    not (TEST_POSTGRES_URL and TEST_POSTGRES_READ_URL),
+    reason="set TEST_POSTGRES_URL and TEST_POSTGRES_READ_URL",
+)
+@pytest.mark.asyncio
+async def test_postgres_replica_lag():
+    primary = create_async_engine(TEST_POSTGRES_URL)
+    standby = create_async_engine(TEST_POSTGRES_READ_URL)
+    assert await ReplicaLagMonitor(primary, 0).measure() == 0
+    assert await ReplicaLagMonitor(standby, 0).measure() < 5
+    await primary.dispose()
+    await standby.dispose()
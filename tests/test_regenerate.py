@@ -4,6 +4,8 @@ from unittest.mock import AsyncMock, patch
 
 import pytest
 
+from tests.conftest import engine
+
 TODAY = date.today().isoformat()
 
 MOCK_AI_RESPONSE = {
@@ -130,3 +132,24 @@ async def test_regenerate_appears_in_day(http_client, client_headers):
     )
     data = day_resp.json()
     assert len(data["generations"]) == 2
+
+
+@pytest.mark.asyncio
+async def test_regenerate_releases_connection_during_ai_call(
+    http_client, client_headers
+):
+    gen = await _create_and_generate(http_client, client_headers)
+    checked_out = []
+
+    async def fake_regenerate(**kwargs):
+        checked_out.append(engine.pool.checkedout())
+        return [{"channel_id": "blog", "text": "Again"}], "gpt-5.2", 10
+
+    with patch("app.routers.generate.ai_regenerate", fake_regenerate):
+        resp = await http_client.post(
+            f"/api/v1/generate/{gen['id']}/regenerate",
+            json={"channels": ["blog"]},
+            headers=client_headers,
+        )
+    assert resp.status_code == 201
+    assert checked_out == [0]
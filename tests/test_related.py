@@ -0,0 +1,123 @@
+import uuid
+
+import numpy as np
+import pytest
+
+from app.services import related
+from tests.conftest import TestSession, publish_post
+
+TOPICS = {
+    "garden": [
+        "Planted tomatoes and basil in the garden beds this morning",
+        "The garden tomatoes need water; basil is growing fast in the beds",
+        "Weeded the garden beds and tied up the tomato plants",
+    ],
+    "code": [
+        "Fixed a race condition in the database connection pool",
+        "Profiled the database pool and the connection timeouts again",
+    ],
+}
+
+
+async def _related(http_client, slug, **params):
+    resp = await http_client.get(
+        f"/api/v1/public/posts/{slug}/related", params=params
+    )
+    assert resp.status_code == 200
+    return [item["slug"] for item in resp.json()["items"]]
+
+
+@pytest.mark.asyncio
+async def test_related_posts_share_a_topic(http_client, client_headers):
+    posts = {
+        topic: [await publish_post(http_client, client_headers, text) for text in texts]
+        for topic, texts in TOPICS.items()
+    }
+    garden = {post["slug"] for post in posts["garden"]}
+    first = posts["garden"][0]["slug"]
+
+    slugs = await _related(http_client, first, limit=2)
+    assert set(slugs) == garden - {first}
+
+    slugs = await _related(http_client, posts["code"][0]["slug"])
+    assert slugs[0] == posts["code"][1]["slug"]
+    assert posts["code"][0]["slug"] not in slugs
+
+    resp = await http_client.get("/api/v1/public/posts/nope/related")
+    assert resp.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_unpublish_and_delete_day_leave_the_index(
+    http_client, client_headers, related_index
+):
+    posts = [
+        await publish_post(http_client, client_headers, text)
+        for text in TOPICS["garden"]
+    ]
+    await http_client.delete(
+        f"/api/v1/publish/{posts[1]['id']}", headers=client_headers
+    )
+    assert await _related(http_client, posts[0]["slug"]) == [posts[2]["slug"]]
+
+    await http_client.delete("/api/v1/days/2024-01-01", headers=client_headers)
+    assert related_index.related(uuid.uuid4(), TOPICS["garden"][0], 5) == []
+
+
+@pytest.mark.asyncio
+async def test_unindexed_post_is_vectorized_on_the_fly(
+    http_client, client_headers, related_index
+):
+    posts = [
+        await publish_post(http_client, client_headers, text)
+        for text in TOPICS["garden"] + TOPICS["code"]
+    ]
+    related_index.remove([uuid.UUID(posts[0]["id"])])
+    slugs = await _related(http_client, posts[0]["slug"], limit=2)
+    assert set(slugs) == {posts[1]["slug"], posts[2]["slug"]}
+
+
+def test_index_grows_and_survives_reopening(related_index, monkeypatch):
+    monkeypatch.setattr(related, "MIN_CAPACITY", 2)
+    index = related.RelatedIndex(related_index.path / "grow", dim=64)
+    ids = [uuid.uuid4() for _ in range(5)]
+    for i, post_id in enumerate(ids):
+        index.add(post_id, f"note number {i} about topic{i} and topic{i}")
+    index.add(ids[0], "added twice")
+    assert index._read_meta()["count"] == 5
+    assert index._read_meta()["capacity"] == 8
+
+    reopened = related.RelatedIndex(index.path, dim=64)
+    assert set(reopened.related(ids[0], "", 10)) <= set(ids[1:])
+    with pytest.raises(ValueError, match="RELATED_INDEX_DIM"):
+        related.RelatedIndex(index.path, dim=32).add(uuid.uuid4(), "text")
+
+
+def test_incremental_matches_rebuild(related_index):
+    texts = TOPICS["garden"] + TOPICS["code"]
+    ids = [uuid.uuid4() for _ in texts]
+    for post_id, text in zip(ids, texts):
+        related_index.add(post_id, text)
+    related_index.remove([ids[0], ids[3]])
+
+    rebuilt = related.RelatedIndex(related_index.path / "rebuilt", related_index.dim)
+    kept = [pair for i, pair in enumerate(zip(ids, texts)) if i not in (0, 3)]
+    rebuilt.rebuild(kept)
+    meta = related_index._read_meta()
+    incremental = related_index._map(meta, "r")
+    full = rebuilt._map(rebuilt._read_meta(), "r")
+    assert np.array_equal(incremental[2], full[2])  # document frequencies
+    for post_id in ids[1:3] + ids[4:]:
+        assert related_index.related(post_id, "", 5) == rebuilt.related(post_id, "", 5)
+
+
+@pytest.mark.asyncio
+async def test_rebuild_from_published_posts(http_client, client_headers, related_index):
+    posts = [
+        await publish_post(http_client, client_headers, text)
+        for text in TOPICS["garden"]
+    ]
+    related_index.remove([uuid.UUID(post["id"]) for post in posts])
+    async with TestSession() as session:
+        assert await related.rebuild(session) == 3
+    assert len(await _related(http_client, posts[0]["slug"])) == 2
@@ -0,0 +1,223 @@
+import importlib.util
+import json
+import os
+import uuid
+from datetime import date
+from pathlib import Path
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.models import Base
+from app.models.generation import Generation
+from app.models.generation_result import GenerationResult
+from app.models.input_item import InputItem
+from app.services.search import search
+
+TEST_POSTGRES_URL = os.environ.get("TEST_POSTGRES_URL")
+TODAY = date.today().isoformat()
+
+
+async def _add_item(http_client, headers, content):
+    resp = await http_client.post(
+        "/api/v1/inputs",
+        json={"type": "text", "content": content, "date": TODAY},
+        headers=headers,
+    )
+    assert resp.status_code == 201
+    return resp.json()
+
+
+def _mock_openai(text_out):
+    body = {
+        "choices": [
+            {
+                "message": {
+                    "content": json.dumps(
+                        {"results": [{"channel_id": "blog", "text": text_out}]}
+                    )
+                }
+            }
+        ],
+        "model": "gpt-5.2",
+    }
+    mock_resp = AsyncMock()
+    mock_resp.status_code = 200
+    mock_resp.json = lambda: body
+    mock_resp.raise_for_status = lambda: None
+    mock_client = AsyncMock()
+    mock_client.post = AsyncMock(return_value=mock_resp)
+    mock_client.__aenter__ = AsyncMock(return_value=mock_client)
+    mock_client.__aexit__ = AsyncMock(return_value=False)
+    return patch("app.services.ai.httpx.AsyncClient", return_value=mock_client)
+
+
+async def _search(http_client, headers, **params):
+    resp = await http_client.get("/api/v1/search", params=params, headers=headers)
+    assert resp.status_code == 200, resp.text
+    return resp.json()
+
+
+@pytest.mark.asyncio
+async def test_search_items_and_results(http_client, client_headers):
+    await _add_item(http_client, client_headers, "Coffee with <Anna> downtown")
+    cleared = await _add_item(http_client, client_headers, "coffee I took back")
+    await _add_item(http_client, client_headers, "Long walk")
+    await http_client.delete(f"/api/v1/inputs/{cleared['id']}", headers=client_headers)
+    with _mock_openai("A morning of good coffee."):
+        await http_client.post(
+            "/api/v1/generate",
+            json={"date": TODAY, "channels": ["blog"]},
+            headers=client_headers,
+        )
+
+    data = await _search(http_client, client_headers, q="coffee")
+    assert sorted(h["kind"] for h in data["items"]) == ["item", "result"]
+    item = next(h for h in data["items"] if h["kind"] == "item")
+    assert item["snippet"] == "<mark>Coffee</mark> with &lt;Anna&gt; downtown"
+    assert data["cursor"] is None
+
+
+@pytest.mark.asyncio
+async def test_search_is_scoped_to_client(http_client, client_headers):
+    from app.services.auth import create_jwt
+
+    await _add_item(http_client, client_headers, "secret coffee plans")
+    other = {"Authorization": f"Bearer {create_jwt(uuid.uuid4())}"}
+    assert (await _search(http_client, other, q="coffee"))["items"] == []
+
+
+@pytest.mark.asyncio
+async def test_search_keyset_pagination(http_client, client_headers):
+    for i in range(5):
+        await _add_item(http_client, client_headers, f"tea number {i}")
+
+    seen, cursor = [], None
+    while True:
+        params = {"q": "tea", "limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        page = await _search(http_client, client_headers, **params)
+        seen += [h["id"] for h in page["items"]]
+        cursor = page["cursor"]
+        if cursor is None:
+            break
+    assert len(seen) == len(set(seen)) == 5
+
+
+@pytest.mark.asyncio
+async def test_search_invalid_cursor(http_client, client_headers):
+    resp = await http_client.get(
+        "/api/v1/search",
+        params={"q": "tea", "cursor": "not-a-cursor"},
+        headers=client_headers,
+    )
+    assert resp.status_code == 400
+
+
+def _load_migration(name):
+    path = Path(__file__).parent.parent / "alembic" / "versions" / f"{name}.py"
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.mark.skipif(not TEST_POSTGRES_URL, reason="set TEST_POSTGRES_URL")
+@pytest.mark.asyncio
+async def test_postgres_full_text_search():
+    migration = _load_migration("014_add_search_vectors")
+    pg = create_async_engine(TEST_POSTGRES_URL)
+    async with pg.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+        for table in migration.TABLES:
+            for statement in migration.vector_ddl(table):
+                await conn.execute(text(statement))
+        await conn.execute(
+            text(
+                "CREATE INDEX idx_input_items_search "
+                "ON input_items USING gin (search_vector)"
+            )
+        )
+
+    client_id = uuid.uuid4()
+    sessions = async_sessionmaker(pg, expire_on_commit=False)
+    async with sessions() as session:
+        await session.execute(
+            text("INSERT INTO clients (id) VALUES (:id)"), {"id": client_id}
+        )
+        day = date.today()
+        session.add_all(
+            [
+                InputItem(
+                    client_id=client_id,
+                    date=day,
+                    type="text",
+                    content="Купил новые книги",
+                ),
+                InputItem(
+                    client_id=client_id,
+                    date=day,
+                    type="text",
+                    content="Went running by the river",
+                ),
+                InputItem(
+                    client_id=client_id,
+                    date=day,
+                    type="url",
+                    content="https://example.com",
+                    extracted_text="Die Bücher über Berge",
+                ),
+            ]
+        )
+        generation = Generation(
+            client_id=client_id, date=day, prompt_version="generate_v1"
+        )
+        session.add(generation)
+        await session.flush()
+        session.add(
+            GenerationResult(
+                generation_id=generation.id,
+                channel_id="blog",
+                style="casual",
+                language="ru",
+                text="День с книгой и кофе",
+                model="gpt-5.2",
+                latency_ms=1,
+            )
+        )
+        await session.commit()
+
+        # Stemming per language: книга ~ книги/книгой, run ~ running, Buch ~ Bücher
+        hits, _ = await search(session, client_id, "книга", 10)
+        assert sorted(h.kind for h in hits) == ["item", "result"]
+        assert "<mark>" in hits[0].snippet
+        hits, _ = await search(session, client_id, "run", 10)
+        assert [h.snippet for h in hits] == ["Went <mark>running</mark> by the river"]
+        hits, _ = await search(session, client_id, "Bücher", 10)
+        assert len(hits) == 1
+
+        # Keyset pages cover everything exactly once
+        seen, cursor = [], None
+        while True:
+            hits, cursor = await search(session, client_id, "книга OR run", 1, cursor)
+            seen += [h.id for h in hits]
+            if cursor is None:
+                break
+        assert len(seen) == len(set(seen)) == 3
+
+        await session.execute(text("SET LOCAL enable_seqscan = off"))
+        plan = await session.execute(
+            text(
+                "EXPLAIN SELECT id FROM input_items WHERE search_vector @@ "
+                "websearch_to_tsquery('russian', 'книга')"
+            )
+        )
+        assert "idx_input_items_search" in "\n".join(row[0] for row in plan)
+
+    async with pg.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+    await pg.dispose()
@@ -0,0 +1,169 @@
+import json
+import shutil
+import xml.etree.ElementTree as ET
+
+import pytest
+from sqlalchemy.exc import TimeoutError as PoolTimeout
+
+from app.config import settings
+from app.services import snapshots
+from tests.conftest import TestSession, publish_post
+
+ATOM = "{http://www.w3.org/2005/Atom}"
+
+
+@pytest.fixture
+def snapshot_dir(tmp_path, monkeypatch):
+    root = tmp_path / "public"
+    monkeypatch.setattr(settings, "STATIC_SNAPSHOT_DIR", str(root))
+    monkeypatch.setattr(settings, "PUBLIC_API_URL", "https://daycast.example.com")
+    monkeypatch.setattr(settings, "FEED_PAGE_SIZE", 2)
+    monkeypatch.setattr(snapshots, "_queued", None)
+    return root
+
+
+def _tree(root) -> dict[str, str]:
+    return {
+        path.relative_to(root).as_posix(): path.read_text()
+        for path in sorted(root.rglob("*"))
+        if path.is_file()
+    }
+
+
+async def _rewrite_archives() -> int:
+    async with TestSession() as session:
+        return await snapshots.rewrite_archives(session)
+
+
+def _links(body: str) -> dict[str, str]:
+    channel = ET.fromstring(body).find("channel")
+    return {link.get("rel"): link.get("href") for link in channel.iter(f"{ATOM}link")}
+
+
+@pytest.mark.asyncio
+async def test_publish_writes_post_and_feeds(
+    http_client, client_headers, snapshot_dir
+):
+    post = await publish_post(http_client, client_headers, "Hello <world>\n\nSecond")
+
+    api = await http_client.get(f"/api/v1/public/posts/{post['slug']}")
+    snapshot = json.loads((snapshot_dir / f"posts/{post['slug']}.json").read_text())
+    assert snapshot == api.json()
+
+    fragment = (snapshot_dir / f"posts/{post['slug']}.html").read_text()
+    assert "<p>Hello &lt;world&gt;</p>\n  <p>Second</p>" in fragment
+
+    rss = (snapshot_dir / "rss.xml").read_text()
+    assert _links(rss)["self"] == "https://daycast.example.com/api/v1/public/rss"
+    assert "Hello &lt;world&gt;" in rss
+    assert (snapshot_dir / "atom.xml").exists()
+    assert json.loads((snapshot_dir / "feed.json").read_text())["items"]
+    assert not (snapshot_dir / "archive").exists()
+
+
+@pytest.mark.asyncio
+async def test_archives_follow_publish_and_unpublish(
+    http_client, client_headers, snapshot_dir
+):
+    posts = [
+        await publish_post(http_client, client_headers, f"post {i}")
+        for i in range(4)
+    ]
+    first = (snapshot_dir / "archive/rss/1.xml").read_text()
+    assert _links(first)["next-archive"].endswith("?page=2")
+    second = (snapshot_dir / "archive/rss/2.xml").read_text()
+    assert "next-archive" not in _links(second)
+    assert (snapshot_dir / "archive/feed.json/2.json").exists()
+
+    # Four posts become three: the archive pages shift and the second goes away
+    removed = next(post for post in posts if post["id"] in first)
+    await http_client.delete(f"/api/v1/publish/{removed['id']}", headers=client_headers)
+    assert not (snapshot_dir / f"posts/{removed['slug']}.json").exists()
+    assert removed["id"] not in (snapshot_dir / "rss.xml").read_text()
+    assert await _rewrite_archives() == 3
+    assert not (snapshot_dir / "archive/rss/2.xml").exists()
+    page = (snapshot_dir / "archive/rss/1.xml").read_text()
+    assert removed["id"] not in page
+    assert len(ET.fromstring(page).findall("channel/item")) == 2
+    assert "next-archive" not in _links(page)
+
+    # Incremental updates produce exactly what a full rebuild does
+    incremental = _tree(snapshot_dir)
+    shutil.rmtree(snapshot_dir)
+    (snapshot_dir / "posts").mkdir(parents=True)
+    (snapshot_dir / "posts/stale.json").write_text("{}")
+    async with TestSession() as session:
+        await snapshots.rebuild(session)
+    assert _tree(snapshot_dir) == incremental
+
+
+@pytest.mark.asyncio
+async def test_delete_day_removes_snapshots(http_client, client_headers, snapshot_dir):
+    post = await publish_post(http_client, client_headers, "gone with the day")
+    await http_client.delete("/api/v1/days/2024-01-01", headers=client_headers)
+    assert not (snapshot_dir / f"posts/{post['slug']}.html").exists()
+    assert "gone with the day" not in (snapshot_dir / "rss.xml").read_text()
+
+
+@pytest.mark.asyncio
+async def test_disabled_by_default(http_client, client_headers, tmp_path):
+    assert settings.STATIC_SNAPSHOT_DIR == ""
+    await publish_post(http_client, client_headers, "not snapshotted")
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.asyncio
+async def test_archive_rewrites_leave_the_request_and_coalesce(
+    http_client, client_headers, snapshot_dir
+):
+    posts = [
+        await publish_post(http_client, client_headers, f"post {i}")
+        for i in range(6)
+    ]
+    # SQLite's second-resolution timestamps can reorder posts published within
+    # the same second; start from a consistent tree
+    async with TestSession() as session:
+        await snapshots.rebuild(session)
+    for post in posts[:2]:
+        resp = await http_client.delete(
+            f"/api/v1/publish/{post['id']}", headers=client_headers
+        )
+        assert resp.status_code == 204
+    # Still the pre-removal archives until the writer runs
+    assert (snapshot_dir / "archive/rss/3.xml").exists()
+
+    # One pass for both removals
+    assert await _rewrite_archives() > 0
+    assert await _rewrite_archives() == 0
+    assert not (snapshot_dir / "archive/rss/3.xml").exists()
+    incremental = _tree(snapshot_dir)
+    async with TestSession() as session:
+        await snapshots.rebuild(session)
+    assert _tree(snapshot_dir) == incremental
+
+
+@pytest.mark.asyncio
+async def test_snapshot_failures_dont_fail_the_request(
+    http_client, client_headers, snapshot_dir, monkeypatch
+):
+    async def timeout(session):
+        raise PoolTimeout("QueuePool limit reached")
+
+    monkeypatch.setattr(snapshots, "_total_posts", timeout)
+    resp = await http_client.post(
+        "/api/v1/inputs",
+        json={"type": "text", "content": "published", "date": "2024-01-01"},
+        headers=client_headers,
+    )
+    resp = await http_client.post(
+        "/api/v1/publish/input",
+        json={"input_item_id": resp.json()["id"]},
+        headers=client_headers,
+    )
+    assert resp.status_code == 201
+
+    # Queued archive rewrites survive a failed pass
+    monkeypatch.setattr(snapshots, "_queued", snapshots.Removal(["x"], 1, 1))
+    with pytest.raises(PoolTimeout):
+        await _rewrite_archives()
+    assert snapshots._queued is not None
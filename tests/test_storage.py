@@ -0,0 +1,131 @@
+import os
+import uuid
+from datetime import date
+
+import pytest
+
+from app.services import file_storage
+from app.services.file_storage import LocalStorage, S3Storage
+from tests.conftest import CLIENT_ID
+
+TODAY = date.today().isoformat()
+
+TINY_JPEG = (
+    b"\xff\xd8\xff\xe0\x00\x10JFIF\x00\x01\x01\x00\x00\x01\x00\x01\x00\x00"
+    b"\xff\xd9"
+)
+
+
+@pytest.fixture
+def local_storage(tmp_path, monkeypatch):
+    storage = LocalStorage(tmp_path)
+    monkeypatch.setattr(file_storage, "_storage", storage)
+    return storage
+
+
+@pytest.mark.asyncio
+async def test_local_roundtrip(local_storage):
+    await local_storage.save("a/b/c.jpg", TINY_JPEG, "image/jpeg")
+    assert await local_storage.read("a/b/c.jpg") == TINY_JPEG
+    stored = await local_storage.stat("a/b/c.jpg")
+    assert stored.size == len(TINY_JPEG)
+    assert await local_storage.delete("a/b/c.jpg") is True
+    assert await local_storage.read("a/b/c.jpg") is None
+    assert await local_storage.delete("a/b/c.jpg") is False
+
+
+@pytest.mark.asyncio
+async def test_local_rejects_traversal(local_storage):
+    with pytest.raises(ValueError):
+        await local_storage.read("../../etc/passwd")
+
+
+@pytest.mark.asyncio
+async def test_direct_upload_unsupported_on_local(
+    http_client, client_headers, local_storage
+):
+    resp = await http_client.post(
+        "/api/v1/inputs/upload-url",
+        json={"content_type": "image/jpeg", "date": TODAY},
+        headers=client_headers,
+    )
+    assert resp.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_upload_complete_creates_item(
+    http_client, client_headers, local_storage
+):
+    key = f"{CLIENT_ID}/{TODAY}/{uuid.uuid4()}.jpg"
+    await local_storage.save(key, TINY_JPEG, "image/jpeg")
+    resp = await http_client.post(
+        "/api/v1/inputs/upload-complete",
+        json={"key": key, "date": TODAY},
+        headers=client_headers,
+    )
+    assert resp.status_code == 201
+    assert resp.json()["content"] == key
+
+
+@pytest.mark.asyncio
+async def test_upload_complete_rejects_foreign_key(
+    http_client, client_headers, local_storage
+):
+    key = f"{uuid.uuid4()}/{TODAY}/{uuid.uuid4()}.jpg"
+    await local_storage.save(key, TINY_JPEG, "image/jpeg")
+    resp = await http_client.post(
+        "/api/v1/inputs/upload-complete",
+        json={"key": key, "date": TODAY},
+        headers=client_headers,
+    )
+    assert resp.status_code == 400
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "suffix",
+    [
+        "../../{victim}/{today}/{file}.jpg",  # resolves inside the upload root
+        "{file}.jpg/../../../{victim}/{today}/{file}.jpg",
+        "extra/{file}.jpg",
+        "not-a-uuid.jpg",
+        "{file}.gif",
+    ],
+)
+async def test_upload_complete_requires_issued_key_shape(
+    http_client, client_headers, local_storage, suffix
+):
+    victim, file_id = uuid.uuid4(), uuid.uuid4()
+    victim_key = f"{victim}/{TODAY}/{file_id}.jpg"
+    await local_storage.save(victim_key, TINY_JPEG, "image/jpeg")
+    suffix = suffix.format(victim=victim, today=TODAY, file=file_id)
+    resp = await http_client.post(
+        "/api/v1/inputs/upload-complete",
+        json={"key": f"{CLIENT_ID}/{TODAY}/{suffix}", "date": TODAY},
+        headers=client_headers,
+    )
+    assert resp.status_code == 400
+    assert await local_storage.stat(victim_key) is not None
+
+
+@pytest.mark.skipif(
+    not os.environ.get("S3_TEST_ENDPOINT_URL"),
+    reason="set S3_TEST_ENDPOINT_URL to run against MinIO (docker compose up minio)",
+)
+@pytest.mark.asyncio
+async def test_s3_roundtrip():
+    storage = S3Storage(
+        bucket=os.environ.get("S3_TEST_BUCKET", "daycast-test"),
+        endpoint_url=os.environ["S3_TEST_ENDPOINT_URL"],
+        region="us-east-1",
+        access_key_id=os.environ.get("S3_TEST_ACCESS_KEY_ID", "daycast"),
+        secret_access_key=os.environ.get("S3_TEST_SECRET_ACCESS_KEY", "daycast-secret"),
+    )
+    key = f"test/{uuid.uuid4()}.jpg"
+    await storage.save(key, TINY_JPEG, "image/jpeg")
+    assert await storage.read(key) == TINY_JPEG
+    assert (await storage.stat(key)).size == len(TINY_JPEG)
+    assert storage.presigned_download_url(key).startswith("http")
+    assert "fields" in storage.presigned_upload(key, "image/jpeg")
+    assert await storage.delete(key) is True
+    assert await storage.stat(key) is None
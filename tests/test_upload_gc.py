@@ -0,0 +1,162 @@
+import io
+import os
+import time
+import uuid
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import update
+
+from app.models.input_item import InputItem
+from app.services import file_storage
+from app.services.file_storage import LocalStorage
+from app.services.upload_gc import collect_batch, recount_usage
+from tests.conftest import CLIENT_ID, TestSession
+
+TODAY = date.today().isoformat()
+GRACE = timedelta(hours=1)
+
+TINY_JPEG = (
+    b"\xff\xd8\xff\xe0\x00\x10JFIF\x00\x01\x01\x00\x00\x01\x00\x01\x00\x00"
+    b"\xff\xd9"
+)
+
+
+@pytest.fixture
+def storage(tmp_path, monkeypatch):
+    storage = LocalStorage(tmp_path)
+    monkeypatch.setattr(file_storage, "_storage", storage)
+    return storage
+
+
+def _age(storage, key, hours=2):
+    old = time.time() - hours * 3600
+    os.utime(storage.local_path(key), (old, old))
+
+
+async def _upload(http_client, headers):
+    resp = await http_client.post(
+        "/api/v1/inputs/upload",
+        headers=headers,
+        files={"file": ("photo.jpg", io.BytesIO(TINY_JPEG), "image/jpeg")},
+        data={"date": TODAY},
+    )
+    assert resp.status_code == 201
+    return resp.json()
+
+
+@pytest.mark.asyncio
+async def test_list_objects_resumes_after_cursor(storage):
+    for key in ["a/1/x.jpg", "a/2/y.jpg", "b/1/z.jpg", "a-b/1/w.jpg"]:
+        await storage.save(key, b"x", "image/jpeg")
+    first = await storage.list_objects(limit=2)
+    rest = await storage.list_objects(start_after=first[-1].key, limit=10)
+    keys = [o.key for o in first + rest]
+    assert keys == sorted(keys)
+    assert len(keys) == 4
+
+
+@pytest.mark.asyncio
+async def test_gc_deletes_orphans_and_keeps_live(http_client, client_headers, storage):
+    live = await _upload(http_client, client_headers)
+    cleared = await _upload(http_client, client_headers)
+    await http_client.delete(f"/api/v1/inputs/{cleared['id']}", headers=client_headers)
+    orphan = f"{CLIENT_ID}/{TODAY}/{uuid.uuid4()}.jpg"
+    fresh_orphan = f"{CLIENT_ID}/{TODAY}/{uuid.uuid4()}.jpg"
+    await storage.save(orphan, TINY_JPEG, "image/jpeg")
+    await storage.save(fresh_orphan, TINY_JPEG, "image/jpeg")
+    for key in (live["content"], cleared["content"], orphan):
+        _age(storage, key)
+
+    async with TestSession() as session:
+        old = datetime.now(timezone.utc) - timedelta(hours=2)
+        await session.execute(
+            update(InputItem)
+            .where(InputItem.id == uuid.UUID(cleared["id"]))
+            .values(updated_at=old)
+        )
+        batch = await collect_batch(session, storage, None, 100, GRACE)
+        await session.commit()
+
+    assert sorted(batch.deleted) == sorted([cleared["content"], orphan])
+    assert batch.cursor is None  # short page: walk wrapped around
+    assert await storage.stat(live["content"]) is not None
+    assert await storage.stat(fresh_orphan) is not None
+
+
+@pytest.mark.asyncio
+async def test_gc_respects_grace_for_recently_cleared(
+    http_client, client_headers, storage
+):
+    item = await _upload(http_client, client_headers)
+    await http_client.delete(f"/api/v1/inputs/{item['id']}", headers=client_headers)
+    _age(storage, item["content"])
+
+    async with TestSession() as session:
+        batch = await collect_batch(session, storage, None, 100, GRACE)
+        await session.commit()
+
+    assert batch.deleted == []
+
+
+@pytest.mark.asyncio
+async def test_usage_counters(http_client, client_headers, storage):
+    item = await _upload(http_client, client_headers)
+    await _upload(http_client, client_headers)
+    resp = await http_client.get("/api/v1/uploads/usage", headers=client_headers)
+    assert resp.json() == {"bytes_used": 2 * len(TINY_JPEG), "object_count": 2}
+
+    await http_client.delete(f"/api/v1/inputs/{item['id']}", headers=client_headers)
+    _age(storage, item["content"])
+    async with TestSession() as session:
+        await collect_batch(session, storage, None, 100, timedelta(0))
+        await session.commit()
+
+    resp = await http_client.get("/api/v1/uploads/usage", headers=client_headers)
+    assert resp.json() == {"bytes_used": len(TINY_JPEG), "object_count": 1}
+
+
+@pytest.mark.asyncio
+async def test_abandoned_uploads_leave_usage_alone(
+    http_client, client_headers, storage
+):
+    await _upload(http_client, client_headers)
+    # A direct upload that was never completed: stored, but never counted
+    key = f"{CLIENT_ID}/2024-01-15/{uuid.uuid4()}.jpg"
+    await storage.save(key, TINY_JPEG, "image/jpeg")
+    _age(storage, key)
+    async with TestSession() as session:
+        batch = await collect_batch(session, storage, None, 100, timedelta(0))
+        await session.commit()
+
+    assert batch.deleted == [key]
+    resp = await http_client.get("/api/v1/uploads/usage", headers=client_headers)
+    assert resp.json() == {"bytes_used": len(TINY_JPEG), "object_count": 1}
+
+
+@pytest.mark.asyncio
+async def test_recount_counts_only_what_gc_can_uncount(
+    http_client, client_headers, storage
+):
+    await _upload(http_client, client_headers)
+    cleared = await _upload(http_client, client_headers)
+    await http_client.delete(f"/api/v1/inputs/{cleared['id']}", headers=client_headers)
+    orphan = f"{CLIENT_ID}/2024-01-15/{uuid.uuid4()}.jpg"
+    await storage.save(orphan, TINY_JPEG, "image/jpeg")
+
+    async with TestSession() as session:
+        assert await recount_usage(session, storage) == 1
+        await session.commit()
+    resp = await http_client.get("/api/v1/uploads/usage", headers=client_headers)
+    # The orphan isn't counted; the cleared item's object still is
+    assert resp.json() == {"bytes_used": 2 * len(TINY_JPEG), "object_count": 2}
+
+    # ... and the GC gives back exactly what was counted
+    _age(storage, orphan)
+    _age(storage, cleared["content"])
+    async with TestSession() as session:
+        batch = await collect_batch(session, storage, None, 100, timedelta(0))
+        await session.commit()
+    assert sorted(batch.deleted) == sorted([orphan, cleared["content"]])
+    resp = await http_client.get("/api/v1/uploads/usage", headers=client_headers)
+    assert resp.json() == {"bytes_used": len(TINY_JPEG), "object_count": 1}
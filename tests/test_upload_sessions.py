@@ -0,0 +1,206 @@
+import asyncio
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import update
+from starlette.requests import ClientDisconnect
+
+from app.main import app
+from app.models.upload_session import UploadSession
+from app.services import file_storage, upload_sessions
+from app.services.file_storage import LocalStorage
+from tests.conftest import TestSession
+
+TODAY = date.today().isoformat()
+DATA = bytes(range(256)) * 40  # 10 KB
+CHUNK = "application/offset+octet-stream"
+
+
+@pytest.fixture(autouse=True)
+def dirs(tmp_path, monkeypatch):
+    storage = LocalStorage(tmp_path / "uploads")
+    monkeypatch.setattr(file_storage, "_storage", storage)
+    monkeypatch.setattr(upload_sessions, "PARTIAL_UPLOAD_DIR", tmp_path / "partial")
+    return storage
+
+
+async def _create(http_client, headers, length=len(DATA)):
+    resp = await http_client.post(
+        "/api/v1/inputs/uploads",
+        json={"content_type": "image/jpeg", "length": length, "date": TODAY},
+        headers=headers,
+    )
+    assert resp.status_code == 201
+    return resp.json()["id"]
+
+
+async def _patch(http_client, headers, upload_id, offset, chunk):
+    return await http_client.patch(
+        f"/api/v1/inputs/uploads/{upload_id}",
+        content=chunk,
+        headers={**headers, "Upload-Offset": str(offset), "Content-Type": CHUNK},
+    )
+
+
+@pytest.mark.asyncio
+async def test_resumable_upload_flow(http_client, client_headers, dirs):
+    upload_id = await _create(http_client, client_headers)
+
+    resp = await _patch(http_client, client_headers, upload_id, 0, DATA[:4000])
+    assert resp.status_code == 204
+    assert resp.headers["Upload-Offset"] == "4000"
+
+    # Connection drops; client asks where to resume
+    resp = await http_client.head(
+        f"/api/v1/inputs/uploads/{upload_id}", headers=client_headers
+    )
+    assert resp.headers["Upload-Offset"] == "4000"
+
+    resp = await _patch(http_client, client_headers, upload_id, 4000, DATA[4000:])
+    assert resp.headers["Upload-Offset"] == str(len(DATA))
+
+    resp = await http_client.post(
+        f"/api/v1/inputs/uploads/{upload_id}/finalize", headers=client_headers
+    )
+    assert resp.status_code == 201
+    item = resp.json()
+    assert item["type"] == "image"
+    assert await dirs.read(item["content"]) == DATA
+    assert not upload_sessions.part_path(upload_id).exists()
+
+
+@pytest.mark.asyncio
+async def test_offset_mismatch(http_client, client_headers):
+    upload_id = await _create(http_client, client_headers)
+    resp = await _patch(http_client, client_headers, upload_id, 100, DATA[:10])
+    assert resp.status_code == 409
+
+
+@pytest.mark.asyncio
+async def test_retry_racing_a_slow_patch(http_client, client_headers, dirs):
+    upload_id = await _create(http_client, client_headers)
+    streaming, release = asyncio.Event(), asyncio.Event()
+
+    async def slow_body():
+        yield b"x" * 100
+        streaming.set()
+        await release.wait()
+        yield b"x" * 100
+
+    slow = asyncio.create_task(
+        _patch(http_client, client_headers, upload_id, 0, slow_body())
+    )
+    await streaming.wait()
+    # The client gives up on the slow request and retries the same offset
+    resp = await _patch(http_client, client_headers, upload_id, 0, DATA[:4000])
+    assert resp.headers["Upload-Offset"] == "4000"
+    release.set()
+    assert (await slow).status_code == 409
+
+    resp = await _patch(http_client, client_headers, upload_id, 4000, DATA[4000:])
+    resp = await http_client.post(
+        f"/api/v1/inputs/uploads/{upload_id}/finalize", headers=client_headers
+    )
+    assert await dirs.read(resp.json()["content"]) == DATA
+    assert list(upload_sessions.PARTIAL_UPLOAD_DIR.iterdir()) == []
+
+
+@pytest.mark.asyncio
+async def test_dropped_patch_keeps_received_bytes(http_client, client_headers, dirs):
+    upload_id = await _create(http_client, client_headers)
+    messages = [
+        {"type": "http.request", "body": DATA[:3000], "more_body": True},
+        {"type": "http.disconnect"},  # the connection dies part-way
+    ]
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        pass
+
+    headers = {**client_headers, "Upload-Offset": "0", "Content-Type": CHUNK}
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "PATCH",
+        "scheme": "http",
+        "server": ("test", 80),
+        "path": f"/api/v1/inputs/uploads/{upload_id}",
+        "raw_path": f"/api/v1/inputs/uploads/{upload_id}".encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(k.lower().encode(), v.encode()) for k, v in headers.items()],
+    }
+    with pytest.raises(ClientDisconnect):
+        await app(scope, receive, send)
+
+    resp = await http_client.head(
+        f"/api/v1/inputs/uploads/{upload_id}", headers=client_headers
+    )
+    assert resp.headers["Upload-Offset"] == "3000"
+    resp = await _patch(http_client, client_headers, upload_id, 3000, DATA[3000:])
+    resp = await http_client.post(
+        f"/api/v1/inputs/uploads/{upload_id}/finalize", headers=client_headers
+    )
+    assert await dirs.read(resp.json()["content"]) == DATA
+
+
+@pytest.mark.asyncio
+async def test_chunk_past_length(http_client, client_headers):
+    upload_id = await _create(http_client, client_headers, length=10)
+    resp = await _patch(http_client, client_headers, upload_id, 0, DATA[:20])
+    assert resp.status_code == 413
+
+
+@pytest.mark.asyncio
+async def test_finalize_incomplete(http_client, client_headers):
+    upload_id = await _create(http_client, client_headers)
+    await _patch(http_client, client_headers, upload_id, 0, DATA[:10])
+    resp = await http_client.post(
+        f"/api/v1/inputs/uploads/{upload_id}/finalize", headers=client_headers
+    )
+    assert resp.status_code == 409
+
+
+@pytest.mark.asyncio
+async def test_create_too_large(http_client, client_headers):
+    resp = await http_client.post(
+        "/api/v1/inputs/uploads",
+        json={"content_type": "image/jpeg", "length": 6 * 1024 * 1024},
+        headers=client_headers,
+    )
+    assert resp.status_code == 413
+
+
+@pytest.mark.asyncio
+async def test_expired_upload(http_client, client_headers):
+    upload_id = await _create(http_client, client_headers)
+    await _patch(http_client, client_headers, upload_id, 0, DATA[:10])
+    async with TestSession() as session:
+        await session.execute(
+            update(UploadSession).values(
+                expires_at=datetime.now(timezone.utc) - timedelta(minutes=1)
+            )
+        )
+        await session.commit()
+
+    resp = await _patch(http_client, client_headers, upload_id, 10, DATA[10:20])
+    assert resp.status_code == 410
+    assert not upload_sessions.part_path(upload_id).exists()
+
+
+@pytest.mark.asyncio
+async def test_purge_expired(http_client, client_headers):
+    upload_id = await _create(http_client, client_headers)
+    await _patch(http_client, client_headers, upload_id, 0, DATA[:10])
+    async with TestSession() as session:
+        await session.execute(
+            update(UploadSession).values(
+                expires_at=datetime.now(timezone.utc) - timedelta(minutes=1)
+            )
+        )
+        assert await upload_sessions.purge_expired(session) == 1
+        await session.commit()
+    assert not upload_sessions.part_path(upload_id).exists()
@@ -0,0 +1,105 @@
+import pytest
+from sqlalchemy import select
+
+from app.models.post_view import PostView
+from app.services import view_counts
+from app.services.view_counts import ViewCounter
+from tests.conftest import TestSession, publish_post
+
+MISSING = "2024-01-01-input-abcdef"  # well-formed, but never published
+
+
+@pytest.fixture
+def counter(monkeypatch):
+    counter = ViewCounter(max_pending=100)
+    monkeypatch.setattr(view_counts, "counter", counter)
+    return counter
+
+
+async def _flush(counter) -> int:
+    async with TestSession() as session:
+        return await counter.flush(session)
+
+
+async def _view(http_client, slug, times=1):
+    for _ in range(times):
+        resp = await http_client.post(f"/api/v1/public/posts/{slug}/view")
+        assert resp.status_code == 204
+
+
+@pytest.mark.asyncio
+async def test_views_are_buffered_then_flushed(
+    http_client, client_headers, counter, query_log
+):
+    first = await publish_post(http_client, client_headers, "first")
+    second = await publish_post(http_client, client_headers, "second")
+
+    query_log.clear()
+    await _view(http_client, first["slug"], 3)
+    await _view(http_client, second["slug"])
+    await _view(http_client, MISSING)
+    assert query_log == []  # a view never touches the database
+    assert counter.pending() == {first["slug"]: 3, second["slug"]: 1, MISSING: 1}
+    assert "daycast_last_write" not in http_client.cookies  # cache stays usable
+
+    query_log.clear()
+    assert await _flush(counter) == 2
+    assert sum(s.lstrip().upper().startswith("INSERT") for s in query_log) == 1
+    assert counter.pending() == {}
+
+    await _view(http_client, second["slug"], 4)
+    await _flush(counter)
+    async with TestSession() as session:
+        result = await session.execute(select(PostView.post_id, PostView.view_count))
+        counts = {str(post_id): n for post_id, n in result.all()}
+    assert counts == {first["id"]: 3, second["id"]: 5}
+
+    resp = await http_client.get("/api/v1/public/posts/popular?limit=1")
+    (top,) = resp.json()["items"]
+    assert (top["slug"], top["view_count"]) == (second["slug"], 5)
+
+
+@pytest.mark.asyncio
+async def test_failed_flush_keeps_counts(
+    http_client, client_headers, counter, monkeypatch
+):
+    post = await publish_post(http_client, client_headers, "kept")
+    await _view(http_client, post["slug"], 2)
+
+    def broken(*args, **kwargs):
+        raise RuntimeError("database unavailable")
+
+    monkeypatch.setattr(view_counts, "dialect_insert", broken)
+    with pytest.raises(RuntimeError):
+        await _flush(counter)
+    await _view(http_client, post["slug"])
+    assert counter.pending() == {post["slug"]: 3}
+
+
+@pytest.mark.asyncio
+async def test_malformed_slugs_are_refused(http_client, counter):
+    for slug in ["no-such-post", "2024-01-01-input-" + "f" * 200]:
+        resp = await http_client.post(f"/api/v1/public/posts/{slug}/view")
+        assert resp.status_code == 404
+    assert counter.pending() == {}
+
+
+def test_buffer_is_bounded():
+    counter = ViewCounter(max_pending=2)
+    for slug in ["a", "b", "c", "a"]:
+        counter.record(slug)
+    assert counter.pending() == {"a": 2, "b": 1}
+    assert counter.dropped == 1
+
+
+@pytest.mark.asyncio
+async def test_unpublished_posts_lose_their_counts(
+    http_client, client_headers, counter
+):
+    post = await publish_post(http_client, client_headers, "short-lived")
+    await _view(http_client, post["slug"])
+    await _flush(counter)
+    await http_client.delete(f"/api/v1/publish/{post['id']}", headers=client_headers)
+    http_client.cookies.clear()
+    resp = await http_client.get("/api/v1/public/posts/popular")
+    assert resp.json()["items"] == []
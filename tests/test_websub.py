@@ -0,0 +1,260 @@
+import hashlib
+import hmac
+import ipaddress
+from datetime import datetime, timedelta
+
+import httpx
+import pytest
+from sqlalchemy import select
+
+from app import rate_limit
+from app.config import settings
+from app.main import app
+from app.models.websub_subscription import WebSubSubscription
+from app.routers.websub import get_hub_client
+from app.services import websub
+from tests.conftest import TestSession, publish_post
+
+API = settings.PUBLIC_API_URL.rstrip("/")
+TOPIC = f"{API}/api/v1/public/atom"
+CALLBACK = "http://reader.example/push?feed=7"
+
+
+@pytest.fixture(autouse=True)
+def dns(monkeypatch):
+    """Resolve hostnames to a public address, IP literals to themselves."""
+    names = {"reader.example": "93.184.216.34"}
+
+    async def resolve(host, port):
+        return [ipaddress.ip_address(names.get(host, host))]
+
+    monkeypatch.setattr(websub, "resolve", resolve)
+    monkeypatch.setattr(rate_limit, "_backend", None)
+    return names
+
+
+class Subscriber:
+    """A WebSub subscriber reachable through httpx.MockTransport."""
+
+    def __init__(self, push_status: int = 204, echo: bool = True):
+        self.push_status = push_status
+        self.echo = echo
+        self.verifications: list[httpx.Request] = []
+        self.pushes: list[httpx.Request] = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        if request.method == "GET":
+            self.verifications.append(request)
+            challenge = request.url.params["hub.challenge"] if self.echo else "no"
+            return httpx.Response(200, text=challenge)
+        self.pushes.append(request)
+        return httpx.Response(self.push_status)
+
+    def client(self) -> httpx.AsyncClient:
+        transport = websub.PublicTransport(httpx.MockTransport(self))
+        return httpx.AsyncClient(transport=transport)
+
+
+@pytest.fixture
+def subscriber():
+    subscriber = Subscriber()
+
+    async def override():
+        async with subscriber.client() as http:
+            yield http
+
+    app.dependency_overrides[get_hub_client] = override
+    yield subscriber
+    del app.dependency_overrides[get_hub_client]
+
+
+async def _subscribe(http_client, mode="subscribe", topic=TOPIC, **extra):
+    return await http_client.post(
+        "/api/v1/websub",
+        data={"hub.mode": mode, "hub.topic": topic, "hub.callback": CALLBACK, **extra},
+    )
+
+
+async def _subscriptions() -> list[WebSubSubscription]:
+    async with TestSession() as session:
+        result = await session.execute(select(WebSubSubscription))
+        return list(result.scalars().all())
+
+
+async def _deliver(subscriber) -> int:
+    async with TestSession() as session, subscriber.client() as http:
+        return await websub.deliver_due(session, http)
+
+
+@pytest.mark.asyncio
+async def test_subscribe_verifies_intent(http_client, subscriber):
+    resp = await _subscribe(http_client, **{"hub.lease_seconds": "99999999"})
+    assert resp.status_code == 202
+
+    (verification,) = subscriber.verifications
+    assert verification.url.params["feed"] == "7"  # callback query is kept
+    assert verification.url.params["hub.mode"] == "subscribe"
+    assert verification.url.params["hub.topic"] == TOPIC
+    assert verification.url.params["hub.lease_seconds"] == str(
+        settings.WEBSUB_LEASE_SECONDS
+    )
+    (subscription,) = await _subscriptions()
+    assert subscription.callback == CALLBACK
+    assert subscription.next_delivery_at is None
+
+    # Renewing keeps a single row
+    assert (await _subscribe(http_client)).status_code == 202
+    assert len(await _subscriptions()) == 1
+
+    assert (await _subscribe(http_client, mode="unsubscribe")).status_code == 202
+    assert await _subscriptions() == []
+
+
+@pytest.mark.asyncio
+async def test_subscribe_rejects_unknown_topics_and_failed_verification(
+    http_client, subscriber
+):
+    resp = await _subscribe(http_client, topic=f"{TOPIC}?page=2")
+    assert resp.status_code == 400
+    resp = await _subscribe(http_client, topic=f"{API}/api/v1/public/posts")
+    assert resp.status_code == 400
+    # Only the configured origin: the pushed feed would link to this host
+    resp = await _subscribe(http_client, topic="http://evil.example/api/v1/public/atom")
+    assert resp.status_code == 400
+    assert subscriber.verifications == []
+
+    subscriber.echo = False
+    assert (await _subscribe(http_client)).status_code == 400
+    assert await _subscriptions() == []
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "callback",
+    [
+        "http://127.0.0.1:8000/api/v1/auth/login",
+        "http://localhost/push",
+        "http://192.168.31.131/push",
+        "http://169.254.169.254/latest/meta-data/",
+        "http://[::1]/push",
+        "ftp://reader.example/push",
+    ],
+)
+async def test_private_callbacks_are_refused(http_client, subscriber, dns, callback):
+    dns["localhost"] = "127.0.0.1"
+    resp = await http_client.post(
+        "/api/v1/websub",
+        data={"hub.mode": "subscribe", "hub.topic": TOPIC, "hub.callback": callback},
+    )
+    assert resp.status_code == 400
+    assert subscriber.verifications == []
+
+
+@pytest.mark.asyncio
+async def test_push_rechecks_the_callback_address(
+    http_client, client_headers, subscriber, dns
+):
+    await _subscribe(http_client)
+    dns["reader.example"] = "10.0.0.5"  # rebound after verification
+    await publish_post(http_client, client_headers)
+    assert await _deliver(subscriber) == 1
+    assert subscriber.pushes == []
+    (subscription,) = await _subscriptions()
+    assert subscription.last_error == "Callback does not resolve to a public address"
+
+
+@pytest.mark.asyncio
+async def test_push_connects_to_the_checked_address(
+    http_client, client_headers, subscriber, monkeypatch
+):
+    await _subscribe(http_client)
+    answers = iter(["93.184.216.34", "10.0.0.5"])  # rebinds right after the check
+
+    async def resolve(host, port):
+        return [ipaddress.ip_address(next(answers))]
+
+    monkeypatch.setattr(websub, "resolve", resolve)
+    await publish_post(http_client, client_headers)
+    assert await _deliver(subscriber) == 1
+    (push,) = subscriber.pushes
+    assert push.url.host == "93.184.216.34"
+    assert push.headers["Host"] == "reader.example"
+    assert push.extensions["sni_hostname"] == "reader.example"
+
+
+@pytest.mark.asyncio
+async def test_hub_is_rate_limited(http_client, subscriber, monkeypatch):
+    monkeypatch.setattr(settings, "WEBSUB_REQUESTS_PER_MINUTE", 2)
+    assert (await _subscribe(http_client)).status_code == 202
+    assert (await _subscribe(http_client)).status_code == 202
+    assert (await _subscribe(http_client)).status_code == 429
+    assert len(subscriber.verifications) == 2
+
+
+@pytest.mark.asyncio
+async def test_publish_pushes_signed_feed(http_client, client_headers, subscriber):
+    await _subscribe(http_client, **{"hub.secret": "s3cret"})
+    assert await _deliver(subscriber) == 0  # nothing published yet
+
+    await publish_post(http_client, client_headers, "first")
+    await publish_post(http_client, client_headers, "second")
+    assert await _deliver(subscriber) == 1  # two publishes, one push
+
+    (push,) = subscriber.pushes
+    assert push.headers["Content-Type"] == "application/atom+xml"
+    assert 'rel="hub"' in push.headers["Link"]
+    expected = hmac.new(b"s3cret", push.content, hashlib.sha256).hexdigest()
+    assert push.headers["X-Hub-Signature"] == f"sha256={expected}"
+    assert b"second" in push.content and b"first" in push.content
+
+    (subscription,) = await _subscriptions()
+    assert subscription.next_delivery_at is None
+    assert await _deliver(subscriber) == 0
+
+
+@pytest.mark.asyncio
+async def test_failed_push_backs_off(http_client, client_headers, subscriber):
+    await _subscribe(http_client)
+    subscriber.push_status = 503
+    await publish_post(http_client, client_headers)
+
+    before = datetime.now()
+    assert await _deliver(subscriber) == 1
+    (subscription,) = await _subscriptions()
+    assert subscription.attempts == 1
+    assert subscription.last_error == "HTTP 503"
+    delay = subscription.next_delivery_at.replace(tzinfo=None) - before
+    assert delay >= timedelta(seconds=settings.WEBSUB_RETRY_BASE_SECONDS)
+    assert await _deliver(subscriber) == 0  # not due yet
+
+    assert websub.retry_delay(2) == 2 * websub.retry_delay(1)
+    assert websub.retry_delay(50) == websub.MAX_RETRY_DELAY
+
+
+@pytest.mark.asyncio
+async def test_retries_stop_and_gone_subscribers_are_dropped(
+    http_client, client_headers, subscriber, monkeypatch
+):
+    monkeypatch.setattr(settings, "WEBSUB_MAX_ATTEMPTS", 1)
+    await _subscribe(http_client)
+    subscriber.push_status = 500
+    await publish_post(http_client, client_headers)
+    await _deliver(subscriber)
+    (subscription,) = await _subscriptions()
+    assert subscription.next_delivery_at is None  # abandoned until the next publish
+
+    subscriber.push_status = 410
+    await publish_post(http_client, client_headers, "another")
+    await _deliver(subscriber)
+    assert await _subscriptions() == []
+
+
+@pytest.mark.asyncio
+async def test_feeds_advertise_the_hub(http_client):
+    resp = await http_client.get("/api/v1/public/atom")
+    assert f'<link href="{API}/api/v1/websub" rel="hub"/>' in resp.text
+    assert resp.headers["Link"] == (
+        f'<{API}/api/v1/websub>; rel="hub", <{TOPIC}>; rel="self"'
+    )
+    data = (await http_client.get("/api/v1/public/feed.json")).json()
+    assert data["hubs"] == [{"type": "WebSub", "url": f"{API}/api/v1/websub"}]